@@ -0,0 +1,271 @@
+import asyncio
+import collections
+import itertools
+import time
+from urllib.parse import quote
+import aiohttp
+from yarl import URL
+from google.api_core import exceptions
+from google.auth.transport.requests import Request
+from BoltPartialResponse import BoltPartialResponse
+from BoltMediaBlob import BoltMediaBlob
+
+
+class BoltAsyncEngine:
+    """
+    BoltAsyncEngine runs benchmark operations as asyncio coroutines, sending requests straight to the JSON API of the
+    GS / Bolt endpoint of a storage client (its credentials are used to authorize them). All requests, to GS and Bolt,
+    share the connection pool of a single aiohttp ClientSession, so the no of requests in flight is bounded by the
+    pool size rather than by the no of threads, as it is with the (synchronous) storage clients.
+    Objects are downloaded as stored (no decompressive transcoding), the bytes on the wire being what's measured.
+    """
+
+    # size of the chunks downloaded objects are read (and discarded) in.
+    READ_CHUNK_SIZE = 256 * 1024
+
+    def __init__(self, pool_size=100, keep_alive=True, connect_timeout=10, read_timeout=60):
+        """
+        :param pool_size: max. no of connections (to all hosts)
+        :param keep_alive: reuse connections across requests
+        :param connect_timeout: connect timeout (secs)
+        :param read_timeout: read timeout (secs)
+        """
+        self._loop = asyncio.new_event_loop()
+        # {origin: {'requests', 'new_connections'}} of the endpoints requests were sent to.
+        self._connection_stats = {}
+        self._session = self._loop.run_until_complete(
+            self._create_session(pool_size, keep_alive, connect_timeout, read_timeout))
+
+    async def _create_session(self, pool_size, keep_alive, connect_timeout, read_timeout):
+        trace_config = aiohttp.TraceConfig()
+        trace_config.on_request_start.append(self._on_request_start)
+        trace_config.on_connection_create_end.append(self._on_connection_create_end)
+        connector = aiohttp.TCPConnector(limit=pool_size, force_close=not keep_alive)
+        timeout = aiohttp.ClientTimeout(sock_connect=connect_timeout, sock_read=read_timeout)
+        return aiohttp.ClientSession(connector=connector, timeout=timeout, auto_decompress=False,
+                                     trace_configs=[trace_config])
+
+    def close(self):
+        """
+        Closes the connections and the event loop of the engine.
+        """
+        self._loop.run_until_complete(self._session.close())
+        self._loop.close()
+
+    def run(self, coroutine):
+        """
+        Runs a coroutine on the event loop of the engine.
+        :param coroutine: coroutine
+        :return: result of the coroutine
+        """
+        return self._loop.run_until_complete(coroutine)
+
+    def run_ops(self, op, record, keys, concurrency, deadline=None):
+        """
+        Runs op for each key, with up to concurrency ops in flight, and records the results as they complete.
+        Keys are consumed lazily, concurrency keys at a time, off the event loop (they may be listed / read from
+        storage). No new ops are started after the deadline, if any.
+        Time spent waiting for keys while no ops are in flight is left out of the elapsed wall time.
+        :param op: coroutine function that takes a key name and performs a single operation
+        :param record: function that records a result returned by op
+        :param keys: iterable of keys
+        :param concurrency: max. no of ops in flight
+        :param deadline: time.perf_counter_ns() after which no new ops are started
+        :return: elapsed wall time (secs)
+        """
+        ops_start_time = time.perf_counter_ns()
+        key_wait = self.run(self._run_ops(op, record, iter(keys), concurrency, deadline))
+        ops_end_time = time.perf_counter_ns()
+        return (ops_end_time - ops_start_time - key_wait) / 1e9
+
+    async def _run_ops(self, op, record, keys, concurrency, deadline):
+        """
+        :return: time (nanoseconds) spent waiting for keys while no ops were in flight
+        """
+        key_wait = 0
+        pending = set()
+        key_buffer = collections.deque()
+        keys_exhausted = False
+        try:
+            while True:
+                while len(pending) < concurrency and (deadline is None or time.perf_counter_ns() < deadline):
+                    if not key_buffer and not keys_exhausted:
+                        wait_start_time = time.perf_counter_ns()
+                        next_keys = await self._loop.run_in_executor(None, list,
+                                                                     itertools.islice(keys, concurrency))
+                        if not pending:
+                            key_wait += time.perf_counter_ns() - wait_start_time
+                        keys_exhausted = len(next_keys) < concurrency
+                        key_buffer.extend(next_keys)
+                    if not key_buffer:
+                        break
+                    pending.add(self._loop.create_task(op(key_buffer.popleft())))
+                if not pending:
+                    break
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    record(task.result())
+            return key_wait
+        finally:
+            # ops still in flight after an error are cancelled and awaited, so that their connections are released
+            # before the loop is closed.
+            for task in pending:
+                task.cancel()
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
+
+    async def get_object(self, storage_client, bucket_name, key, fields=None):
+        """
+        Gets the metadata of an object.
+        :param storage_client: Bolt / GS storage client
+        :param bucket_name: bucket name
+        :param key: key name
+        :param fields: object resource fields to request (None - full object resource)
+        :return: object resource
+        """
+        params = {'projection': 'noAcl'}
+        if fields is not None:
+            params['fields'] = ','.join(fields)
+        return await self._request(storage_client, 'GET', self._object_path(bucket_name, key), params=params,
+                                   read=lambda response: response.json(content_type=None))
+
+    async def download_object(self, storage_client, bucket_name, key, byte_range=None):
+        """
+        Downloads an object (as stored), or a byte range of it, discarding the data as it arrives.
+        :param storage_client: Bolt / GS storage client
+        :param bucket_name: bucket name
+        :param key: key name
+        :param byte_range: (start, end) offsets (inclusive), None - the entire object
+        :return: (no of bytes downloaded, stored object size, stored content encoding), as per the response headers
+                 (see BoltMediaBlob), None if not known
+        """
+        headers = {'Accept-Encoding': 'gzip'}
+        if byte_range is not None:
+            headers['Range'] = 'bytes={}-{}'.format(*byte_range)
+        return await self._request(storage_client, 'GET', self._object_path(bucket_name, key), api='/download',
+                                   params={'alt': 'media'}, headers=headers, read=self._read_media)
+
+    async def upload_object(self, storage_client, bucket_name, key, data, content_type):
+        """
+        Uploads an object in a single request.
+        :param storage_client: Bolt / GS storage client
+        :param bucket_name: bucket name
+        :param key: key name
+        :param data: object data (bytes-like)
+        :param content_type: content type
+        :return: object resource
+        """
+        return await self._request(storage_client, 'POST', self._bucket_path(bucket_name) + '/o', api='/upload',
+                                   params={'uploadType': 'media', 'name': key},
+                                   headers={'Content-Type': content_type}, data=data,
+                                   read=lambda response: response.json(content_type=None))
+
+    async def delete_object(self, storage_client, bucket_name, key):
+        """
+        Deletes an object.
+        :param storage_client: Bolt / GS storage client
+        :param bucket_name: bucket name
+        :param key: key name
+        """
+        await self._request(storage_client, 'DELETE', self._object_path(bucket_name, key),
+                            read=lambda response: response.read())
+
+    async def list_page(self, storage_client, bucket_name, fields=None, max_results=None, page_token=None,
+                        prefix=None, delimiter=None):
+        """
+        Lists a page of objects.
+        :param storage_client: Bolt / GS storage client
+        :param bucket_name: bucket name
+        :param fields: object resource fields to request (None - full object resources)
+        :param max_results: max. no of objects in the page
+        :param page_token: token of the page (None - first page)
+        :param prefix: prefix
+        :param delimiter: delimiter
+        :return: (list of blobs, list of prefixes, token of the next page (None - last page),
+                  request time (nanoseconds), parse time (nanoseconds), response size (bytes))
+        """
+        params = BoltPartialResponse.list_query_params(fields, max_results=max_results, page_token=page_token,
+                                                       prefix=prefix, delimiter=delimiter)
+        request_start_time = time.perf_counter_ns()
+        content = await self._request(storage_client, 'GET', self._bucket_path(bucket_name) + '/o', params=params,
+                                      read=lambda response: response.read())
+        request_end_time = time.perf_counter_ns()
+        blobs, prefixes, next_page_token, parse_time = BoltPartialResponse.parse_list_page(
+            storage_client.bucket(bucket_name), content)
+
+        return blobs, prefixes, next_page_token, request_end_time - request_start_time, parse_time, len(content)
+
+    def connection_stats(self, storage_client):
+        """
+        Returns the connection reuse statistics of the requests sent to the endpoint of a storage client.
+        :param storage_client: Bolt / GS storage client
+        :return: {'requests': no of requests sent, 'new_connections': no of connections opened}
+        """
+        origin = str(URL(storage_client._connection.API_BASE_URL).origin())
+        return dict(self._connection_stats.get(origin, {'requests': 0, 'new_connections': 0}))
+
+    async def _request(self, storage_client, method, path, api='', params=None, headers=None, data=None, read=None):
+        """
+        Sends an authorized JSON API request to the endpoint of a storage client.
+        :param storage_client: Bolt / GS storage client
+        :param method: HTTP method
+        :param path: resource path e.g. '/b/<bucket>/o'
+        :param api: '' (metadata), '/download' (media downloads) or '/upload' (media uploads)
+        :param params: query parameters
+        :param headers: request headers
+        :param data: request body
+        :param read: coroutine function that reads the response
+        :return: result of read
+        """
+        url = '{}{}/storage/v1{}'.format(storage_client._connection.API_BASE_URL, api, path)
+        request_headers = self._auth_headers(storage_client)
+        request_headers.update(headers or {})
+        async with self._session.request(method, URL(url, encoded=True), params=params, headers=request_headers,
+                                         data=data) as response:
+            if response.status >= 300:
+                raise exceptions.from_http_status(
+                    response.status, '{} {}: {}'.format(method, url, await response.text()))
+            return await read(response)
+
+    @staticmethod
+    def _bucket_path(bucket_name):
+        return '/b/' + quote(bucket_name, safe='')
+
+    @classmethod
+    def _object_path(cls, bucket_name, key):
+        return cls._bucket_path(bucket_name) + '/o/' + quote(key, safe='')
+
+    @staticmethod
+    def _auth_headers(storage_client):
+        """
+        Returns the authorization headers of a request, refreshing the storage client's credentials if needed.
+        :param storage_client: Bolt / GS storage client
+        :return: request headers
+        """
+        credentials = storage_client._credentials
+        if not credentials.valid:
+            # rare (once per token lifetime) blocking refresh, as done by the storage client.
+            credentials.refresh(Request())
+        headers = {}
+        credentials.apply(headers)
+        return headers
+
+    async def _read_media(self, response):
+        """
+        Reads a media download response body, discarding the data as it arrives.
+        :return: (no of bytes read, stored object size, stored content encoding)
+        """
+        bytes_read = 0
+        async for chunk in response.content.iter_chunked(self.READ_CHUNK_SIZE):
+            bytes_read += len(chunk)
+        return bytes_read, BoltMediaBlob.stored_size(response.headers),\
+            BoltMediaBlob.stored_content_encoding(response.headers)
+
+    async def _on_request_start(self, session, trace_config_ctx, params):
+        trace_config_ctx.origin = str(params.url.origin())
+        connection_stats = self._connection_stats.setdefault(trace_config_ctx.origin,
+                                                             {'requests': 0, 'new_connections': 0})
+        connection_stats['requests'] += 1
+
+    async def _on_connection_create_end(self, session, trace_config_ctx, params):
+        self._connection_stats[trace_config_ctx.origin]['new_connections'] += 1
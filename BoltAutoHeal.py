@@ -1,7 +1,12 @@
+import random
 import time
-import os
-from google.cloud import storage
-from BoltGSOpsClient import BoltGSOpsClient
+from concurrent.futures import ThreadPoolExecutor
+import requests
+from google.api_core import exceptions
+from google.auth.exceptions import TransportError
+from google.resumable_media.common import DataCorruption
+from BoltClientCache import BoltClientCache
+from BoltPerfHistogram import BoltPerfHistogram
 
 
 class BoltAutoHeal:
@@ -10,15 +15,35 @@ class BoltAutoHeal:
     bolt_auto_heal_handler.
     """
 
+    # wait between attempts: FIXED - POLL_INTERVAL secs, EXPONENTIAL - POLL_INTERVAL secs, growing by BACKOFF_FACTOR
+    # up to MAX_POLL_INTERVAL secs, JITTERED - a random wait of up to the EXPONENTIAL one (full jitter).
+    POLL_STRATEGY = 'EXPONENTIAL'
+    POLL_INTERVAL = 0.1
+    MAX_POLL_INTERVAL = 5.0
+    BACKOFF_FACTOR = 2.0
+    # max. time (secs) to wait for the object to be healed
+    MAX_WAIT_SECS = 300.0
+    # timeout (secs) of each attempt
+    ATTEMPT_TIMEOUT = 10.0
+    # cheap check done before each full read of the object: METADATA - get the object metadata, RANGE - read
+    # the first byte of the object, NONE - full reads only.
+    PROBE = 'RANGE'
+    # errors an object is retrieved again after (the object isn't healed yet, or only partially so and fails its
+    # checksum); any other error ends the test.
+    RETRIED_ERRORS = (exceptions.GoogleAPICallError, requests.exceptions.RequestException, TransportError,
+                      DataCorruption)
+    # max. length of the error messages in the timeline
+    MAX_ERROR_LENGTH = 200
+    # max. no of objects polled concurrently (multiple objects)
+    CONCURRENCY = 32
+
     def __init__(self):
-        # create bolt storage client.
-        self._bolt_url = os.environ.get("BOLT_URL").replace('{region}', BoltGSOpsClient.get_region())
-        client_options = {"api_endpoint": self._bolt_url}
-        self._bolt_storage_client = storage.Client(client_options=client_options)
+        # get (cached) bolt storage client.
+        self._bolt_storage_client = BoltClientCache.get_bolt_client()
 
     def process_event(self, request):
         """
-        process_event extracts the parameters (bucket, key) from the HTTP Request, uses those
+        process_event extracts the parameters (bucket, key / keys / prefix) from the HTTP Request, uses those
         parameters to perform auto-heal test.
 
         :param request: request object
@@ -26,6 +51,9 @@ class BoltAutoHeal:
         """
         # Parse JSON Request.
         request_json = request.get_json()
+        object_name = None
+        object_names = None
+        prefix = None
 
         if request_json:
             if 'bucket' in request_json:
@@ -33,34 +61,273 @@ class BoltAutoHeal:
 
             if 'key' in request_json:
                 object_name = request_json['key']
+            if 'keys' in request_json:
+                object_names = list(request_json['keys'])
+            if 'prefix' in request_json:
+                prefix = request_json['prefix']
+            if 'concurrency' in request_json:
+                self.CONCURRENCY = max(1, int(request_json['concurrency']))
+
+            # update poll parameters, if passed in input.
+            if 'pollStrategy' in request_json:
+                self.POLL_STRATEGY = str(request_json['pollStrategy']).upper()
+            if 'pollInterval' in request_json:
+                self.POLL_INTERVAL = float(request_json['pollInterval'])
+            if 'maxPollInterval' in request_json:
+                self.MAX_POLL_INTERVAL = float(request_json['maxPollInterval'])
+            if 'backoffFactor' in request_json:
+                self.BACKOFF_FACTOR = float(request_json['backoffFactor'])
+            if 'maxWaitSecs' in request_json:
+                self.MAX_WAIT_SECS = float(request_json['maxWaitSecs'])
+            if 'attemptTimeout' in request_json:
+                self.ATTEMPT_TIMEOUT = float(request_json['attemptTimeout'])
+            if 'probe' in request_json:
+                self.PROBE = str(request_json['probe']).upper()
 
-        return self.get_blob_until_success(bucket_name, object_name)
+        try:
+            if self.POLL_STRATEGY not in ('FIXED', 'EXPONENTIAL', 'JITTERED'):
+                raise ValueError("Invalid pollStrategy: {}".format(self.POLL_STRATEGY.lower()))
+            if self.PROBE not in ('METADATA', 'RANGE', 'NONE'):
+                raise ValueError("Invalid probe: {}".format(self.PROBE.lower()))
+            if object_names is None and prefix is not None:
+                object_names = [blob.name for blob in self._bolt_storage_client.list_blobs(bucket_name, prefix=prefix)]
+            if object_names is not None:
+                if not object_names:
+                    raise ValueError("No objects to auto-heal")
+                return self.get_blobs_until_success(bucket_name, object_names)
+            return self.get_blob_until_success(bucket_name, object_name)
+        except Exception as e:
+            BoltClientCache.invalidate_on_auth_error(e)
+            return {
+                'errorMessage': str(e),
+                'errorCode': str(1)
+            }
 
     def get_blob_until_success(self, bucket_name, object_name):
         """
         get_blob_until_success attempts to retrieve object repeatedly until it succeeds,
         which would indicate successful auto-healing of the object.
+        Attempts are spaced out as per POLL_STRATEGY and given up after MAX_WAIT_SECS. Each full read of the object
+        is preceded by a PROBE, which has to succeed first.
 
         :param bucket_name: bucket name
         :param object_name: object name
-        :return: time taken to auto-heal
+        :return: time taken to auto-heal and the timeline of attempts
         """
-        auto_heal_start_time = time.time()
-        while True:
-            try:
-                # Get blob from Bolt.
-                bucket = self._bolt_storage_client.bucket(bucket_name)
-                blob = bucket.get_blob(object_name)
-                # read the entire object.
-                blob_data = blob.download_as_bytes()
-                # exit on success after auto-heal
-                auto_heal_end_time = time.time()
-                break
-            except Exception as e:
-                pass
+        heal_result = self._poll_until_healed(bucket_name, object_name)
+
+        auto_heal_result = {
+            'healed': heal_result['healed'],
+            'poll_strategy': self.POLL_STRATEGY.lower(),
+            'probe': self.PROBE.lower(),
+            'attempts': heal_result['attempts'],
+            'timeline': heal_result['timeline']
+        }
+        if heal_result['healed']:
+            auto_heal_result['auto_heal_time'] = "{:.2f} secs".format(heal_result['heal_time'])
+        else:
+            auto_heal_result['max_wait'] = "{:.2f} secs".format(self.MAX_WAIT_SECS)
+        return auto_heal_result
+
+    def get_blobs_until_success(self, bucket_name, object_names):
+        """
+        get_blobs_until_success attempts to retrieve each of the objects repeatedly until it succeeds (see
+        get_blob_until_success), polling up to CONCURRENCY objects concurrently with the Bolt client (its own one,
+        if the shared client's connection pool is too small).
+        The heal time of each object is measured from the start of the test, as an object may heal while it waits
+        for polling to start (if there are more objects than CONCURRENCY), and that wait is reported alongside
+        (queue_wait). Each object is given up MAX_WAIT_SECS after polling it starts.
+
+        :param bucket_name: bucket name
+        :param object_names: object names
+        :return: distribution of the time taken to auto-heal, time taken to auto-heal all objects and the
+                 recovery throughput
+        """
+        concurrency = min(self.CONCURRENCY, len(object_names))
+        own_client = concurrency > BoltClientCache.POOL_SIZE
+        if own_client:
+            # a client with a connection per object polled, leaving the shared client as it is.
+            self._bolt_storage_client = BoltClientCache.new_client('BOLT', pool_size=concurrency)
+
+        start_time = time.perf_counter()
 
-        auto_heal_time = auto_heal_end_time - auto_heal_start_time
+        def poll(object_name):
+            queue_wait = time.perf_counter() - start_time
+            return queue_wait, self._poll_until_healed(bucket_name, object_name)
 
+        try:
+            with ThreadPoolExecutor(max_workers=concurrency) as executor:
+                heal_results = list(executor.map(poll, object_names))
+        finally:
+            if own_client:
+                BoltClientCache.close_client(self._bolt_storage_client)
+
+        heal_times = BoltPerfHistogram()
+        queue_waits = BoltPerfHistogram()
+        all_healed_time = 0
+        healed_bytes = 0
+        unhealed = {}
+        for object_name, (queue_wait, heal_result) in zip(object_names, heal_results):
+            queue_waits.record(queue_wait * 1e9)
+            if heal_result['healed']:
+                heal_time = queue_wait + heal_result['heal_time']
+                heal_times.record(heal_time * 1e9)
+                all_healed_time = max(all_healed_time, heal_time)
+                healed_bytes += heal_result['size']
+            else:
+                unhealed[object_name] = heal_result['timeline']
+
+        auto_heal_result = {
+            'objects': len(object_names),
+            'healed_objects': heal_times.count,
+            'concurrency': concurrency,
+            'poll_strategy': self.POLL_STRATEGY.lower(),
+            'probe': self.PROBE.lower(),
+            'attempts': sum(heal_result['attempts'] for _, heal_result in heal_results)
+        }
+        if len(object_names) > concurrency:
+            auto_heal_result['queue_wait'] = self._time_percentiles(queue_waits)
+        if heal_times.count:
+            auto_heal_result['auto_heal_time'] = self._time_percentiles(heal_times)
+            auto_heal_result['recovery_throughput'] = {
+                'objects': "{:.2f} objects/sec".format(heal_times.count / all_healed_time if all_healed_time else 0),
+                'bytes': "{:.2f} bytes/sec".format(healed_bytes / all_healed_time if all_healed_time else 0)
+            }
+        if unhealed:
+            auto_heal_result['max_wait'] = "{:.2f} secs".format(self.MAX_WAIT_SECS)
+            auto_heal_result['unhealed_objects'] = unhealed
+        else:
+            # time from the start of the test until the last object was healed.
+            auto_heal_result['all_healed_time'] = "{:.2f} secs".format(all_healed_time)
+        return auto_heal_result
+
+    @staticmethod
+    def _time_percentiles(times):
+        """
+        :param times: histogram of times (nanoseconds)
+        :return: p50, p90 and max. of the times
+        """
         return {
-            'auto_heal_time': "{:.2f} secs".format(auto_heal_time)
+            'p50': "{:.2f} secs".format(times.percentile(0.5) / 1e9),
+            'p90': "{:.2f} secs".format(times.percentile(0.9) / 1e9),
+            'max': "{:.2f} secs".format(times.max / 1e9)
         }
+
+    def _poll_until_healed(self, bucket_name, object_name):
+        """
+        Retrieves an object from Bolt until a full read of it succeeds, or MAX_WAIT_SECS have passed.
+
+        :param bucket_name: bucket name
+        :param object_name: object name
+        :return: {'healed', 'heal_time' (secs since polling started, None if not healed), 'size' (bytes read),
+                  'attempts', 'timeline'}
+        """
+        blob = self._bolt_storage_client.bucket(bucket_name).blob(object_name)
+        steps = ['READ'] if self.PROBE == 'NONE' else [self.PROBE, 'READ']
+        poll_intervals = self._poll_intervals()
+        timeline = []
+        attempts = 0
+        start_time = time.perf_counter()
+        deadline = start_time + self.MAX_WAIT_SECS
+        while True:
+            for step in steps:
+                attempts += 1
+                attempt_start_time = time.perf_counter()
+                timeout = max(min(self.ATTEMPT_TIMEOUT, deadline - attempt_start_time), 1.0)
+                try:
+                    size = self._attempt(blob, step, timeout)
+                    error = None
+                except self.RETRIED_ERRORS as e:
+                    error = e
+                attempt_end_time = time.perf_counter()
+                self._add_to_timeline(timeline, step, attempt_start_time - start_time,
+                                      attempt_end_time - attempt_start_time, error)
+                if error is not None:
+                    break
+            else:
+                # exit on success after auto-heal
+                return {
+                    'healed': True,
+                    'heal_time': attempt_end_time - start_time,
+                    'size': size,
+                    'attempts': attempts,
+                    'timeline': timeline
+                }
+
+            now = time.perf_counter()
+            if now >= deadline:
+                return {
+                    'healed': False,
+                    'heal_time': None,
+                    'size': 0,
+                    'attempts': attempts,
+                    'timeline': timeline
+                }
+            time.sleep(min(next(poll_intervals), deadline - now))
+
+    @staticmethod
+    def _attempt(blob, step, timeout):
+        """
+        Attempts to retrieve an object.
+
+        :param blob: blob of the object
+        :param step: METADATA (get the object metadata), RANGE (read the first byte) or READ (read the entire object)
+        :param timeout: timeout (secs)
+        :return: no of bytes read
+        """
+        if step == 'METADATA':
+            blob.reload(timeout=timeout)
+            return 0
+        elif step == 'RANGE':
+            try:
+                # the checksum of the object can't be verified against a range.
+                return len(blob.download_as_bytes(start=0, end=0, timeout=timeout, checksum=None))
+            except exceptions.RequestRangeNotSatisfiable:
+                # empty object.
+                return 0
+        else:
+            return len(blob.download_as_bytes(timeout=timeout))
+
+    def _poll_intervals(self):
+        """
+        Generates the waits (secs) between attempts as per POLL_STRATEGY.
+
+        :return: wait iterator
+        """
+        interval = self.POLL_INTERVAL
+        while True:
+            if self.POLL_STRATEGY == 'FIXED':
+                yield self.POLL_INTERVAL
+                continue
+            yield random.uniform(0, interval) if self.POLL_STRATEGY == 'JITTERED' else interval
+            interval = min(interval * self.BACKOFF_FACTOR, self.MAX_POLL_INTERVAL)
+
+    def _add_to_timeline(self, timeline, step, attempt_time, latency, error):
+        """
+        Adds an attempt to the timeline. Consecutive attempts of the same step failing with the same error type are
+        merged into a single entry.
+
+        :param timeline: timeline of attempts
+        :param step: step attempted
+        :param attempt_time: time (secs) since polling the object started the attempt was made at
+        :param latency: latency (secs) of the attempt
+        :param error: error the attempt failed with (None if successful)
+        """
+        outcome = 'OK' if error is None else type(error).__name__
+        last_entry = timeline[-1] if timeline else None
+        if last_entry is not None and error is not None and last_entry['step'] == step.lower() and \
+                last_entry['outcome'] == outcome:
+            entry = last_entry
+            entry['attempts'] += 1
+        else:
+            entry = {
+                'step': step.lower(),
+                'outcome': outcome,
+                'attempts': 1,
+                'first_attempt': "{:.3f} secs".format(attempt_time)
+            }
+            timeline.append(entry)
+        entry['last_attempt'] = "{:.3f} secs".format(attempt_time)
+        entry['latency'] = "{:.2f} ms".format(latency * 1000)
+        if error is not None:
+            entry['error'] = str(error)[:self.MAX_ERROR_LENGTH]
@@ -0,0 +1,51 @@
+import itertools
+from google.api_core import exceptions
+from google.cloud.storage.batch import Batch
+
+
+class BoltBatch(Batch):
+    """
+    BoltBatch sends the storage requests made within it (e.g. bucket.delete_blob, bucket.get_blob) to the client's
+    endpoint (GS or Bolt) as a single batch request. Unlike Batch, which sends batches to GS regardless of the
+    client's endpoint and raises the first error, BoltBatch records the outcome of each request.
+    """
+
+    # max. no of requests per batch request, as supported by the JSON API.
+    MAX_BATCH_SIZE = 100
+
+    @staticmethod
+    def batches(items, batch_size=MAX_BATCH_SIZE):
+        """
+        Splits items into lists of up to batch_size items, lazily.
+        :param items: iterable of items e.g. object names
+        :param batch_size: max. no of items per list
+        :return: generator of lists of items
+        """
+        items = iter(items)
+        return iter(lambda: list(itertools.islice(items, batch_size)), [])
+
+    def __init__(self, client):
+        super(BoltBatch, self).__init__(client)
+        self.API_BASE_URL = client._base_connection.API_BASE_URL
+        self.ALLOW_AUTO_SWITCH_TO_MTLS_URL = False
+        # error (None if successful) of each request, in order.
+        self.errors = []
+
+    def _finish_futures(self, responses):
+        """
+        Applies the batch responses to the objects the requests were made for and records their errors.
+        :param responses: response of each request in the batch
+        """
+        if len(self._target_objects) != len(responses):
+            raise ValueError("Expected a response for every request.")
+
+        for target_object, subresponse in zip(self._target_objects, responses):
+            if not 200 <= subresponse.status_code < 300:
+                self.errors.append(exceptions.from_http_response(subresponse))
+                continue
+            self.errors.append(None)
+            if target_object is not None:
+                try:
+                    target_object._properties = subresponse.json()
+                except ValueError:
+                    target_object._properties = subresponse.content
@@ -0,0 +1,182 @@
+import os
+import threading
+import requests
+import google.auth
+from google.cloud import storage
+from google.auth.exceptions import GoogleAuthError
+from google.api_core.exceptions import Unauthorized
+from BoltHTTPSession import BoltHTTPSession
+
+
+class BoltClientCache:
+    """
+    BoltClientCache holds the GS / Bolt storage clients and the resolved Bolt URL for the lifetime of the
+    function instance, so that warm invocations of the handlers reuse them instead of re-discovering
+    credentials, opening new HTTP sessions and querying the metadata server on every request.
+    The cached clients use HTTP sessions (see BoltHTTPSession) with the default configuration below; callers that
+    need other HTTP options (e.g. a benchmark's pool size or timeouts) create their own clients with new_client.
+    """
+
+    # default HTTP session configuration: connection pool size (per host), keep-alive, transport retries,
+    # connect / read timeouts (secs).
+    POOL_SIZE = 32
+    KEEP_ALIVE = True
+    MAX_RETRIES = 0
+    CONNECT_TIMEOUT = 10
+    READ_TIMEOUT = 60
+
+    _lock = threading.Lock()
+    _bolt_url = None
+    _gs_storage_client = None
+    _bolt_storage_client = None
+
+    @staticmethod
+    def get_region():
+        """
+        Get Deployment region of the function
+        :return: region
+        """
+        # GCE_METADATA_HOST (as used by google-auth) points at a stand-in metadata server e.g. BoltLocalServer.
+        md_zone_url = 'http://{}/computeMetadata/v1/instance/zone'.format(
+            os.environ.get('GCE_METADATA_HOST', 'metadata.google.internal'))
+        headers = {'Metadata-Flavor': 'Google'}
+        r = requests.get(md_zone_url, headers=headers)
+
+        zone = r.text.split('/')[-1]
+        region = zone.rsplit('-', 1)[0]
+        return region
+
+    @classmethod
+    def get_bolt_url(cls):
+        """
+        Returns the Bolt URL (BOLT_URL environment variable with '{region}' resolved), resolving it on first use.
+        :return: Bolt URL
+        """
+        if cls._bolt_url is None:
+            with cls._lock:
+                if cls._bolt_url is None:
+                    cls._bolt_url = os.environ.get("BOLT_URL").replace('{region}', cls.get_region())
+        return cls._bolt_url
+
+    @classmethod
+    def new_client(cls, sdk_type, pool_size=None, keep_alive=None, max_retries=None, connect_timeout=None,
+                   read_timeout=None):
+        """
+        Creates a storage client for the given sdkType, with its own HTTP session configured with the given
+        HTTP session parameters (the defaults for those not passed). The client isn't cached, the caller closes it
+        (see close_client) when done with it.
+        :param sdk_type: GS or BOLT
+        :param pool_size: max. no of connections kept open per host
+        :param keep_alive: reuse connections across requests
+        :param max_retries: no of times failed connections / retryable responses are retried by the transport
+        :param connect_timeout: connect timeout (secs)
+        :param read_timeout: read timeout (secs)
+        :return: storage client
+        """
+        http_config = {
+            'pool_size': pool_size,
+            'keep_alive': keep_alive,
+            'max_retries': max_retries,
+            'connect_timeout': connect_timeout,
+            'read_timeout': read_timeout
+        }
+        client_options = {"api_endpoint": cls.get_bolt_url()} if sdk_type == 'BOLT' else None
+        return cls._new_client(client_options=client_options,
+                               **{name: value for name, value in http_config.items() if value is not None})
+
+    @staticmethod
+    def close_client(storage_client):
+        """
+        Closes the HTTP session (and its connections) of a storage client created by new_client.
+        :param storage_client: storage client
+        """
+        storage_client._http.close()
+
+    @classmethod
+    def _new_client(cls, client_options=None, **http_config):
+        """
+        Creates a storage client that uses a BoltHTTPSession with the default HTTP session configuration, updated
+        with http_config.
+        :param client_options: client options
+        :param http_config: HTTP session parameters (see new_client)
+        :return: storage client
+        """
+        credentials, project = google.auth.default(scopes=storage.Client.SCOPE)
+        http_config = dict({'pool_size': cls.POOL_SIZE, 'keep_alive': cls.KEEP_ALIVE, 'max_retries': cls.MAX_RETRIES,
+                            'connect_timeout': cls.CONNECT_TIMEOUT, 'read_timeout': cls.READ_TIMEOUT}, **http_config)
+        http = BoltHTTPSession(credentials, **http_config)
+        client_kwargs = {'project': project} if project else {}
+        return storage.Client(credentials=credentials, _http=http, client_options=client_options, **client_kwargs)
+
+    @classmethod
+    def get_gs_client(cls):
+        """
+        Returns the cached Google storage client, creating it on first use.
+        :return: Google storage client
+        """
+        if cls._gs_storage_client is None:
+            with cls._lock:
+                if cls._gs_storage_client is None:
+                    cls._gs_storage_client = cls._new_client()
+        return cls._gs_storage_client
+
+    @classmethod
+    def get_bolt_client(cls):
+        """
+        Returns the cached Bolt storage client, creating it on first use.
+        :return: Bolt storage client
+        """
+        if cls._bolt_storage_client is None:
+            bolt_url = cls.get_bolt_url()
+            with cls._lock:
+                if cls._bolt_storage_client is None:
+                    client_options = {"api_endpoint": bolt_url}
+                    cls._bolt_storage_client = cls._new_client(client_options=client_options)
+        return cls._bolt_storage_client
+
+    @classmethod
+    def get_client(cls, sdk_type):
+        """
+        Returns the cached storage client for the given sdkType.
+        :param sdk_type: GS or BOLT
+        :return: storage client
+        """
+        if sdk_type == 'BOLT':
+            return cls.get_bolt_client()
+        return cls.get_gs_client()
+
+    @staticmethod
+    def connection_stats(storage_client):
+        """
+        Returns the connection reuse statistics of a storage client's HTTP session.
+        :param storage_client: storage client
+        :return: {'requests', 'new_connections'} or None if the client doesn't use a BoltHTTPSession
+        """
+        http = getattr(storage_client, '_http_internal', None)
+        if isinstance(http, BoltHTTPSession):
+            return http.connection_stats()
+        return None
+
+    @classmethod
+    def invalidate(cls):
+        """
+        Drops the cached clients and Bolt URL. They are re-created on next use.
+        """
+        with cls._lock:
+            cls._bolt_url = None
+            cls._gs_storage_client = None
+            cls._bolt_storage_client = None
+
+    @classmethod
+    def invalidate_on_auth_error(cls, e):
+        """
+        Drops the cached clients if the given exception is an authentication error (invalid / expired
+        credentials), so that the next invocation starts with fresh credentials. Permission errors (403 Forbidden)
+        aren't fixed by new credentials, so the clients (and their warm connections) are kept.
+        :param e: exception raised by a storage operation
+        :return: True if the cache was invalidated
+        """
+        if isinstance(e, (GoogleAuthError, Unauthorized)):
+            cls.invalidate()
+            return True
+        return False
@@ -1,9 +1,13 @@
 import json
-import os
-import gzip
-import hashlib
-import requests
-from google.cloud import storage
+import math
+import base64
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from flask import Response
+from BoltClientCache import BoltClientCache
+from BoltBatch import BoltBatch
+from BoltPartialResponse import BoltPartialResponse
+from BoltStreamingMD5 import BoltStreamingMD5
 
 
 class BoltGSOpsClient:
@@ -12,9 +16,22 @@ class BoltGSOpsClient:
     bolt_gs_ops_handler and bolt_gs_validate_obj_handler.
     """
 
+    # objects are downloaded in chunks of a multiple of this size, when chunkSize is passed in input.
+    CHUNK_SIZE_MULTIPLE = 256 * 1024
+    # no of objects validated in parallel in bulk validation.
+    VALIDATE_CONCURRENCY = 8
+    # object resource fields returned by get_object_md (see _blob_metadata), the only ones requested.
+    METADATA_FIELDS = ['contentEncoding', 'etag', 'md5Hash', 'retentionExpirationTime', 'size', 'storageClass',
+                       'timeCreated', 'updated']
+
     def __init__(self):
         self._storage_client = None
-        self._bolt_url = os.environ.get("BOLT_URL").replace('{region}', self.get_region())
+        # chunk size used to stream objects (None - single streamed request).
+        self._chunk_size = None
+        # validation mode (FULL - download and hash objects, FAST - compare stored hashes first).
+        self._validate_mode = 'FULL'
+        # listing response format (None - JSON document, NDJSON / JSON - streamed as each page arrives).
+        self._stream_format = None
 
     def process_event(self, request):
         """
@@ -47,19 +64,34 @@ class BoltGSOpsClient:
             if 'value' in request_json:
                 value = request_json['value']
 
-        # create an Google/Bolt Storage Client depending on the 'sdkType'.
-        if sdk_type == 'GS':
-            self._storage_client = storage.Client()
-        elif sdk_type == 'BOLT':
-            client_options = {"api_endpoint": self._bolt_url}
-            self._storage_client = storage.Client(client_options=client_options)
+            if 'chunkSize' in request_json:
+                self._chunk_size = int(request_json['chunkSize'])
+
+            # keys of batch operations: a list of keys or the objects under a prefix.
+            object_names = request_json.get('keys')
+            prefix = request_json.get('prefix')
+
+            # listing parameters. A listing is resumed from where it stopped by passing its nextPageToken as pageToken.
+            list_params = {
+                'prefix': prefix,
+                'page_token': request_json.get('pageToken'),
+                'max_results': int(request_json['maxResults']) if 'maxResults' in request_json else None
+            }
+            delimiter = request_json.get('delimiter')
+
+            # listings are streamed (as each page arrives) if stream is NDJSON or JSON.
+            if 'stream' in request_json:
+                self._stream_format = str(request_json['stream']).upper()
+
+        # get the (cached) Google/Bolt Storage Client depending on the 'sdkType'.
+        self._storage_client = BoltClientCache.get_client(sdk_type)
 
         # Perform a GS / Bolt operation based on the input 'requestType'
         try:
             if request_type == "LIST_OBJECTS":
-                return self._list_objects(bucket_name)
+                return self._list_objects(bucket_name, dict(list_params, delimiter=delimiter))
             elif request_type == "LIST_BUCKETS":
-                return self._list_buckets()
+                return self._list_buckets(list_params)
             elif request_type == "GET_BUCKET_MD":
                 return self._get_bucket_metadata(bucket_name)
             elif request_type == "GET_OBJECT_MD":
@@ -70,36 +102,131 @@ class BoltGSOpsClient:
                 return self._download_object(bucket_name,object_name)
             elif request_type == "DELETE_OBJECT":
                 return self._delete_object(bucket_name, object_name)
+            elif request_type == "DELETE_OBJECTS":
+                # a missing (e.g. misspelt) keys / prefix mustn't delete the whole bucket.
+                if object_names is None and not prefix:
+                    raise ValueError("delete_objects needs keys or a non-empty prefix")
+                if object_names is None:
+                    object_names = self._list_object_names(self._storage_client, bucket_name, prefix)
+                return self._delete_objects(bucket_name, object_names)
+            elif request_type == "GET_OBJECTS_MD":
+                if object_names is None:
+                    object_names = self._list_object_names(self._storage_client, bucket_name, prefix)
+                return self._get_objects_metadata(bucket_name, object_names)
         except Exception as e:
+            BoltClientCache.invalidate_on_auth_error(e)
             return {
                 'errorMessage': str(e),
                 'errorCode': str(1)
             }
 
-    def _list_objects(self, bucket_name):
+    def _list_objects(self, bucket_name, list_params):
         """
         Returns a list of objects from the given bucket in Bolt/GS
         :param bucket_name: bucket name
+        :param list_params: prefix, delimiter, page_token, max_results of the listing
         :return: list of objects
         """
-        blobs = self._storage_client.list_blobs(bucket_name)
-        blob_names = []
-        for blob in blobs:
-            blob_names.append(blob.name)
+        # only the object names are requested.
+        blobs = self._storage_client.list_blobs(
+            bucket_name, fields=BoltPartialResponse.list_fields(['name'], 'prefixes', 'nextPageToken'), **list_params)
+        return self._listing_response(blobs, "objects")
 
-        return json.dumps({"objects": blob_names}, indent=4, sort_keys=True)
-
-    def _list_buckets(self):
+    def _list_buckets(self, list_params):
         """
         Returns list of buckets
+        :param list_params: prefix, page_token, max_results of the listing
         :return: list of buckets.
         """
-        buckets = self._storage_client.list_buckets()
-        bucket_names = []
-        for bucket in buckets:
-            bucket_names.append(bucket.name)
+        # only the bucket names are requested.
+        buckets = self._storage_client.list_buckets(
+            fields=BoltPartialResponse.list_fields(['name'], 'nextPageToken'), **list_params)
+        return self._listing_response(buckets, "buckets")
 
-        return json.dumps({"buckets": bucket_names}, indent=4, sort_keys=True)
+    def _listing_response(self, iterator, item_type):
+        """
+        Returns the names of the items listed by iterator, the prefixes (if listed with a delimiter) and the token
+        to resume the listing from (if it stopped at maxResults), as a JSON document or streamed as each page arrives.
+        :param iterator: page iterator of a listing
+        :param item_type: objects / buckets
+        :return: listing
+        """
+        if self._stream_format == 'NDJSON':
+            return Response(self._stream_listing_ndjson(iterator, item_type), mimetype='application/x-ndjson')
+        elif self._stream_format == 'JSON':
+            return Response(self._stream_listing_json(iterator, item_type), mimetype='application/json')
+
+        names = []
+        prefixes = []
+        for page in iterator.pages:
+            names.extend(item.name for item in page)
+            prefixes.extend(getattr(page, 'prefixes', ()))
+
+        listing = {item_type: names}
+        if prefixes:
+            listing['prefixes'] = prefixes
+        if iterator.next_page_token:
+            listing['nextPageToken'] = iterator.next_page_token
+        return json.dumps(listing, indent=4, sort_keys=True)
+
+    @staticmethod
+    def _stream_listing_ndjson(iterator, item_type):
+        """
+        Yields an NDJSON line per listed item ({"name": ...}) and prefix ({"prefix": ...}) as each page arrives,
+        followed by a summary line with the no of items and pages and the token to resume the listing from.
+        If a page can't be listed, an error line with the token to resume from is yielded instead of the summary.
+        :param iterator: page iterator of a listing
+        :param item_type: objects / buckets
+        :return: generator of NDJSON lines (a chunk per page)
+        """
+        item_count = 0
+        page_count = 0
+        try:
+            for page in iterator.pages:
+                lines = [json.dumps({'name': item.name}) + '\n' for item in page]
+                lines.extend(json.dumps({'prefix': prefix}) + '\n' for prefix in getattr(page, 'prefixes', ()))
+                item_count += page.num_items
+                page_count += 1
+                yield ''.join(lines)
+        except Exception as e:
+            BoltClientCache.invalidate_on_auth_error(e)
+            yield json.dumps({'errorMessage': str(e), 'errorCode': str(1),
+                              'nextPageToken': iterator.next_page_token}, sort_keys=True) + '\n'
+            return
+
+        yield json.dumps({'summary': {item_type: item_count, 'pages': page_count,
+                                      'nextPageToken': iterator.next_page_token}}, sort_keys=True) + '\n'
+
+    @staticmethod
+    def _stream_listing_json(iterator, item_type):
+        """
+        Yields a JSON document in chunks: the names of the listed items are written to the item_type array as each
+        page arrives, followed by the prefixes (if listed with a delimiter) and the token to resume the listing from.
+        If a page can't be listed, the document ends with the error and the token to resume from.
+        :param iterator: page iterator of a listing
+        :param item_type: objects / buckets
+        :return: generator of JSON document chunks (a chunk per page)
+        """
+        yield '{' + json.dumps(item_type) + ': ['
+        separator = ''
+        prefixes = []
+        tail = {}
+        try:
+            for page in iterator.pages:
+                names = ', '.join(json.dumps(item.name) for item in page)
+                prefixes.extend(getattr(page, 'prefixes', ()))
+                if names:
+                    yield separator + names
+                    separator = ', '
+        except Exception as e:
+            BoltClientCache.invalidate_on_auth_error(e)
+            tail.update({'errorMessage': str(e), 'errorCode': str(1)})
+
+        if prefixes:
+            tail['prefixes'] = prefixes
+        if iterator.next_page_token:
+            tail['nextPageToken'] = iterator.next_page_token
+        yield '], ' + json.dumps(tail, sort_keys=True)[1:] if tail else ']}'
 
     def _get_bucket_metadata(self, bucket_name):
         """
@@ -123,9 +250,18 @@ class BoltGSOpsClient:
         :param object_name: object name
         :return: object metadata
         """
-        bucket = self._storage_client.bucket(bucket_name)
-        blob = bucket.get_blob(object_name)
+        partial_response = BoltPartialResponse(self._storage_client, self.METADATA_FIELDS)
+        blob = partial_response.get_blob(bucket_name, object_name, not_found_ok=False)[0]
+
+        return self._blob_metadata(blob)
 
+    @staticmethod
+    def _blob_metadata(blob):
+        """
+        Returns the metadata of a blob.
+        :param blob: blob (with its properties loaded)
+        :return: object metadata
+        """
         blob_md = {
             'ContentEncoding': blob.content_encoding,
             'ETag': blob.etag,
@@ -162,21 +298,19 @@ class BoltGSOpsClient:
         """
         Gets the object from Bolt/GS, computes and returns the object's MD5 hash
         If the object is gzip encoded, object is decompressed before computing its MD5.
+        The object is streamed and hashed as it arrives, so memory usage is bounded by the chunk size.
         :param bucket_name: bucket name
         :param object_name: object name
-        :return: md5 hash of the object.
+        :return: md5 hash of the object, bytes processed and throughput.
         """
         bucket = self._storage_client.bucket(bucket_name)
         blob = bucket.get_blob(object_name)
-        blob_data = blob.download_as_bytes()
-
-        if blob.content_encoding == "gzip" or str(object_name).endswith('.gz'):
-            md5 = hashlib.md5(gzip.decompress(blob_data)).hexdigest().upper()
-        else:
-            md5 = hashlib.md5(blob_data).hexdigest().upper()
+        md5, bytes_processed, download_time = self._stream_md5(blob, object_name)
 
         return {
-            'md5': md5
+            'md5': md5,
+            'BytesProcessed': bytes_processed,
+            'Throughput': self._format_throughput(bytes_processed, download_time)
         }
 
     def _delete_object(self, bucket_name, object_name):
@@ -194,28 +328,122 @@ class BoltGSOpsClient:
             'Deleted': 'True'
         }
 
+    def _delete_objects(self, bucket_name, object_names):
+        """
+        Deletes objects from Bolt/GS, using batch requests of up to BoltBatch.MAX_BATCH_SIZE deletes each.
+        :param bucket_name: bucket name
+        :param object_names: object names
+        :return: no of objects deleted, no of batch requests sent and the error of each object that wasn't deleted
+        """
+        bucket = self._storage_client.bucket(bucket_name)
+        deleted = 0
+        batches = 0
+        errors = {}
+        for batch_names in BoltBatch.batches(object_names):
+            batch = BoltBatch(self._storage_client)
+            with batch:
+                for object_name in batch_names:
+                    bucket.delete_blob(object_name)
+            batches += 1
+            for object_name, error in zip(batch_names, batch.errors):
+                if error is None:
+                    deleted += 1
+                else:
+                    errors[object_name] = str(error)
+
+        return {
+            'Deleted': deleted,
+            'Batches': batches,
+            'Errors': errors
+        }
+
+    def _get_objects_metadata(self, bucket_name, object_names):
+        """
+        Retrieves the metadata of objects from Bolt/GS, using batch requests of up to BoltBatch.MAX_BATCH_SIZE
+        metadata requests each.
+        :param bucket_name: bucket name
+        :param object_names: object names
+        :return: metadata of each object, no of batch requests sent and the error of each object whose metadata
+                 couldn't be retrieved
+        """
+        bucket = self._storage_client.bucket(bucket_name)
+        objects_md = {}
+        batches = 0
+        errors = {}
+        for batch_names in BoltBatch.batches(object_names):
+            batch = BoltBatch(self._storage_client)
+            with batch:
+                blobs = [bucket.get_blob(object_name) for object_name in batch_names]
+            batches += 1
+            for object_name, blob, error in zip(batch_names, blobs, batch.errors):
+                if error is None:
+                    objects_md[object_name] = self._blob_metadata(blob)
+                else:
+                    errors[object_name] = str(error)
+
+        return {
+            'Objects': objects_md,
+            'Batches': batches,
+            'Errors': errors
+        }
+
+    def _stream_md5(self, blob, object_name):
+        """
+        Streams the object from Bolt/GS and computes its MD5 hash as the data arrives.
+        If the object is gzip encoded, object is decompressed incrementally before computing its MD5.
+        :param blob: blob to be downloaded
+        :param object_name: object name
+        :return: (md5 hash of the object, no of bytes downloaded, download time)
+        """
+        gzip_encoded = blob.content_encoding == "gzip" or str(object_name).endswith('.gz')
+        if self._chunk_size:
+            # download the object in ranged requests of chunk_size bytes.
+            blob.chunk_size = math.ceil(self._chunk_size / self.CHUNK_SIZE_MULTIPLE) * self.CHUNK_SIZE_MULTIPLE
+        md5_stream = BoltStreamingMD5(gzip_encoded=gzip_encoded, chunk_size=self._chunk_size)
+
+        download_start_time = time.time()
+        # raw_download - get the object as stored (without decompressive transcoding).
+        blob.download_to_file(md5_stream, raw_download=True)
+        download_end_time = time.time()
+
+        return md5_stream.hexdigest(), md5_stream.bytes_processed, download_end_time - download_start_time
+
+    @staticmethod
+    def _format_throughput(bytes_processed, download_time):
+        """
+        Formats download throughput in MB/sec.
+        :param bytes_processed: no of bytes downloaded
+        :param download_time: download time
+        :return: throughput
+        """
+        if download_time <= 0:
+            return "0.00 MB/sec"
+        return "{:.2f} MB/sec".format(bytes_processed / download_time / (1024 * 1024))
+
     @staticmethod
     def get_region():
         """
         Get Deployment region of the function
         :return: region
         """
-        md_zone_url = 'http://metadata.google.internal/computeMetadata/v1/instance/zone'
-        headers = {'Metadata-Flavor': 'Google'}
-        r = requests.get(md_zone_url, headers=headers)
-
-        zone = r.text.split('/')[-1]
-        region = zone.rsplit('-', 1)[0]
-        return region
+        return BoltClientCache.get_region()
 
     def validate_obj_md5(self, request):
         """
         validate_obj_md5 retrieves the object from Bolt and GS (if BucketClean is OFF), computes and
         returns their corresponding MD5 hash. If the object is gzip encoded, object is decompressed before
-        computing its MD5.
+        computing its MD5. Bolt and GS objects are retrieved and hashed concurrently.
+        If mode is FAST, the hashes stored in Bolt and GS object metadata are compared first and the objects are
+        only downloaded if they can't be validated that way.
+
+        If a list of keys or a prefix is passed instead of a key, all those objects are validated using
+        VALIDATE_CONCURRENCY parallel workers and the result is streamed back as NDJSON: one line per object that
+        doesn't match (mismatched, missing or failed), followed by a summary line.
         :param request: request object
         :return: md5s of object retrieved from Bolt and GS
         """
+        object_names = None
+        prefix = None
         request_json = request.get_json()
 
         if request_json:
@@ -230,37 +458,265 @@ class BoltGSOpsClient:
             if 'key' in request_json:
                 object_name = request_json['key']
 
-        gs_storage_client = storage.Client()
-        client_options = {"api_endpoint": self._bolt_url}
-        bolt_storage_client = storage.Client(client_options=client_options)
+            if 'chunkSize' in request_json:
+                self._chunk_size = int(request_json['chunkSize'])
 
-        try:
-            # Get Object from Bolt.
-            bolt_bucket = bolt_storage_client.bucket(bucket_name)
-            bolt_blob = bolt_bucket.get_blob(object_name)
-            bolt_blob_data = bolt_blob.download_as_bytes()
+            if 'keys' in request_json:
+                object_names = request_json['keys']
 
-            # Get Object from GS if bucket clean is off
-            if bucket_clean == 'OFF':
-                gs_bucket = gs_storage_client.bucket(bucket_name)
-                gs_blob = gs_bucket.get_blob(object_name)
-                gs_blob_data = gs_blob.download_as_bytes()
-
-            # Parse the MD5 of the returned object.
-            # If Object is gzip encoded, compute MD5 on the decompressed object.
-            if gs_blob.content_encoding == "gzip" or str(object_name).endswith('.gz'):
-                bolt_md5 = hashlib.md5(gzip.decompress(bolt_blob_data)).hexdigest().upper()
-                gs_md5 = hashlib.md5(gzip.decompress(gs_blob_data)).hexdigest().upper()
-            else:
-                bolt_md5 = hashlib.md5(bolt_blob_data).hexdigest().upper()
-                gs_md5 = hashlib.md5(gs_blob_data).hexdigest().upper()
+            if 'prefix' in request_json:
+                prefix = request_json['prefix']
 
-            return {
-                'gs-md5': gs_md5,
-                'bolt-md5': bolt_md5
-            }
+            if 'mode' in request_json:
+                self._validate_mode = str(request_json['mode']).upper()
+
+            if 'concurrency' in request_json:
+                self.VALIDATE_CONCURRENCY = max(1, int(request_json['concurrency']))
+
+        try:
+            if object_names is not None or prefix is not None:
+                if object_names is None:
+                    # list objects from GS, or from Bolt if bucket clean is on.
+                    if bucket_clean == 'OFF':
+                        storage_client = BoltClientCache.get_gs_client()
+                    else:
+                        storage_client = BoltClientCache.get_bolt_client()
+                    object_names = self._list_object_names(storage_client, bucket_name, prefix)
+                return Response(self._validate_objects(bucket_name, object_names, bucket_clean),
+                                mimetype='application/x-ndjson')
+            return self._validate_object(bucket_name, object_name, bucket_clean)
         except Exception as e:
+            BoltClientCache.invalidate_on_auth_error(e)
             return {
                 'errorMessage': str(e),
                 'errorCode': str(1)
             }
+
+    def _validate_object(self, bucket_name, object_name, bucket_clean):
+        """
+        Retrieves the object from Bolt and GS (if bucket_clean is OFF) concurrently, computing the MD5 of each
+        as it's streamed.
+        In FAST validation mode, the MD5 / CRC32C hashes stored in Bolt and GS object metadata are compared first and
+        the objects are only downloaded if the stored hashes are missing or differ, or the object is gzip encoded.
+        :param bucket_name: bucket name
+        :param object_name: object name
+        :param bucket_clean: ON / OFF
+        :return: md5s, bytes processed, throughput and time taken of object retrieved from Bolt and GS
+        """
+        validate_start_time = time.time()
+        bolt_blob = None
+        gs_blob = None
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            if self._validate_mode == 'FAST' and bucket_clean == 'OFF':
+                # Get Object metadata from Bolt and GS.
+                bolt_future = executor.submit(BoltClientCache.get_bolt_client().bucket(bucket_name).get_blob,
+                                              object_name)
+                gs_future = executor.submit(BoltClientCache.get_gs_client().bucket(bucket_name).get_blob,
+                                            object_name)
+                bolt_blob = bolt_future.result()
+                gs_blob = gs_future.result()
+
+                validation = self._compare_stored_hashes(bolt_blob, gs_blob, object_name)
+                if validation is not None:
+                    validate_end_time = time.time()
+                    validation['time'] = "{:.2f} secs".format(validate_end_time - validate_start_time)
+                    return validation
+
+            # Get Object from Bolt.
+            bolt_future = executor.submit(self._fetch_md5, BoltClientCache.get_bolt_client(), bucket_name,
+                                          object_name, bolt_blob)
+            # Get Object from GS if bucket clean is off
+            if bucket_clean == 'OFF':
+                gs_future = executor.submit(self._fetch_md5, BoltClientCache.get_gs_client(), bucket_name,
+                                            object_name, gs_blob)
+            bolt_md5, bolt_bytes_processed, bolt_download_time = bolt_future.result()
+            if bucket_clean == 'OFF':
+                gs_md5, gs_bytes_processed, gs_download_time = gs_future.result()
+        validate_end_time = time.time()
+
+        validation = {
+            'method': 'download',
+            'bolt-md5': bolt_md5,
+            'bolt-bytes-processed': bolt_bytes_processed,
+            'bolt-throughput': self._format_throughput(bolt_bytes_processed, bolt_download_time),
+            'bolt-time': "{:.2f} secs".format(bolt_download_time),
+            'time': "{:.2f} secs".format(validate_end_time - validate_start_time)
+        }
+        if bucket_clean == 'OFF':
+            validation.update({
+                'gs-md5': gs_md5,
+                'gs-bytes-processed': gs_bytes_processed,
+                'gs-throughput': self._format_throughput(gs_bytes_processed, gs_download_time),
+                'gs-time': "{:.2f} secs".format(gs_download_time)
+            })
+        return validation
+
+    def _compare_stored_hashes(self, bolt_blob, gs_blob, object_name):
+        """
+        Compares the MD5 (and CRC32C, if reported by both) hashes stored in Bolt and GS object metadata.
+        :param bolt_blob: Bolt blob (None, if not found)
+        :param gs_blob: GS blob (None, if not found)
+        :param object_name: object name
+        :return: validation result, or None if the objects need to be downloaded to be validated
+                 (stored hashes missing or differ, or object is gzip encoded)
+        """
+        if bolt_blob is not None and gs_blob is not None:
+            if bolt_blob.content_encoding == "gzip" or gs_blob.content_encoding == "gzip" or\
+                    str(object_name).endswith('.gz'):
+                return None
+            if not bolt_blob.md5_hash or bolt_blob.md5_hash != gs_blob.md5_hash:
+                return None
+            if bolt_blob.crc32c and gs_blob.crc32c and bolt_blob.crc32c != gs_blob.crc32c:
+                return None
+
+        return {
+            'method': 'metadata',
+            'bolt-md5': self._stored_md5(bolt_blob),
+            'bolt-crc32c': bolt_blob.crc32c if bolt_blob is not None else None,
+            'bolt-bytes-processed': 0,
+            'gs-md5': self._stored_md5(gs_blob),
+            'gs-crc32c': gs_blob.crc32c if gs_blob is not None else None,
+            'gs-bytes-processed': 0
+        }
+
+    @staticmethod
+    def _stored_md5(blob):
+        """
+        Returns the MD5 hash stored in the object metadata, in the same format as the computed MD5 hashes.
+        :param blob: blob (None, if not found)
+        :return: md5 hash (upper case hex), or None
+        """
+        if blob is None or not blob.md5_hash:
+            return None
+        return base64.b64decode(blob.md5_hash).hex().upper()
+
+    def _fetch_md5(self, storage_client, bucket_name, object_name, blob=None):
+        """
+        Gets the object from Bolt/GS and computes its MD5 as it's streamed.
+        If Object is gzip encoded, MD5 is computed on the decompressed object.
+        :param storage_client: Bolt / GS storage client
+        :param bucket_name: bucket name
+        :param object_name: object name
+        :param blob: blob, if its metadata was already retrieved
+        :return: (md5 hash of the object (None, if not found), no of bytes downloaded, time taken to get and hash
+                 the object)
+        """
+        fetch_start_time = time.time()
+        if blob is None:
+            bucket = storage_client.bucket(bucket_name)
+            blob = bucket.get_blob(object_name)
+        if blob is None:
+            # object not found.
+            return None, 0, time.time() - fetch_start_time
+        md5, bytes_processed, download_time = self._stream_md5(blob, object_name)
+        fetch_end_time = time.time()
+        return md5, bytes_processed, fetch_end_time - fetch_start_time
+
+    def _validate_objects(self, bucket_name, object_names, bucket_clean):
+        """
+        Validates the given objects using VALIDATE_CONCURRENCY parallel workers, yielding an NDJSON line for each
+        object that's mismatched, missing (in Bolt or GS) or couldn't be validated, followed by a summary line.
+        If the objects can't be listed, an error line is yielded before the summary (of the objects validated so far).
+        If bucket_clean is ON, objects are only retrieved from Bolt and every object found is counted as matched.
+        :param bucket_name: bucket name
+        :param object_names: iterable of object names
+        :param bucket_clean: ON / OFF
+        :return: generator of NDJSON lines
+        """
+        summary = {
+            'metadata-verified': 0,
+            'matched': 0,
+            'mismatched': 0,
+            'missing': 0,
+            'errors': 0,
+            'bytes-verified': 0
+        }
+        validate_start_time = time.time()
+        try:
+            for object_name, validation, error in self._bounded_map(
+                    lambda name: self._validate_object(bucket_name, name, bucket_clean),
+                    object_names, self.VALIDATE_CONCURRENCY):
+                if error is not None:
+                    BoltClientCache.invalidate_on_auth_error(error)
+                    summary['errors'] += 1
+                    yield json.dumps({'key': object_name, 'status': 'error', 'errorMessage': str(error)}) + '\n'
+                    continue
+
+                summary['bytes-verified'] += (validation['bolt-bytes-processed'] +
+                                              validation.get('gs-bytes-processed', 0))
+                if validation['bolt-md5'] is None or ('gs-md5' in validation and validation['gs-md5'] is None):
+                    status = 'missing'
+                elif bucket_clean == 'OFF' and validation['bolt-md5'] != validation['gs-md5']:
+                    status = 'mismatched'
+                else:
+                    summary['matched'] += 1
+                    if validation['method'] == 'metadata':
+                        summary['metadata-verified'] += 1
+                    continue
+                summary[status] += 1
+                validation.update({'key': object_name, 'status': status})
+                yield json.dumps(validation, sort_keys=True) + '\n'
+        except Exception as e:
+            # the objects (listing) couldn't be retrieved: the stream ends with an error line and the partial summary.
+            BoltClientCache.invalidate_on_auth_error(e)
+            yield json.dumps({'errorMessage': str(e), 'errorCode': str(1)}, sort_keys=True) + '\n'
+        validate_end_time = time.time()
+
+        validate_time = validate_end_time - validate_start_time
+        object_count = summary['matched'] + summary['mismatched'] + summary['missing'] + summary['errors']
+        summary.update({
+            'objects': object_count,
+            'time': "{:.2f} secs".format(validate_time),
+            'throughput': self._format_throughput(summary['bytes-verified'], validate_time),
+            'objects-throughput': "{:.2f} objects/sec".format(object_count / validate_time if validate_time > 0
+                                                               else 0)
+        })
+        yield json.dumps({'summary': summary}, sort_keys=True) + '\n'
+
+    @staticmethod
+    def _bounded_map(fn, items, concurrency):
+        """
+        Applies fn to each item using a pool of concurrency worker threads, consuming items lazily so that
+        at most concurrency items are in flight at a time. Results are yielded as they complete.
+        If items raises (e.g. a listing page can't be fetched), the items in flight are finished and yielded first,
+        then the error is raised.
+        :param fn: function to apply
+        :param items: iterable of items
+        :param concurrency: max. no of items in flight
+        :return: generator of (item, result, exception raised by fn or None)
+        """
+        items = iter(items)
+        items_error = None
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            in_flight = {}
+            while True:
+                # top up the pool.
+                if items_error is None:
+                    try:
+                        for item in items:
+                            in_flight[executor.submit(fn, item)] = item
+                            if len(in_flight) >= concurrency:
+                                break
+                    except Exception as e:
+                        items_error = e
+                if not in_flight:
+                    break
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    item = in_flight.pop(future)
+                    error = future.exception()
+                    yield item, None if error else future.result(), error
+        if items_error is not None:
+            raise items_error
+
+    @staticmethod
+    def _list_object_names(storage_client, bucket_name, prefix):
+        """
+        Lists the names of objects under the given prefix, page by page as they're consumed.
+        :param storage_client: Bolt / GS storage client
+        :param bucket_name: bucket name
+        :param prefix: prefix
+        :return: generator of object names
+        """
+        for blob in storage_client.list_blobs(bucket_name, prefix=prefix):
+            yield blob.name
@@ -1,13 +1,29 @@
-import os
 import time
+import asyncio
 import random
-import string
 import json
 import math
+import itertools
+import threading
+import requests
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from functools import partial
 from statistics import mean
 from statistics import median_low
-from google.cloud import storage
-from BoltGSOpsClient import BoltGSOpsClient
+from urllib.parse import quote
+from google.api_core.exceptions import RequestRangeNotSatisfiable, NotFound
+from google.auth.transport.requests import Request
+from google.oauth2 import id_token
+from google.resumable_media.requests import ResumableUpload
+from BoltClientCache import BoltClientCache
+from BoltPerfHistogram import BoltPerfHistogram
+from BoltPayloadGenerator import BoltPayloadGenerator
+from BoltObjectSizeDistribution import BoltObjectSizeDistribution
+from BoltPayloadStream import BoltPayloadStream
+from BoltBatch import BoltBatch
+from BoltPartialResponse import BoltPartialResponse
+from BoltAsyncEngine import BoltAsyncEngine
+from BoltMediaBlob import BoltMediaBlob
 
 
 class BoltGSPerf:
@@ -17,36 +33,151 @@ class BoltGSPerf:
     """
 
     # constants for PUT/DELETE Object Perf
-    # max. no of keys to be used in
+    # max. no of keys to be used in (None - no limit, durationSecs bounds the run)
     NUM_KEYS = 1000
+    # max. time (secs) each benchmark phase runs for (None - until the keys are exhausted)
+    DURATION_SECS = None
+    # object ('gs://<bucket>/<object>' or name of an object in the bucket) listing the keys to be used, one per line
+    KEY_MANIFEST = None
+    # size of the ranges the key manifest is read in
+    KEY_MANIFEST_CHUNK_SIZE = 1024 * 1024
     # length of object data
     OBJ_LENGTH = 100
+    # distribution of the size of uploaded objects (see BoltObjectSizeDistribution), if not OBJ_LENGTH
+    OBJ_SIZE_DIST = None
+    # ranged downloads: PARALLEL - each object is split into NUM_RANGES ranges, RANDOM - NUM_RANGES ranges of
+    # RANGE_SIZE bytes at random offsets are read from each object. Ranges of an object are fetched concurrently.
+    RANGE_MODE = None
+    NUM_RANGES = 8
+    RANGE_SIZE = 64 * 1024
+    # no of deletes per batch request of the batched Delete Object Perf
+    BATCH_SIZE = BoltBatch.MAX_BATCH_SIZE
+    # constants for large (chunked / resumable) Object Upload Perf
+    # no of keys, length of object data (used unless numKeys / objLength / objSizeDist are passed)
+    LARGE_NUM_KEYS = 10
+    LARGE_OBJ_LENGTH = 64 * 1024 * 1024
+    # prefix of the generated key names (large objects get their own, so other benchmarks don't pick them up)
+    KEY_PREFIX = 'bolt-gs-perf'
+    LARGE_KEY_PREFIX = 'bolt-gs-perf-large'
+    # chunk sizes the objects are uploaded with (each must be a multiple of CHUNK_SIZE_MULTIPLE)
+    CHUNK_SIZES = [8 * 1024 * 1024]
+    CHUNK_SIZE_MULTIPLE = 256 * 1024
+    # JSON API URL resumable uploads are initiated at ({API base URL}, {bucket name})
+    RESUMABLE_UPLOAD_URL = '{}/upload/storage/v1/b/{}/o?uploadType=resumable'
+    # type of object data (see BoltPayloadGenerator): TEXT, RANDOM (incompressible) or COMPRESSIBLE
+    PAYLOAD_TYPE = 'TEXT'
+    # no of times objects are listed
+    NUM_LIST_ITER = 10
+    # max. no of objects per list objects page
+    LIST_PAGE_SIZE = 1000
+    # max. no of pages per listing (0 - list all pages)
+    LIST_MAX_PAGES = 1
+    # prefix / delimiter used to list objects
+    LIST_PREFIX = None
+    LIST_DELIMITER = None
+    # no of parallel workers used per benchmark phase
+    CONCURRENCY = 1
+    # open loop: ops are started at TARGET_RPS ops/sec (per benchmark phase) regardless of how long earlier ops take,
+    # with latencies measured from the time each op was due (None - closed loop, each worker starts its next op
+    # when the previous one completes)
+    TARGET_RPS = None
+    # request types that can be run open loop
+    OPEN_LOOP_REQUEST_TYPES = ["UPLOAD_OBJECT", "DOWNLOAD_OBJECT", "DOWNLOAD_OBJECT_TTFB",
+                               "DOWNLOAD_OBJECT_PASSTHROUGH", "DOWNLOAD_OBJECT_PASSTHROUGH_TTFB", "DELETE_OBJECT"]
+    # engine the benchmark operations are run by: THREADS - storage clients called from CONCURRENCY threads,
+    # ASYNCIO - coroutines (see BoltAsyncEngine), up to CONCURRENCY in flight
+    ENGINE = 'THREADS'
+    # request types supported by the ASYNCIO engine
+    ASYNC_REQUEST_TYPES = ["LIST_OBJECTS", "DOWNLOAD_OBJECT", "DOWNLOAD_OBJECT_TTFB", "DOWNLOAD_OBJECT_PASSTHROUGH",
+                           "DOWNLOAD_OBJECT_PASSTHROUGH_TTFB", "UPLOAD_OBJECT", "DELETE_OBJECT", "ALL",
+                           "SATURATION_SWEEP"]
+    # source of object metadata (size, content encoding) in download benchmarks:
+    # LISTING - listed objects (falls back to GET_BLOB for keys that weren't listed), GET_BLOB - separate metadata
+    # request per object, NONE - no metadata.
+    METADATA_SOURCE = 'LISTING'
+    # object resource fields requested by listings / metadata requests, besides the fields used by the benchmark
+    # (ALL - full object resources)
+    FIELDS = []
+    # max. concurrency level of the saturation sweep
+    MAX_CONCURRENCY = 16
+    # p99 growth (relative to concurrency 1) that marks the knee of a saturation sweep curve
+    KNEE_FACTOR = 2.0
+    # no of workers the keys are sharded across (distributed run)
+    WORKERS = 1
+    # URLs of the bolt_gs_perf_handler functions used as workers (in-process workers, if empty)
+    WORKER_URLS = []
+    # timeout (secs) of the benchmark requests sent to the workers at WORKER_URLS
+    WORKER_TIMEOUT = 540.0
+    # shard of the keys to be used (every KEY_SHARDS'th key, starting at KEY_SHARD). Listed keys of a distributed
+    # run are sharded by listing page instead (see _list_key_pages).
+    KEY_SHARD = 0
+    KEY_SHARDS = 1
+    # return serialized, mergeable statistics instead of formatted ones
+    RAW_STATS = False
+    # request types that can be run by workers of a distributed run
+    DISTRIBUTED_REQUEST_TYPES = ["UPLOAD_OBJECT", "DOWNLOAD_OBJECT", "DOWNLOAD_OBJECT_TTFB",
+                                 "DOWNLOAD_OBJECT_PASSTHROUGH", "DOWNLOAD_OBJECT_PASSTHROUGH_TTFB", "DELETE_OBJECT"]
 
     def __init__(self):
-        # create google storage client.
-        self._gs_storage_client = storage.Client()
-        # create bolt storage client.
-        self._bolt_url = os.environ.get("BOLT_URL").replace('{region}', BoltGSOpsClient.get_region())
-        client_options = {"api_endpoint": self._bolt_url}
-        self._bolt_storage_client = storage.Client(client_options=client_options)
-        # list of keys to be used in Ops.
-        self._keys = None
+        # get (cached) google storage client.
+        self._gs_storage_client = BoltClientCache.get_gs_client()
+        # get (cached) bolt storage client.
+        self._bolt_storage_client = BoltClientCache.get_bolt_client()
+        # returns a (fresh) iterator of the keys to be used in Ops.
+        self._key_source = None
+        # size and content encoding of listed keys, until they are used.
+        self._key_md = {}
         # request type
         self._request_type = None
-        # Bolt/GS Ops latencies
-        self._bolt_op_times = []
-        self._gs_op_times = []
+        # parsed JSON request
+        self._request_json = None
+        # object data / object sizes of uploads
+        self._payload_generator = None
+        self._obj_size_dist = None
+        # Bolt/GS Ops latencies (nanoseconds)
+        self._bolt_op_times = BoltPerfHistogram()
+        self._gs_op_times = BoltPerfHistogram()
         # Bolt/GS Ops throughput
         self._bolt_op_tp = []
         self._gs_op_tp = []
         # Bolt/GS Obj sizes
-        self._bolt_obj_sizes = []
-        self._gs_obj_sizes = []
+        self._bolt_obj_sizes = BoltPerfHistogram()
+        self._gs_obj_sizes = BoltPerfHistogram()
+        # Bolt/GS Ops latencies / Obj sizes by size class
+        self._bolt_size_classes = {}
+        self._gs_size_classes = {}
+        # Bolt/GS range latencies / sizes of ranged downloads
+        self._bolt_range_stats = (BoltPerfHistogram(), BoltPerfHistogram())
+        self._gs_range_stats = (BoltPerfHistogram(), BoltPerfHistogram())
+        # Bolt/GS delays (nanoseconds) of op starts past their due times, in open loop runs
+        self._bolt_schedule_lags = BoltPerfHistogram()
+        self._gs_schedule_lags = BoltPerfHistogram()
+        # fetches the ranges of ranged downloads
+        self._range_executor = None
+        # runs the benchmark operations, if ENGINE is ASYNCIO
+        self._async_engine = None
+        # connection reuse statistics of the GS / Bolt HTTP sessions at the start of the request and,
+        # for HTTP workers, as reported by the workers.
+        self._connection_stats_start = {}
+        self._worker_connection_stats = {}
+        # HTTP session parameters of the request
+        self._http_config = {}
+        # whether the GS / Bolt clients are the benchmark's own (see _configure_http), rather than the cached ones
+        self._own_clients = False
         # Bolt/GS object counts (compressed, uncompressed).
         self._gs_cmp_obj_count = 0
         self._gs_uncmp_obj_count = 0
         self._bolt_cmp_obj_count = 0
         self._bolt_uncmp_obj_count = 0
+        # Bolt/GS no of metadata requests made by download benchmarks.
+        self._gs_metadata_requests = 0
+        self._bolt_metadata_requests = 0
+        # Bolt/GS no of objects delete benchmarks found not to exist.
+        self._gs_not_found_count = 0
+        self._bolt_not_found_count = 0
+        # Bolt/GS elapsed wall time (secs) of the benchmark phases.
+        self._gs_wall_time = 0
+        self._bolt_wall_time = 0
 
     def process_event(self, request):
         """
@@ -60,7 +191,18 @@ class BoltGSPerf:
         # Parse JSON Request.
         request_json = request.get_json()
 
+        return self._process_request_json(request_json)
+
+    def _process_request_json(self, request_json):
+        """
+        Runs performance testing against Bolt/GS based on the parameters of a JSON request.
+
+        :param request_json: parsed JSON request
+        :return: performance statistics
+        """
         if request_json:
+            self._request_json = request_json
+
             if 'bucket' in request_json:
                 bucket_name = request_json['bucket']
 
@@ -70,28 +212,140 @@ class BoltGSPerf:
                 self._request_type = 'ALL'
 
             # update max. no of keys and object data length, if passed in input.
+            if self._request_type == "UPLOAD_OBJECT_LARGE":
+                self.NUM_KEYS = self.LARGE_NUM_KEYS
+                self.OBJ_LENGTH = self.LARGE_OBJ_LENGTH
             if 'numKeys' in request_json:
                 self.NUM_KEYS = int(request_json['numKeys'])
-                if self.NUM_KEYS > 1000:
-                    self.NUM_KEYS = 1000
+            if 'durationSecs' in request_json:
+                self.DURATION_SECS = float(request_json['durationSecs'])
+                if 'numKeys' not in request_json:
+                    self.NUM_KEYS = None
+            if 'keyManifest' in request_json:
+                self.KEY_MANIFEST = request_json['keyManifest']
             if 'objLength' in request_json:
                 self.OBJ_LENGTH = int(request_json['objLength'])
+            if 'objSizeDist' in request_json:
+                self.OBJ_SIZE_DIST = request_json['objSizeDist']
+            if 'payloadType' in request_json:
+                self.PAYLOAD_TYPE = str(request_json['payloadType']).upper()
+            # update ranged download parameters, if passed in input.
+            if 'rangeMode' in request_json:
+                self.RANGE_MODE = str(request_json['rangeMode']).upper()
+            if 'numRanges' in request_json:
+                self.NUM_RANGES = max(1, int(request_json['numRanges']))
+            if 'rangeSize' in request_json:
+                self.RANGE_SIZE = max(1, int(request_json['rangeSize']))
+            # update HTTP session parameters, if passed in input.
+            self._http_config = {}
+            for param_name, config_name, param_type in [('poolSize', 'pool_size', int),
+                                                        ('keepAlive', 'keep_alive', self._parse_bool),
+                                                        ('maxRetries', 'max_retries', int),
+                                                        ('connectTimeout', 'connect_timeout', float),
+                                                        ('readTimeout', 'read_timeout', float)]:
+                if param_name in request_json:
+                    self._http_config[config_name] = param_type(request_json[param_name])
+            if 'batchSize' in request_json:
+                self.BATCH_SIZE = min(max(1, int(request_json['batchSize'])), BoltBatch.MAX_BATCH_SIZE)
+            if 'chunkSize' in request_json:
+                chunk_sizes = request_json['chunkSize']
+                if not isinstance(chunk_sizes, list):
+                    chunk_sizes = [chunk_sizes]
+                # round chunk sizes up to a multiple of 256KB, as required by resumable uploads.
+                self.CHUNK_SIZES = [math.ceil(int(chunk_size) / self.CHUNK_SIZE_MULTIPLE) * self.CHUNK_SIZE_MULTIPLE
+                                    for chunk_size in chunk_sizes]
+            # update listing parameters, if passed in input.
+            if 'numIter' in request_json:
+                self.NUM_LIST_ITER = max(1, int(request_json['numIter']))
+            if 'maxResults' in request_json:
+                self.LIST_PAGE_SIZE = int(request_json['maxResults'])
+            if 'maxPages' in request_json:
+                self.LIST_MAX_PAGES = int(request_json['maxPages'])
+            if 'prefix' in request_json:
+                self.LIST_PREFIX = request_json['prefix']
+            if 'delimiter' in request_json:
+                self.LIST_DELIMITER = request_json['delimiter']
+            if 'concurrency' in request_json:
+                self.CONCURRENCY = max(1, int(request_json['concurrency']))
+            if 'targetRps' in request_json:
+                self.TARGET_RPS = float(request_json['targetRps'])
+            if 'engine' in request_json:
+                self.ENGINE = str(request_json['engine']).upper()
+            if 'metadataSource' in request_json:
+                self.METADATA_SOURCE = str(request_json['metadataSource']).upper()
+            if 'fields' in request_json:
+                fields = request_json['fields']
+                if isinstance(fields, str):
+                    # all, or a comma separated list of fields e.g. "size,etag".
+                    fields = 'ALL' if fields.strip().upper() == 'ALL' else [
+                        field.strip() for field in fields.split(',') if field.strip()]
+                self.FIELDS = fields
+            if 'maxConcurrency' in request_json:
+                self.MAX_CONCURRENCY = max(1, int(request_json['maxConcurrency']))
+            if 'kneeFactor' in request_json:
+                self.KNEE_FACTOR = float(request_json['kneeFactor'])
+            # update distributed run parameters, if passed in input.
+            if 'workers' in request_json:
+                self.WORKERS = max(1, int(request_json['workers']))
+            if 'workerUrls' in request_json:
+                self.WORKER_URLS = request_json['workerUrls']
+            if 'workerTimeout' in request_json:
+                self.WORKER_TIMEOUT = float(request_json['workerTimeout'])
+            if 'keyShards' in request_json:
+                self.KEY_SHARDS = max(1, int(request_json['keyShards']))
+                self.KEY_SHARD = int(request_json.get('keyShard', 0))
+            if 'rawStats' in request_json:
+                self.RAW_STATS = self._parse_bool(request_json['rawStats'])
 
-            # if keys not passed as in input:
+            # if keys not passed as in input, read them from the key manifest, if any. Otherwise:
             # if DOWNLOAD_OBJECT or DOWNLOAD_OBJECT_PASSTHROUGH, list objects (up to NUM_KEYS) to get key names
             # otherwise generate key names.
+            # keys are produced lazily, each benchmark phase iterates over a fresh key source.
             if 'keys' in request_json:
-                self._keys = request_json['keys']
+                self._key_source = partial(iter, request_json['keys'])
+            elif self.KEY_MANIFEST:
+                self._key_source = partial(self._read_key_manifest, request_json['bucket'])
+            elif 'keyPages' in request_json:
+                self._key_source = partial(self._list_key_pages_objects, request_json['bucket'],
+                                           request_json['keyPages'])
             elif self._request_type == "DOWNLOAD_OBJECT" or self._request_type == "DOWNLOAD_OBJECT_PASSTHROUGH" or\
                     self._request_type == "DOWNLOAD_OBJECT_TTFB" or\
                     self._request_type == "DOWNLOAD_OBJECT_PASSTHROUGH_TTFB":
-                self._keys = self._list_objects(request_json['bucket'])
+                self._key_source = partial(self._list_objects, request_json['bucket'])
             else:
-                self._keys = self._generate_key_names(self.NUM_KEYS)
+                key_prefix = self.LARGE_KEY_PREFIX if self._request_type == "UPLOAD_OBJECT_LARGE" else self.KEY_PREFIX
+                self._key_source = partial(self._generate_key_names, self.NUM_KEYS, key_prefix)
 
         # Perform Perf tests based on input 'requestType'
         try:
-            if self._request_type == "LIST_OBJECTS":
+            if self.ENGINE not in ('THREADS', 'ASYNCIO'):
+                raise ValueError("Invalid engine: {}".format(self.ENGINE.lower()))
+            if self.ENGINE == 'ASYNCIO' and self._request_type not in self.ASYNC_REQUEST_TYPES:
+                raise ValueError("requestType {} isn't supported by the asyncio engine".format(
+                    self._request_type.lower()))
+            if self.FIELDS != 'ALL' and not (isinstance(self.FIELDS, list) and
+                                             all(isinstance(field, str) for field in self.FIELDS)):
+                raise ValueError("Invalid fields: {}".format(self.FIELDS))
+            if self.TARGET_RPS is not None:
+                if self.TARGET_RPS <= 0:
+                    raise ValueError("Invalid targetRps: {}".format(self.TARGET_RPS))
+                if self._request_type not in self.OPEN_LOOP_REQUEST_TYPES:
+                    raise ValueError("requestType {} can't be run at a target rate".format(
+                        self._request_type.lower()))
+            if self.RANGE_MODE:
+                if self.RANGE_MODE not in ('PARALLEL', 'RANDOM'):
+                    raise ValueError("Invalid rangeMode: {}".format(self.RANGE_MODE.lower()))
+                if self.METADATA_SOURCE == 'NONE':
+                    raise ValueError("ranged downloads need object sizes, metadataSource can't be none")
+            self._configure_http()
+            self._payload_generator = BoltPayloadGenerator(self.PAYLOAD_TYPE)
+            if self.OBJ_SIZE_DIST:
+                self._obj_size_dist = BoltObjectSizeDistribution.from_dict(self.OBJ_SIZE_DIST)
+            else:
+                self._obj_size_dist = BoltObjectSizeDistribution(sizes=[self.OBJ_LENGTH])
+            if self.WORKERS > 1:
+                return self._distributed_perf(bucket_name)
+            elif self._request_type == "LIST_OBJECTS":
                 return self._list_objects_perf(bucket_name)
             elif self._request_type == "DOWNLOAD_OBJECT" or self._request_type == "DOWNLOAD_OBJECT_TTFB":
                 return self._download_object_perf(bucket_name)
@@ -100,129 +354,336 @@ class BoltGSPerf:
                 return self._download_object_passthrough_perf(bucket_name)
             elif self._request_type == "UPLOAD_OBJECT":
                 return self._upload_object_perf(bucket_name)
+            elif self._request_type == "UPLOAD_OBJECT_LARGE":
+                return self._upload_object_large_perf(bucket_name)
             elif self._request_type == "DELETE_OBJECT":
                 return self._delete_object_perf(bucket_name)
+            elif self._request_type == "DELETE_OBJECT_BATCH":
+                return self._delete_object_batch_perf(bucket_name)
             elif self._request_type == "ALL":
                 return self._all_perf(bucket_name)
+            elif self._request_type == "SATURATION_SWEEP":
+                return self._saturation_sweep_perf(bucket_name)
         except Exception as e:
+            BoltClientCache.invalidate_on_auth_error(e)
             return {
                 'errorMessage': str(e),
                 'errorCode': str(1)
             }
+        finally:
+            if self._range_executor is not None:
+                self._range_executor.shutdown()
+            if self._async_engine is not None:
+                self._async_engine.close()
+            if self._own_clients:
+                BoltClientCache.close_client(self._gs_storage_client)
+                BoltClientCache.close_client(self._bolt_storage_client)
+
+    @staticmethod
+    def _parse_bool(value):
+        """
+        Parses a boolean request parameter, passed as a JSON boolean or a string e.g. "false", "0".
+
+        :param value: parameter value
+        :return: True if value is true, 1 or "true" / "1" / "yes" (in any case)
+        """
+        return str(value).lower() in ('true', '1', 'yes')
 
-    def _list_objects_perf(self, bucket_name, num_iter=10):
+    def _configure_http(self):
+        """
+        Applies the HTTP session parameters of the request: unless none are passed and the default connection pool
+        is large enough for the max. no of concurrent requests of the benchmark, the benchmark gets its own GS / Bolt
+        clients, with HTTP sessions configured as requested (and a pool grown to the max. no of concurrent
+        requests, unless poolSize is passed). They are closed at the end of the request, the (cached) clients
+        shared with other requests keep their default configuration.
+        The ranges of ranged downloads (THREADS engine) are fetched by a pool of threads sized for the max. no of
+        concurrent requests as well.
+        """
+        http_config = dict(self._http_config)
+        max_concurrency = self.MAX_CONCURRENCY if self._request_type == "SATURATION_SWEEP" else self.CONCURRENCY
+        if self.RANGE_MODE:
+            max_concurrency *= self.NUM_RANGES
+        if 'pool_size' not in http_config and max_concurrency > BoltClientCache.POOL_SIZE:
+            http_config['pool_size'] = max_concurrency
+        if self.RANGE_MODE and self.ENGINE == 'THREADS':
+            self._range_executor = ThreadPoolExecutor(max_workers=max_concurrency)
+        # the workers of a distributed run (rawStats) create their own clients, so that the connection statistics
+        # of in-process workers don't overlap.
+        if (http_config or self.RAW_STATS) and self.WORKERS == 1:
+            self._gs_storage_client = BoltClientCache.new_client('GS', **http_config)
+            self._bolt_storage_client = BoltClientCache.new_client('BOLT', **http_config)
+            self._own_clients = True
+        if self.ENGINE == 'ASYNCIO':
+            # a single connection pool (shared by GS and Bolt, which are benchmarked in turn) of the max. no of
+            # concurrent requests of the benchmark, unless poolSize is passed.
+            self._async_engine = BoltAsyncEngine(
+                pool_size=http_config.get('pool_size', max_concurrency),
+                keep_alive=http_config.get('keep_alive', BoltClientCache.KEEP_ALIVE),
+                connect_timeout=http_config.get('connect_timeout', BoltClientCache.CONNECT_TIMEOUT),
+                read_timeout=http_config.get('read_timeout', BoltClientCache.READ_TIMEOUT))
+        self._connection_stats_start = self._connection_stats()
+
+    def _connection_stats(self):
+        """
+        :return: connection reuse statistics (since they were created) of the GS / Bolt HTTP sessions
+        """
+        connection_stats = {}
+        for client_name, storage_client in [('gs', self._gs_storage_client), ('bolt', self._bolt_storage_client)]:
+            if self._async_engine is not None:
+                client_connection_stats = self._async_engine.connection_stats(storage_client)
+            else:
+                client_connection_stats = BoltClientCache.connection_stats(storage_client)
+            if client_connection_stats is not None:
+                connection_stats[client_name] = client_connection_stats
+        return connection_stats
+
+    def _connection_stats_delta(self):
+        """
+        :return: connection reuse statistics of the GS / Bolt HTTP sessions since the start of the request
+        """
+        connection_stats = self._connection_stats()
+        for client_name, client_connection_stats in connection_stats.items():
+            for stat_name, stat_value in self._connection_stats_start.get(client_name, {}).items():
+                client_connection_stats[stat_name] -= stat_value
+        return connection_stats
+
+    def _connection_perf_stats(self):
+        """
+        Computes the connection reuse statistics of the request: requests served, new connections opened and the
+        percentage of requests served over an existing connection.
+
+        :return: {gs|bolt}_connection_stats statistics
+        """
+        if self.WORKERS > 1:
+            connection_stats = self._worker_connection_stats
+        else:
+            connection_stats = self._connection_stats_delta()
+        connection_perf_stats = {}
+        for client_name, client_connection_stats in connection_stats.items():
+            requests_served = client_connection_stats['requests']
+            new_connections = client_connection_stats['new_connections']
+            connection_perf_stats['{}_connection_stats'.format(client_name)] = {
+                'requests': requests_served,
+                'new_connections': new_connections,
+                'reused': "{:.2f}%".format(max(0, requests_served - new_connections) / requests_served * 100
+                                           if requests_served else 0)
+            }
+        return connection_perf_stats
+
+    def _list_objects_perf(self, bucket_name):
         """
         Measures the List Objects performance (latency, throughput) of Bolt / GS.
+        Objects are listed NUM_LIST_ITER times, each time fetching up to LIST_MAX_PAGES pages (all pages, if 0) of
+        LIST_PAGE_SIZE objects. Every page fetch (HTTP request and parsing of its items) is timed individually.
 
         :param bucket_name: bucket name
-        :param num_iter: number of iterations
         :return: List Objects performance statistics.
         """
+        gs_first_page_times = BoltPerfHistogram()
+        gs_list_times = []
+        gs_obj_count = 0
+        gs_prefix_count = 0
+        bolt_first_page_times = BoltPerfHistogram()
+        bolt_list_times = []
+        bolt_obj_count = 0
+        bolt_prefix_count = 0
+        # time spent parsing the listed pages and size of the responses
+        gs_parse_times = BoltPerfHistogram()
+        gs_response_sizes = BoltPerfHistogram()
+        bolt_parse_times = BoltPerfHistogram()
+        bolt_response_sizes = BoltPerfHistogram()
+
+        for x in range(self.NUM_LIST_ITER):
+            # list objects from GS.
+            page_times, page_obj_counts, prefix_count, list_time = self._list_pages(
+                self._gs_storage_client, bucket_name, gs_parse_times, gs_response_sizes)
+            self._gs_op_times.extend(page_times)
+            self._gs_op_tp.extend([count / (page_time / 1e9) for count, page_time in zip(page_obj_counts, page_times)])
+            gs_first_page_times.record(page_times[0])
+            gs_list_times.append(list_time)
+            gs_obj_count += sum(page_obj_counts)
+            gs_prefix_count += prefix_count
 
-        # list 1000 objects from Bolt / GS, num_iter times.
-        for x in range(num_iter):
-            # list 1000 objects from GS.
-            list_objects_start_time = time.time()
-            gs_blobs = self._gs_storage_client.list_blobs(bucket_name, max_results=1000)
-            list_objects_end_time = time.time()
-            # calc latency
-            list_objects_time = list_objects_end_time - list_objects_start_time
-            self._gs_op_times.append(list_objects_time)
-            # calc throughput
-            num_blobs = len(list(gs_blobs))
-            list_objects_tp = num_blobs / list_objects_time
-            self._gs_op_tp.append(list_objects_tp)
-
-            # list 1000 objects from Bolt.
-            list_objects_start_time = time.time()
-            bolt_blobs = self._bolt_storage_client.list_blobs(bucket_name, max_results=1000)
-            list_objects_end_time = time.time()
-            # calc latency
-            list_objects_time = list_objects_end_time - list_objects_start_time
-            self._bolt_op_times.append(list_objects_time)
-            # calc throughput
-            num_blobs = len(list(bolt_blobs))
-            list_objects_tp = num_blobs / list_objects_time
-            self._bolt_op_tp.append(list_objects_tp)
-
-        # calc gs perf stats.
-        gs_list_objects_perf_stats = self._compute_perf_stats(self._gs_op_times, self._gs_op_tp)
-
-        # calc bolt perf stats.
-        bolt_list_objects_perf_stats = self._compute_perf_stats(self._bolt_op_times, self._bolt_op_tp)
+            # list objects from Bolt.
+            page_times, page_obj_counts, prefix_count, list_time = self._list_pages(
+                self._bolt_storage_client, bucket_name, bolt_parse_times, bolt_response_sizes)
+            self._bolt_op_times.extend(page_times)
+            self._bolt_op_tp.extend([count / (page_time / 1e9) for count, page_time in zip(page_obj_counts, page_times)])
+            bolt_first_page_times.record(page_times[0])
+            bolt_list_times.append(list_time)
+            bolt_obj_count += sum(page_obj_counts)
+            bolt_prefix_count += prefix_count
 
         list_objects_perf_stats = {
-            'gs_list_objs_perf_stats': gs_list_objects_perf_stats,
-            'bolt_list_objs_perf_stats': bolt_list_objects_perf_stats
+            'page_size': self.LIST_PAGE_SIZE,
+            'engine': self.ENGINE.lower(),
+            'fields': self._fields_description('name'),
+            # calc gs perf stats.
+            'gs_list_objs_perf_stats': self._compute_perf_stats(self._gs_op_times, self._gs_op_tp),
+            'gs_list_objs_first_page_latency': self._compute_perf_stats(gs_first_page_times)['latency'],
+            'gs_list_objs_enumeration': self._list_enumeration_stats(len(self._gs_op_times), gs_obj_count,
+                                                                     gs_prefix_count, gs_list_times),
+            'gs_list_objs_parse_latency': self._compute_perf_stats(gs_parse_times)['latency'],
+            'gs_list_objs_response_size': self._response_size_stats(gs_response_sizes),
+            # calc bolt perf stats.
+            'bolt_list_objs_perf_stats': self._compute_perf_stats(self._bolt_op_times, self._bolt_op_tp),
+            'bolt_list_objs_first_page_latency': self._compute_perf_stats(bolt_first_page_times)['latency'],
+            'bolt_list_objs_enumeration': self._list_enumeration_stats(len(self._bolt_op_times), bolt_obj_count,
+                                                                       bolt_prefix_count, bolt_list_times),
+            'bolt_list_objs_parse_latency': self._compute_perf_stats(bolt_parse_times)['latency'],
+            'bolt_list_objs_response_size': self._response_size_stats(bolt_response_sizes)
         }
+        list_objects_perf_stats.update(self._connection_perf_stats())
         if self._request_type == "ALL":
             return list_objects_perf_stats
         else:
             return json.dumps(list_objects_perf_stats, indent=4, sort_keys=True)
 
+    def _list_pages(self, storage_client, bucket_name, parse_times, response_sizes):
+        """
+        Lists up to LIST_MAX_PAGES pages (all pages, if 0) of LIST_PAGE_SIZE objects from Bolt / GS,
+        timing each page fetch. Only the object fields used (name) and FIELDS are requested.
+
+        :param storage_client: Bolt / GS storage client
+        :param bucket_name: bucket name
+        :param parse_times: histogram to record the time spent parsing each page into
+        :param response_sizes: histogram to record the size of each page response into
+        :return: (list of page latencies (nanoseconds), list of object counts per page, prefix count,
+                  total listing time (secs))
+        """
+        page_times = []
+        page_obj_counts = []
+        prefix_count = 0
+        page_token = None
+        fields = self._object_fields('name')
+        if self._async_engine is not None:
+            list_page = partial(self._async_engine.list_page, storage_client, bucket_name, fields)
+        else:
+            list_page = partial(BoltPartialResponse(storage_client, fields).list_page, bucket_name)
+        list_start_time = time.perf_counter_ns()
+        while True:
+            page_start_time = time.perf_counter_ns()
+            page = list_page(max_results=self.LIST_PAGE_SIZE, page_token=page_token, prefix=self.LIST_PREFIX,
+                             delimiter=self.LIST_DELIMITER)
+            if self._async_engine is not None:
+                page = self._async_engine.run(page)
+            blobs, prefixes, page_token, _, parse_time, response_size = page
+            blob_names = [blob.name for blob in blobs]
+            page_end_time = time.perf_counter_ns()
+
+            page_times.append(page_end_time - page_start_time)
+            page_obj_counts.append(len(blob_names))
+            prefix_count += len(prefixes)
+            parse_times.record(parse_time)
+            response_sizes.record(response_size)
+
+            if page_token is None or len(page_times) == self.LIST_MAX_PAGES:
+                break
+        list_end_time = time.perf_counter_ns()
+        return page_times, page_obj_counts, prefix_count, (list_end_time - list_start_time) / 1e9
+
+    def _list_enumeration_stats(self, page_count, obj_count, prefix_count, list_times):
+        """
+        Computes the statistics of enumerating the bucket (all the listed pages).
+
+        :param page_count: total no of pages listed
+        :param obj_count: total no of objects listed
+        :param prefix_count: total no of prefixes listed
+        :param list_times: list of listing times (secs), one per iteration
+        :return: enumeration statistics (objects, pages, prefixes per iteration, time, throughput)
+        """
+        num_iter = len(list_times)
+        return {
+            'objects': obj_count // num_iter,
+            'pages': page_count // num_iter,
+            'prefixes': prefix_count // num_iter,
+            'time': "{:.2f} secs".format(mean(list_times)),
+            'throughput': "{:.2f} objects/sec".format(obj_count / math.fsum(list_times))
+        }
+
+    def _object_fields(self, *used_fields):
+        """
+        Returns the object resource fields to request: the fields used and FIELDS.
+
+        :param used_fields: object resource fields used by the benchmark
+        :return: list of fields (None - full object resources)
+        """
+        if self.FIELDS == 'ALL':
+            return None
+        return sorted(set(used_fields).union(self.FIELDS))
+
+    def _fields_description(self, *used_fields):
+        """
+        :param used_fields: object resource fields used by the benchmark
+        :return: object resource fields requested, as reported in the statistics
+        """
+        fields = self._object_fields(*used_fields)
+        return 'all' if fields is None else fields
+
+    @staticmethod
+    def _response_size_stats(response_sizes):
+        """
+        Computes the statistics of the response sizes.
+
+        :param response_sizes: histogram of response sizes (bytes)
+        :return: average / max. response size and total bytes received
+        """
+        return {
+            'average': "{:.0f} bytes".format(response_sizes.mean()),
+            'max': "{:d} bytes".format(response_sizes.max or 0),
+            'total': "{:d} bytes".format(response_sizes.total)
+        }
+
     def _download_object_perf(self, bucket_name):
         """
         Measures the Download Object performance (latency, throughput) of Bolt / GS.
+        Objects are downloaded from GS first and then from Bolt, using CONCURRENCY parallel workers for each.
 
         :param bucket_name: bucket name
         :return: Download Object performance statistics
         """
-        # Get blobs from Bolt/GS.
-        for key in self._keys:
-            # Get blob from GS.
-            bucket = self._gs_storage_client.bucket(bucket_name)
-            blob = bucket.get_blob(key)
-            if blob.size > 0:
-                obj_download_start_time = time.time()
-                if self._request_type == "DOWNLOAD_OBJECT_TTFB":
-                    # get first byte of object
-                    blob.download_as_bytes(start=0, end=0)
-                else:
-                    # read the entire object.
-                    blob.download_as_bytes()
-                obj_download_end_time = time.time()
-                # calc latency
-                download_obj_time = obj_download_end_time - obj_download_start_time
-                self._gs_op_times.append(download_obj_time)
-                # count object
-                if blob.content_encoding == "gzip" or str(key).endswith('.gz'):
-                    self._gs_cmp_obj_count += 1
-                else:
-                    self._gs_uncmp_obj_count += 1
-                # get blob size
-                self._gs_obj_sizes.append(blob.size)
-
-            # Get blob from Bolt.
-            bucket = self._bolt_storage_client.bucket(bucket_name)
-            blob = bucket.get_blob(key)
-            if blob.size > 0:
-                obj_download_start_time = time.time()
-                if self._request_type == "DOWNLOAD_OBJECT_TTFB":
-                    # get first byte of object
-                    blob.download_as_bytes(start=0, end=0)
-                else:
-                    # read the entire object.
-                    blob.download_as_bytes()
-                obj_download_end_time = time.time()
-                # calc latency
-                download_obj_time = obj_download_end_time - obj_download_start_time
-                self._bolt_op_times.append(download_obj_time)
-                # count object
-                if blob.content_encoding == "gzip" or str(key).endswith('.gz'):
-                    self._bolt_cmp_obj_count += 1
-                else:
-                    self._bolt_uncmp_obj_count += 1
-                # get blob size
-                self._bolt_obj_sizes.append(blob.size)
+        first_byte = self._request_type == "DOWNLOAD_OBJECT_TTFB"
+
+        # Get blobs from GS.
+        gs_counts = [0, 0, 0]
+        self._gs_wall_time = self._run_ops(
+            self._engine_op(self._download_blob, self._gs_storage_client, bucket_name, first_byte=first_byte),
+            partial(self._record_download, self._gs_op_times, self._gs_obj_sizes, gs_counts,
+                    self._gs_size_classes, self._gs_range_stats),
+            schedule_lags=self._gs_schedule_lags)
+        self._gs_cmp_obj_count, self._gs_uncmp_obj_count, self._gs_metadata_requests = gs_counts
+
+        # Get blobs from Bolt.
+        bolt_counts = [0, 0, 0]
+        self._bolt_wall_time = self._run_ops(
+            self._engine_op(self._download_blob, self._bolt_storage_client, bucket_name, first_byte=first_byte),
+            partial(self._record_download, self._bolt_op_times, self._bolt_obj_sizes, bolt_counts,
+                    self._bolt_size_classes, self._bolt_range_stats),
+            schedule_lags=self._bolt_schedule_lags)
+        self._bolt_cmp_obj_count, self._bolt_uncmp_obj_count, self._bolt_metadata_requests = bolt_counts
+
+        if self.RAW_STATS:
+            return self._export_raw_stats()
+        return self._download_object_perf_stats()
+
+    def _download_object_perf_stats(self):
+        """
+        Computes the Download Object performance statistics from the recorded latencies / object sizes.
+
+        :return: Download Object performance statistics
+        """
+        first_byte = self._request_type == "DOWNLOAD_OBJECT_TTFB"
 
         # calc gs perf stats
-        gs_download_obj_perf_stats = self._compute_perf_stats(self._gs_op_times, obj_sizes=self._gs_obj_sizes)
+        gs_download_obj_perf_stats = self._compute_perf_stats(self._gs_op_times, obj_sizes=self._gs_obj_sizes,
+                                                              wall_time=self._gs_wall_time)
 
         # calc bolt perf stats
-        bolt_download_obj_perf_stats = self._compute_perf_stats(self._bolt_op_times, obj_sizes=self._bolt_obj_sizes)
+        bolt_download_obj_perf_stats = self._compute_perf_stats(self._bolt_op_times, obj_sizes=self._bolt_obj_sizes,
+                                                                wall_time=self._bolt_wall_time)
 
         # assign perf stats name
-        if self._request_type == "DOWNLOAD_OBJECT_TTFB":
+        if first_byte:
             gs_dwnld_obj_stat_name = 'gs_download_obj_ttfb_perf_stats'
             bolt_dwnld_obj_stat_name = 'bolt_download_obj_ttfb_perf_stats'
         else:
@@ -230,13 +691,24 @@ class BoltGSPerf:
             bolt_dwnld_obj_stat_name = 'bolt_download_obj_perf_stats'
 
         download_obj_perf_stats = {
+            'concurrency': self.CONCURRENCY,
+            'workers': self.WORKERS,
+            'engine': self.ENGINE.lower(),
+            'metadata_source': self.METADATA_SOURCE.lower(),
             gs_dwnld_obj_stat_name: gs_download_obj_perf_stats,
             'gs_object_count (compressed)': self._gs_cmp_obj_count,
             'gs_object_count (uncompressed)': self._gs_uncmp_obj_count,
+            'gs_metadata_requests': self._gs_metadata_requests,
             bolt_dwnld_obj_stat_name: bolt_download_obj_perf_stats,
             'bolt_object_count (compressed)': self._bolt_cmp_obj_count,
             'bolt_object_count (uncompressed)': self._bolt_uncmp_obj_count,
+            'bolt_metadata_requests': self._bolt_metadata_requests
         }
+        download_obj_perf_stats.update(self._size_class_perf_stats(
+            'download_obj_ttfb' if first_byte else 'download_obj'))
+        download_obj_perf_stats.update(self._range_perf_stats('download_obj_ttfb' if first_byte else 'download_obj'))
+        download_obj_perf_stats.update(self._rate_perf_stats('download_obj_ttfb' if first_byte else 'download_obj'))
+        download_obj_perf_stats.update(self._connection_perf_stats())
         if self._request_type == "ALL":
             return download_obj_perf_stats
         else:
@@ -245,145 +717,1247 @@ class BoltGSPerf:
     def _download_object_passthrough_perf(self, bucket_name):
         """
         Measures the Download Object passthrough performance (latency, throughput) of Bolt / GS.
+        Objects are downloaded using CONCURRENCY parallel workers.
 
         :param bucket_name: name of unmonitored bucket
         :return: Download Object passthrough performance statistics
         """
+        first_byte = self._request_type == "DOWNLOAD_OBJECT_PASSTHROUGH_TTFB"
+
         # Get Objects via passthrough from Bolt.
-        for key in self._keys:
-            # Get blob from Bolt.
-            bucket = self._bolt_storage_client.bucket(bucket_name)
-            blob = bucket.get_blob(key)
-            if blob.size > 0:
-                obj_download_start_time = time.time()
-                if self._request_type == "DOWNLOAD_OBJECT_PASSTHROUGH_TTFB":
-                    # get first byte of object
-                    blob.download_as_bytes(start=0, end=0)
-                else:
-                    # read the entire object.
-                    blob.download_as_bytes()
-                obj_download_end_time = time.time()
-                # calc latency
-                download_obj_time = obj_download_end_time - obj_download_start_time
-                self._bolt_op_times.append(download_obj_time)
-                # count object
-                if blob.content_encoding == "gzip" or str(key).endswith('.gz'):
-                    self._bolt_cmp_obj_count += 1
-                else:
-                    self._bolt_uncmp_obj_count += 1
-                # get blob size
-                self._bolt_obj_sizes.append(blob.size)
+        bolt_counts = [0, 0, 0]
+        self._bolt_wall_time = self._run_ops(
+            self._engine_op(self._download_blob, self._bolt_storage_client, bucket_name, first_byte=first_byte),
+            partial(self._record_download, self._bolt_op_times, self._bolt_obj_sizes, bolt_counts,
+                    self._bolt_size_classes, self._bolt_range_stats),
+            schedule_lags=self._bolt_schedule_lags)
+        self._bolt_cmp_obj_count, self._bolt_uncmp_obj_count, self._bolt_metadata_requests = bolt_counts
+
+        if self.RAW_STATS:
+            return self._export_raw_stats()
+        return self._download_object_passthrough_perf_stats()
+
+    def _download_object_passthrough_perf_stats(self):
+        """
+        Computes the Download Object passthrough performance statistics from the recorded latencies / object sizes.
+
+        :return: Download Object passthrough performance statistics
+        """
+        first_byte = self._request_type == "DOWNLOAD_OBJECT_PASSTHROUGH_TTFB"
 
         # calc bolt perf stats
-        bolt_dwnld_obj_pt_perf_stats = self._compute_perf_stats(self._bolt_op_times, obj_sizes=self._bolt_obj_sizes)
+        bolt_dwnld_obj_pt_perf_stats = self._compute_perf_stats(self._bolt_op_times, obj_sizes=self._bolt_obj_sizes,
+                                                                wall_time=self._bolt_wall_time)
 
         # assign perf stats name.
-        if self._request_type == "DOWNLOAD_OBJECT_PASSTHROUGH_TTFB":
+        if first_byte:
             bolt_dwnld_obj_pt_stat_name = 'bolt_download_obj_pt_ttfb_perf_stats'
         else:
             bolt_dwnld_obj_pt_stat_name = 'bolt_download_obj_pt_perf_stats'
 
         download_obj_pt_perf_stats = {
+            'concurrency': self.CONCURRENCY,
+            'workers': self.WORKERS,
+            'engine': self.ENGINE.lower(),
+            'metadata_source': self.METADATA_SOURCE.lower(),
             bolt_dwnld_obj_pt_stat_name: bolt_dwnld_obj_pt_perf_stats,
             'bolt_object_count (compressed)': self._bolt_cmp_obj_count,
-            'bolt_object_count (uncompressed)': self._bolt_uncmp_obj_count
+            'bolt_object_count (uncompressed)': self._bolt_uncmp_obj_count,
+            'bolt_metadata_requests': self._bolt_metadata_requests
         }
+        download_obj_pt_perf_stats.update(self._size_class_perf_stats(
+            'download_obj_pt_ttfb' if first_byte else 'download_obj_pt'))
+        download_obj_pt_perf_stats.update(self._range_perf_stats(
+            'download_obj_pt_ttfb' if first_byte else 'download_obj_pt'))
+        download_obj_pt_perf_stats.update(self._rate_perf_stats(
+            'download_obj_pt_ttfb' if first_byte else 'download_obj_pt'))
+        download_obj_pt_perf_stats.update(self._connection_perf_stats())
         if self._request_type == "ALL":
             return download_obj_pt_perf_stats
         else:
             return json.dumps(download_obj_pt_perf_stats, indent=4, sort_keys=True)
 
+    def _download_blob(self, storage_client, bucket_name, key, first_byte=False):
+        """
+        Downloads a single object (or its first byte) from Bolt / GS.
+        The object's size and content encoding are taken from the listing (if METADATA_SOURCE is LISTING and the key
+        was listed), retrieved by a separate metadata request (GET_BLOB) or taken from the response headers of the
+        download (NONE, see BoltMediaBlob), in which case the size is None if the response doesn't carry it.
+
+        :param storage_client: Bolt / GS storage client
+        :param bucket_name: bucket name
+        :param key: key name
+        :param first_byte: download only the first byte of the object (of each range, for ranged downloads)
+        :return: (latency (nanoseconds), object size (bytes downloaded, for ranged downloads), compressed,
+                  metadata requested, list of (range latency (nanoseconds), range size) or None)
+                  or None if the object is empty
+        """
+        bucket = storage_client.bucket(bucket_name)
+        metadata_requested = False
+        # listed metadata is dropped once used, so memory doesn't grow with the no of keys.
+        key_md = self._key_md.pop(key, None)
+        if self.METADATA_SOURCE == 'GET_BLOB' or (self.METADATA_SOURCE == 'LISTING' and key_md is None):
+            # only the fields used (size, content encoding) and FIELDS are requested.
+            blob = BoltPartialResponse(storage_client, self._object_fields('size', 'contentEncoding')).get_blob(
+                bucket_name, key, not_found_ok=False)[0]
+            metadata_requested = True
+            obj_size = blob.size
+        elif self.METADATA_SOURCE == 'LISTING':
+            blob = bucket.blob(key)
+            obj_size, blob.content_encoding = key_md
+        else:
+            blob = BoltMediaBlob(key, bucket)
+            obj_size = None
+
+        if obj_size == 0:
+            return None
+        if self.RANGE_MODE:
+            return self._download_blob_ranges(blob, key, obj_size, first_byte, metadata_requested)
+        obj_download_start_time = time.perf_counter_ns()
+        try:
+            if first_byte:
+                # get first byte of object
+                blob_data = blob.download_as_bytes(start=0, end=0)
+            else:
+                # read the entire object.
+                blob_data = blob.download_as_bytes()
+        except RequestRangeNotSatisfiable:
+            # empty object (size not known up front).
+            return None
+        obj_download_end_time = time.perf_counter_ns()
+        # calc latency
+        download_obj_time = obj_download_end_time - obj_download_start_time
+        if obj_size is None:
+            obj_size = blob.size
+        compressed = blob.content_encoding == "gzip" or str(key).endswith('.gz')
+        return download_obj_time, obj_size, compressed, metadata_requested, None
+
+    def _download_blob_ranges(self, blob, key, obj_size, first_byte, metadata_requested):
+        """
+        Downloads byte ranges (of the stored data) of a single object from Bolt / GS, fetching them concurrently.
+        The ranges are determined by RANGE_MODE: PARALLEL - the object split into NUM_RANGES ranges,
+        RANDOM - NUM_RANGES ranges of RANGE_SIZE bytes at random offsets.
+
+        :param blob: blob to download
+        :param key: key name
+        :param obj_size: object size
+        :param first_byte: download only the first byte of each range
+        :param metadata_requested: whether a metadata request was made for the object
+        :return: (latency (nanoseconds), bytes downloaded, compressed, metadata requested,
+                  list of (range latency (nanoseconds), range size))
+        """
+        ranges = self._byte_ranges(obj_size, first_byte)
+        obj_download_start_time = time.perf_counter_ns()
+        range_results = list(self._range_executor.map(partial(self._download_range, blob), ranges))
+        obj_download_end_time = time.perf_counter_ns()
+        compressed = blob.content_encoding == "gzip" or str(key).endswith('.gz')
+        return obj_download_end_time - obj_download_start_time, sum(range_size for _, range_size in range_results),\
+            compressed, metadata_requested, range_results
+
+    def _byte_ranges(self, obj_size, first_byte):
+        """
+        Returns the byte ranges of an object to download, as determined by RANGE_MODE: PARALLEL - the object split
+        into NUM_RANGES ranges, RANDOM - NUM_RANGES ranges of RANGE_SIZE bytes at random offsets.
+
+        :param obj_size: object size
+        :param first_byte: only the first byte of each range
+        :return: list of (start, end) offsets (inclusive)
+        """
+        if self.RANGE_MODE == 'PARALLEL':
+            range_size = math.ceil(obj_size / self.NUM_RANGES)
+            ranges = [(start, min(start + range_size, obj_size) - 1) for start in range(0, obj_size, range_size)]
+        else:
+            range_size = min(self.RANGE_SIZE, obj_size)
+            ranges = []
+            for _ in range(self.NUM_RANGES):
+                start = random.randrange(obj_size - range_size + 1)
+                ranges.append((start, start + range_size - 1))
+        if first_byte:
+            ranges = [(start, start) for start, _ in ranges]
+        return ranges
+
+    @staticmethod
+    def _download_range(blob, byte_range):
+        """
+        Downloads a byte range (of the stored data) of an object.
+
+        :param blob: blob to download
+        :param byte_range: (start, end) offsets (inclusive)
+        :return: (latency (nanoseconds), no of bytes downloaded)
+        """
+        start, end = byte_range
+        range_download_start_time = time.perf_counter_ns()
+        range_data = blob.download_as_bytes(start=start, end=end, raw_download=True)
+        range_download_end_time = time.perf_counter_ns()
+        return range_download_end_time - range_download_start_time, len(range_data)
+
+    async def _download_blob_async(self, storage_client, bucket_name, key, first_byte=False):
+        """
+        Downloads a single object (or its first byte) from Bolt / GS, as _download_blob does, using the ASYNCIO
+        engine. Objects are downloaded as stored.
+
+        :param storage_client: Bolt / GS storage client
+        :param bucket_name: bucket name
+        :param key: key name
+        :param first_byte: download only the first byte of the object (of each range, for ranged downloads)
+        :return: same as _download_blob
+        """
+        metadata_requested = False
+        content_encoding = None
+        key_md = self._key_md.pop(key, None)
+        if self.METADATA_SOURCE == 'GET_BLOB' or (self.METADATA_SOURCE == 'LISTING' and key_md is None):
+            obj_md = await self._async_engine.get_object(storage_client, bucket_name, key,
+                                                         fields=self._object_fields('size', 'contentEncoding'))
+            metadata_requested = True
+            obj_size = int(obj_md['size'])
+            content_encoding = obj_md.get('contentEncoding')
+        elif self.METADATA_SOURCE == 'LISTING':
+            obj_size, content_encoding = key_md
+        else:
+            obj_size = None
+
+        if obj_size == 0:
+            return None
+        compressed = content_encoding == "gzip" or str(key).endswith('.gz')
+        if self.RANGE_MODE:
+            ranges = self._byte_ranges(obj_size, first_byte)
+            obj_download_start_time = time.perf_counter_ns()
+            range_results = await asyncio.gather(*[
+                self._download_range_async(storage_client, bucket_name, key, byte_range) for byte_range in ranges])
+            obj_download_end_time = time.perf_counter_ns()
+            return obj_download_end_time - obj_download_start_time,\
+                sum(range_size for _, range_size in range_results), compressed, metadata_requested, range_results
+
+        obj_download_start_time = time.perf_counter_ns()
+        try:
+            _, stored_size, stored_content_encoding = await self._async_engine.download_object(
+                storage_client, bucket_name, key, byte_range=(0, 0) if first_byte else None)
+        except RequestRangeNotSatisfiable:
+            # empty object (size not known up front).
+            return None
+        obj_download_end_time = time.perf_counter_ns()
+        if self.METADATA_SOURCE == 'NONE':
+            obj_size = stored_size
+            compressed = stored_content_encoding == "gzip" or str(key).endswith('.gz')
+        return obj_download_end_time - obj_download_start_time, obj_size, compressed, metadata_requested, None
+
+    async def _download_range_async(self, storage_client, bucket_name, key, byte_range):
+        """
+        Downloads a byte range (of the stored data) of an object, using the ASYNCIO engine.
+
+        :param storage_client: Bolt / GS storage client
+        :param bucket_name: bucket name
+        :param key: key name
+        :param byte_range: (start, end) offsets (inclusive)
+        :return: (latency (nanoseconds), no of bytes downloaded)
+        """
+        range_download_start_time = time.perf_counter_ns()
+        range_size, _, _ = await self._async_engine.download_object(storage_client, bucket_name, key,
+                                                                    byte_range=byte_range)
+        range_download_end_time = time.perf_counter_ns()
+        return range_download_end_time - range_download_start_time, range_size
+
+    def _record_download(self, op_times, obj_sizes, counts, size_classes, range_stats, result):
+        """
+        Records a result returned by _download_blob.
+
+        :param op_times: histogram of latencies to record into
+        :param obj_sizes: histogram of object sizes to record into
+        :param counts: [compressed object count, uncompressed object count, metadata request count] to update
+        :param size_classes: latencies / object sizes by size class to record into
+        :param range_stats: (histogram of range latencies, histogram of range sizes) to record into, if any
+        :param result: download result
+        """
+        if result is None:
+            return
+        download_obj_time, obj_size, compressed, metadata_requested, ranges = result
+        op_times.record(download_obj_time)
+        # object size isn't known (metadataSource none and not carried by the response).
+        if obj_size is not None:
+            obj_sizes.record(obj_size)
+            self._record_size_class(size_classes, download_obj_time, obj_size)
+        if ranges and range_stats:
+            range_times, range_sizes = range_stats
+            for range_time, range_size in ranges:
+                range_times.record(range_time)
+                range_sizes.record(range_size)
+        # count object
+        if compressed:
+            counts[0] += 1
+        else:
+            counts[1] += 1
+        if metadata_requested:
+            counts[2] += 1
+
+    def _record_upload(self, op_times, obj_sizes, size_classes, result):
+        """
+        Records a result returned by _upload_blob.
+
+        :param op_times: histogram of latencies to record into
+        :param obj_sizes: histogram of object sizes to record into
+        :param size_classes: latencies / object sizes by size class to record into
+        :param result: (latency (nanoseconds), object size)
+        """
+        upload_obj_time, obj_size = result
+        op_times.record(upload_obj_time)
+        obj_sizes.record(obj_size)
+        self._record_size_class(size_classes, upload_obj_time, obj_size)
+
+    @staticmethod
+    def _record_size_class(size_classes, op_time, obj_size):
+        """
+        Records a latency / object size into the histograms of the object's size class.
+
+        :param size_classes: dict of size class name to (latency histogram, object size histogram)
+        :param op_time: latency (nanoseconds)
+        :param obj_size: object size
+        """
+        class_name = BoltObjectSizeDistribution.size_class(obj_size)
+        if class_name not in size_classes:
+            size_classes[class_name] = (BoltPerfHistogram(), BoltPerfHistogram())
+        class_op_times, class_obj_sizes = size_classes[class_name]
+        class_op_times.record(op_time)
+        class_obj_sizes.record(obj_size)
+
+    @staticmethod
+    def _record_delete(op_times, not_found, result):
+        """
+        Records a latency returned by _delete_blob.
+
+        :param op_times: histogram of latencies to record into
+        :param not_found: [no of objects that didn't exist] to update
+        :param result: latency (nanoseconds) or None if the object didn't exist
+        """
+        if result is None:
+            not_found[0] += 1
+        else:
+            op_times.record(result)
+
+    def _engine_op(self, op, *args, **kwargs):
+        """
+        Returns an operation (_download_blob, _upload_blob, _delete_blob) of the ENGINE, with the given arguments
+        bound: the operation itself (THREADS) or its coroutine counterpart (ASYNCIO) e.g. _download_blob_async.
+
+        :param op: operation
+        :param args: positional arguments
+        :param kwargs: keyword arguments
+        :return: function that takes a key name and performs the operation
+        """
+        if self._async_engine is not None:
+            op = getattr(self, op.__name__ + '_async')
+        return partial(op, *args, **kwargs)
+
+    def _run_ops(self, op, record, keys=None, schedule_lags=None, concurrency=None):
+        """
+        Runs op for each key produced by the key source, using a pool of CONCURRENCY worker threads, and records
+        the results as they complete. Keys are consumed lazily (at most 2 * CONCURRENCY ops are in flight) so memory
+        doesn't grow with the no of keys. No new ops are started after DURATION_SECS, if set.
+        Time spent waiting for keys (e.g. for the pages of a key listing) while no ops are in flight is left out of
+        the elapsed wall time; waits overlapping ops count towards it.
+
+        With the ASYNCIO engine, op is a coroutine function and up to CONCURRENCY ops are in flight instead.
+
+        With TARGET_RPS, ops are run open loop: op i is due at i / TARGET_RPS secs from the start and its latency is
+        measured from then, so the time an op waits for a free worker (when Bolt / GS can't keep up) counts
+        towards its latency rather than lowering the offered load (coordinated omission).
+
+        :param op: function that takes a key name and performs a single operation
+        :param record: function that records a result returned by op
+        :param keys: iterable of keys (or batches of keys) to run op for, instead of the key source
+        :param schedule_lags: histogram to record the delays of op starts past their due times into (open loop)
+        :param concurrency: no of worker threads / ops in flight, instead of CONCURRENCY
+        :return: elapsed wall time (secs)
+        """
+        if concurrency is None:
+            concurrency = self.CONCURRENCY
+        ops_start_time = time.perf_counter_ns()
+        keys = self._iter_keys() if keys is None else keys
+        # no of ops in flight (updated by the worker threads as ops complete) and time spent idle waiting for keys.
+        in_flight = [0]
+        in_flight_lock = threading.Lock()
+        key_wait = [0]
+        if self._async_engine is None:
+            keys = self._timed_keys(keys, key_wait, idle=lambda: in_flight[0] == 0)
+        deadline = None
+        if self.DURATION_SECS:
+            deadline = ops_start_time + self.DURATION_SECS * 1e9
+        if self.TARGET_RPS:
+            # the thread pool is fed on schedule, coroutines wait for their due time themselves.
+            keys = self._schedule_keys(keys, deadline, wait=self._async_engine is None)
+            op = partial(self._scheduled_op if self._async_engine is None else self._scheduled_op_async, op)
+            record = partial(self._record_scheduled, record, schedule_lags)
+        elif deadline is not None:
+            keys = itertools.takewhile(lambda key: time.perf_counter_ns() < deadline, keys)
+        if self._async_engine is not None:
+            # the engine leaves out the time it's idle waiting for keys itself.
+            return self._async_engine.run_ops(op, record, keys, concurrency, deadline=deadline)
+        if concurrency > 1:
+
+            def op_done(future):
+                with in_flight_lock:
+                    in_flight[0] -= 1
+
+            with ThreadPoolExecutor(max_workers=concurrency) as executor:
+                pending = set()
+                for key in keys:
+                    if len(pending) >= 2 * concurrency:
+                        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                        for future in done:
+                            record(future.result())
+                    with in_flight_lock:
+                        in_flight[0] += 1
+                    future = executor.submit(op, key)
+                    future.add_done_callback(op_done)
+                    pending.add(future)
+                for future in pending:
+                    record(future.result())
+        else:
+            for key in keys:
+                record(op(key))
+        ops_end_time = time.perf_counter_ns()
+        return (ops_end_time - ops_start_time - key_wait[0]) / 1e9
+
+    @staticmethod
+    def _timed_keys(keys, key_wait, idle):
+        """
+        Produces the keys, adding the time spent waiting for each of them to key_wait if no ops were in flight
+        when the wait started (waits overlapping ops aren't idle time).
+
+        :param keys: iterable of keys
+        :param key_wait: [time (nanoseconds) spent idle waiting for keys] to update
+        :param idle: function that returns whether no ops are in flight
+        :return: key iterator
+        """
+        keys = iter(keys)
+        while True:
+            idle_wait = idle()
+            wait_start_time = time.perf_counter_ns()
+            try:
+                key = next(keys)
+            except StopIteration:
+                return
+            finally:
+                if idle_wait:
+                    key_wait[0] += time.perf_counter_ns() - wait_start_time
+            yield key
+
+    def _schedule_keys(self, keys, deadline=None, wait=True):
+        """
+        Assigns each key the time its op is due at: i / TARGET_RPS secs after the first key is produced (so the
+        first page of a key listing isn't counted as a delay), for the i'th key.
+
+        :param keys: key iterator
+        :param deadline: time.perf_counter_ns() after which no ops are due
+        :param wait: wait until each key is due before producing it
+        :return: iterator of (key, due time) pairs
+        """
+        interval = 1e9 / self.TARGET_RPS
+        start_time = None
+        for i, key in enumerate(keys):
+            if start_time is None:
+                start_time = time.perf_counter_ns()
+            due_time = start_time + int(i * interval)
+            if deadline is not None and due_time >= deadline:
+                return
+            if wait:
+                delay = due_time - time.perf_counter_ns()
+                if delay > 0:
+                    time.sleep(delay / 1e9)
+            yield key, due_time
+
+    @staticmethod
+    def _scheduled_op(op, scheduled_key):
+        """
+        Runs op for a key produced by _schedule_keys.
+
+        :param op: function that takes a key name and performs a single operation
+        :param scheduled_key: (key, due time)
+        :return: (delay of the op start past its due time (nanoseconds), result returned by op)
+        """
+        key, due_time = scheduled_key
+        schedule_lag = max(0, time.perf_counter_ns() - due_time)
+        return schedule_lag, op(key)
+
+    @staticmethod
+    async def _scheduled_op_async(op, scheduled_key):
+        """
+        Waits until a key produced by _schedule_keys is due and runs op (a coroutine function) for it.
+
+        :param op: coroutine function that takes a key name and performs a single operation
+        :param scheduled_key: (key, due time)
+        :return: (delay of the op start past its due time (nanoseconds), result returned by op)
+        """
+        key, due_time = scheduled_key
+        delay = due_time - time.perf_counter_ns()
+        if delay > 0:
+            await asyncio.sleep(delay / 1e9)
+        schedule_lag = max(0, time.perf_counter_ns() - due_time)
+        return schedule_lag, await op(key)
+
+    @staticmethod
+    def _record_scheduled(record, schedule_lags, scheduled_result):
+        """
+        Records a result returned by _scheduled_op, its latency measured from the time the op was due.
+
+        :param record: function that records a result returned by op
+        :param schedule_lags: histogram to record the delay of the op start into, if any
+        :param scheduled_result: (delay of the op start past its due time (nanoseconds), result returned by op)
+        """
+        schedule_lag, result = scheduled_result
+        if schedule_lags is not None:
+            schedule_lags.record(schedule_lag)
+        # results are a latency, or a tuple starting with one, or None (no operation performed).
+        if isinstance(result, tuple):
+            result = (result[0] + schedule_lag,) + result[1:]
+        elif result is not None:
+            result += schedule_lag
+        record(result)
+
+    def _iter_keys(self):
+        """
+        Returns a fresh iterator of the keys (of KEY_SHARD) to be used in Ops.
+
+        :return: key iterator
+        """
+        keys = self._key_source()
+        if self.KEY_SHARDS > 1:
+            keys = itertools.islice(keys, self.KEY_SHARD, None, self.KEY_SHARDS)
+        return keys
+
     def _upload_object_perf(self, bucket_name):
         """
         Measures the Upload Object performance (latency, throughput) of Bolt / GS.
+        Objects are uploaded to GS first and then to Bolt, using CONCURRENCY parallel workers for each.
 
         :param bucket_name: bucket name
         :return: Upload Object performance statistics
         """
-        # Upload objects to Bolt/GS.
-        for key in self._keys:
-            value = self._generate(characters=string.ascii_lowercase, length=self.OBJ_LENGTH)
+        # Upload objects to GS.
+        self._gs_wall_time = self._run_ops(
+            self._engine_op(self._upload_blob, self._gs_storage_client, bucket_name),
+            partial(self._record_upload, self._gs_op_times, self._gs_obj_sizes, self._gs_size_classes),
+            schedule_lags=self._gs_schedule_lags)
 
-            # upload object to GS.
-            bucket = self._gs_storage_client.bucket(bucket_name)
-            blob = bucket.blob(key)
-            obj_upload_start_time = time.time()
-            blob.upload_from_string(value)
-            obj_upload_end_time = time.time()
-            # calc latency
-            obj_upload_time = obj_upload_end_time - obj_upload_start_time
-            self._gs_op_times.append(obj_upload_time)
-
-            # upload object to Bolt.
-            bucket = self._bolt_storage_client.bucket(bucket_name)
-            blob = bucket.blob(key)
-            obj_upload_start_time = time.time()
-            blob.upload_from_string(value)
-            obj_upload_end_time = time.time()
-            # calc latency
-            obj_upload_time = obj_upload_end_time - obj_upload_start_time
-            self._bolt_op_times.append(obj_upload_time)
+        # Upload objects to Bolt.
+        self._bolt_wall_time = self._run_ops(
+            self._engine_op(self._upload_blob, self._bolt_storage_client, bucket_name),
+            partial(self._record_upload, self._bolt_op_times, self._bolt_obj_sizes, self._bolt_size_classes),
+            schedule_lags=self._bolt_schedule_lags)
+
+        if self.RAW_STATS:
+            return self._export_raw_stats()
+        return self._upload_object_perf_stats()
 
+    def _upload_object_perf_stats(self):
+        """
+        Computes the Upload Object performance statistics from the recorded latencies.
+
+        :return: Upload Object performance statistics
+        """
         # calc GS perf stats
-        gs_upload_obj_perf_stats = self._compute_perf_stats(self._gs_op_times)
+        gs_upload_obj_perf_stats = self._compute_perf_stats(self._gs_op_times, obj_sizes=self._gs_obj_sizes,
+                                                            wall_time=self._gs_wall_time)
 
         # calc bolt perf stats
-        bolt_upload_obj_perf_stats = self._compute_perf_stats(self._bolt_op_times)
+        bolt_upload_obj_perf_stats = self._compute_perf_stats(self._bolt_op_times, obj_sizes=self._bolt_obj_sizes,
+                                                              wall_time=self._bolt_wall_time)
 
         upload_obj_perf_stats = {
-            'object_size': "{:d} bytes".format(self.OBJ_LENGTH),
+            'concurrency': self.CONCURRENCY,
+            'workers': self.WORKERS,
+            'engine': self.ENGINE.lower(),
+            'object_size': self._obj_size_dist.describe(),
+            'payload_type': self.PAYLOAD_TYPE.lower(),
             'gs_upload_obj_perf_stats': gs_upload_obj_perf_stats,
             'bolt_upload_obj_perf_stats': bolt_upload_obj_perf_stats
         }
+        upload_obj_perf_stats.update(self._size_class_perf_stats('upload_obj'))
+        upload_obj_perf_stats.update(self._rate_perf_stats('upload_obj'))
+        upload_obj_perf_stats.update(self._connection_perf_stats())
         if self._request_type == "ALL":
             return upload_obj_perf_stats
         else:
             return json.dumps(upload_obj_perf_stats, indent=4, sort_keys=True)
 
+    def _upload_object_large_perf(self, bucket_name):
+        """
+        Measures the chunked (resumable) Upload Object performance (object / chunk latency, throughput) of Bolt / GS,
+        for each of CHUNK_SIZES. Objects are streamed to GS first and then to Bolt, using CONCURRENCY parallel
+        workers for each. The objects uploaded under LARGE_KEY_PREFIX are deleted (unmeasured) after each pass, keys
+        passed with the request (keys, keyManifest) are left in place.
+
+        :param bucket_name: bucket name
+        :return: large Upload Object performance statistics
+        """
+        gs_upload_obj_large_perf_stats = {}
+        bolt_upload_obj_large_perf_stats = {}
+        for chunk_size in self.CHUNK_SIZES:
+            chunk_size_name = "{:.2f} MB".format(chunk_size / (1024 * 1024))
+            for client_name, storage_client, perf_stats in [
+                    ('gs', self._gs_storage_client, gs_upload_obj_large_perf_stats),
+                    ('bolt', self._bolt_storage_client, bolt_upload_obj_large_perf_stats)]:
+                # object latencies / sizes, session initiation latencies, chunk latencies / sizes.
+                histograms = [BoltPerfHistogram() for _ in range(5)]
+                # keys of the uploads started, including those in flight if the pass fails.
+                started_keys = []
+                try:
+                    wall_time = self._run_ops(
+                        partial(self._upload_blob_chunked, storage_client, bucket_name, chunk_size=chunk_size,
+                                started_keys=started_keys),
+                        partial(self._record_upload_chunked, *histograms))
+                finally:
+                    self._delete_keys(storage_client, bucket_name,
+                                      [key for key in started_keys if key.startswith(self.LARGE_KEY_PREFIX)])
+                perf_stats[chunk_size_name] = self._upload_chunked_perf_stats(*histograms, wall_time=wall_time)
+
+        upload_obj_large_perf_stats = {
+            'concurrency': self.CONCURRENCY,
+            'object_size': self._obj_size_dist.describe(),
+            'payload_type': self.PAYLOAD_TYPE.lower(),
+            'gs_upload_obj_large_perf_stats': gs_upload_obj_large_perf_stats,
+            'bolt_upload_obj_large_perf_stats': bolt_upload_obj_large_perf_stats
+        }
+        upload_obj_large_perf_stats.update(self._connection_perf_stats())
+        return json.dumps(upload_obj_large_perf_stats, indent=4, sort_keys=True)
+
+    def _delete_keys(self, storage_client, bucket_name, keys):
+        """
+        Deletes objects from Bolt / GS, in batch requests. Objects that don't exist are skipped. Deletes aren't
+        measured.
+
+        :param storage_client: Bolt / GS storage client
+        :param bucket_name: bucket name
+        :param keys: key names
+        """
+        for batch_keys in BoltBatch.batches(keys):
+            self._delete_blobs_batch(storage_client, bucket_name, batch_keys)
+
+    def _upload_blob_chunked(self, storage_client, bucket_name, key, chunk_size, started_keys=None):
+        """
+        Uploads a single object to Bolt / GS using a resumable upload, streaming it chunk_size bytes at a time.
+        The object data is streamed from pre-generated payloads.
+
+        :param storage_client: Bolt / GS storage client
+        :param bucket_name: bucket name
+        :param key: key name
+        :param chunk_size: chunk size (multiple of 256KB)
+        :param started_keys: list to add the key to before the upload starts, if any
+        :return: (latency (nanoseconds), object size, session initiation latency (nanoseconds),
+                  list of (chunk latency (nanoseconds), chunk size))
+        """
+        obj_size = self._obj_size_dist.size(key)
+        stream = BoltPayloadStream(self._payload_generator.next(obj_size))
+        upload_url = self.RESUMABLE_UPLOAD_URL.format(storage_client._connection.API_BASE_URL,
+                                                      quote(bucket_name, safe=''))
+        upload = ResumableUpload(upload_url, chunk_size)
+        transport = storage_client._http
+        if started_keys is not None:
+            started_keys.append(key)
+
+        obj_upload_start_time = time.perf_counter_ns()
+        upload.initiate(transport, stream, {'name': key}, self._payload_generator.content_type, total_bytes=obj_size)
+        initiate_end_time = time.perf_counter_ns()
+        chunks = []
+        while not upload.finished:
+            chunk_start_time = time.perf_counter_ns()
+            bytes_uploaded = upload.bytes_uploaded
+            upload.transmit_next_chunk(transport)
+            chunks.append((time.perf_counter_ns() - chunk_start_time, upload.bytes_uploaded - bytes_uploaded))
+        obj_upload_end_time = time.perf_counter_ns()
+        return obj_upload_end_time - obj_upload_start_time, obj_size, initiate_end_time - obj_upload_start_time, chunks
+
+    @staticmethod
+    def _record_upload_chunked(op_times, obj_sizes, initiate_times, chunk_times, chunk_sizes, result):
+        """
+        Records a result returned by _upload_blob_chunked.
+
+        :param op_times: histogram of object latencies to record into
+        :param obj_sizes: histogram of object sizes to record into
+        :param initiate_times: histogram of session initiation latencies to record into
+        :param chunk_times: histogram of chunk latencies to record into
+        :param chunk_sizes: histogram of chunk sizes to record into
+        :param result: chunked upload result
+        """
+        upload_obj_time, obj_size, initiate_time, chunks = result
+        op_times.record(upload_obj_time)
+        obj_sizes.record(obj_size)
+        initiate_times.record(initiate_time)
+        for chunk_time, chunk_size in chunks:
+            chunk_times.record(chunk_time)
+            chunk_sizes.record(chunk_size)
+
+    def _upload_chunked_perf_stats(self, op_times, obj_sizes, initiate_times, chunk_times, chunk_sizes, wall_time):
+        """
+        Computes the performance statistics of chunked uploads with a single chunk size.
+
+        :param op_times: histogram of object latencies
+        :param obj_sizes: histogram of object sizes
+        :param initiate_times: histogram of session initiation latencies
+        :param chunk_times: histogram of chunk latencies
+        :param chunk_sizes: histogram of chunk sizes
+        :param wall_time: elapsed wall time (secs) of all the uploads
+        :return: object, session initiation and chunk performance statistics, aggregate throughput (MB/sec)
+        """
+        return {
+            'object': self._compute_perf_stats(op_times, obj_sizes=obj_sizes, wall_time=wall_time),
+            'session_initiation': self._compute_perf_stats(initiate_times),
+            'chunk': self._compute_perf_stats(chunk_times, obj_sizes=chunk_sizes),
+            'throughput': "{:.2f} MB/sec".format(obj_sizes.total / wall_time / (1024 * 1024) if wall_time else 0)
+        }
+
     def _delete_object_perf(self, bucket_name):
         """
         Measures the Delete Object performance (latency, throughput) of Bolt / GS.
+        Objects are deleted from GS first and then from Bolt, using CONCURRENCY parallel workers for each.
 
         :param bucket_name: bucket name
         :return: Delete Object performance statistics
         """
-        # Delete Objects from Bolt/GS.
-        for key in self._keys:
-            # Delete blob from GS.
-            bucket = self._gs_storage_client.bucket(bucket_name)
-            blob = bucket.blob(key)
-            obj_del_start_time = time.time()
-            blob.delete()
-            obj_del_end_time = time.time()
-            # calc latency.
-            obj_del_time = obj_del_end_time - obj_del_start_time
-            self._gs_op_times.append(obj_del_time)
+        # Delete Objects from GS.
+        gs_not_found = [0]
+        self._gs_wall_time = self._run_ops(
+            self._engine_op(self._delete_blob, self._gs_storage_client, bucket_name),
+            partial(self._record_delete, self._gs_op_times, gs_not_found), schedule_lags=self._gs_schedule_lags)
+        self._gs_not_found_count = gs_not_found[0]
 
-            # Delete blob from Bolt.
-            bucket = self._bolt_storage_client.bucket(bucket_name)
-            blob = bucket.blob(key)
-            obj_del_start_time = time.time()
-            blob.delete()
-            obj_del_end_time = time.time()
-            # calc latency.
-            obj_del_time = obj_del_end_time - obj_del_start_time
-            self._bolt_op_times.append(obj_del_time)
+        # Delete Objects from Bolt.
+        bolt_not_found = [0]
+        self._bolt_wall_time = self._run_ops(
+            self._engine_op(self._delete_blob, self._bolt_storage_client, bucket_name),
+            partial(self._record_delete, self._bolt_op_times, bolt_not_found), schedule_lags=self._bolt_schedule_lags)
+        self._bolt_not_found_count = bolt_not_found[0]
+
+        if self.RAW_STATS:
+            return self._export_raw_stats()
+        return self._delete_object_perf_stats()
 
-        # calc s3 perf stats
-        gs_del_obj_perf_stats = self._compute_perf_stats(self._gs_op_times)
+    def _delete_object_perf_stats(self):
+        """
+        Computes the Delete Object performance statistics from the recorded latencies.
+
+        :return: Delete Object performance statistics
+        """
+        # calc gs perf stats
+        gs_del_obj_perf_stats = self._compute_perf_stats(self._gs_op_times, wall_time=self._gs_wall_time)
+        gs_del_obj_perf_stats['objects_not_found'] = self._gs_not_found_count
 
         # calc bolt perf stats
-        bolt_del_obj_perf_stats = self._compute_perf_stats(self._bolt_op_times)
+        bolt_del_obj_perf_stats = self._compute_perf_stats(self._bolt_op_times, wall_time=self._bolt_wall_time)
+        bolt_del_obj_perf_stats['objects_not_found'] = self._bolt_not_found_count
 
         del_obj_perf_stats = {
+            'concurrency': self.CONCURRENCY,
+            'workers': self.WORKERS,
+            'engine': self.ENGINE.lower(),
             'gs_del_obj_perf_stats': gs_del_obj_perf_stats,
             'bolt_del_obj_perf_stats': bolt_del_obj_perf_stats
         }
+        del_obj_perf_stats.update(self._rate_perf_stats('del_obj'))
+        del_obj_perf_stats.update(self._connection_perf_stats())
         if self._request_type == "ALL":
             return del_obj_perf_stats
         else:
             return json.dumps(del_obj_perf_stats, indent=4, sort_keys=True)
 
+    def _delete_object_batch_perf(self, bucket_name):
+        """
+        Measures the Delete Object performance (latency, throughput) of Bolt / GS with a delete request per object
+        vs batch requests of BATCH_SIZE deletes. For each of GS and Bolt, objects are uploaded and deleted one
+        request at a time, then uploaded again and deleted in batches, using CONCURRENCY parallel workers.
+        Uploads aren't measured.
+
+        :param bucket_name: bucket name
+        :return: per object and batched Delete Object performance statistics
+        """
+        del_obj_batch_perf_stats = {
+            'concurrency': self.CONCURRENCY,
+            'batch_size': self.BATCH_SIZE
+        }
+        for client_name, storage_client in [('gs', self._gs_storage_client), ('bolt', self._bolt_storage_client)]:
+            upload_op = partial(self._upload_blob, storage_client, bucket_name)
+            discard_upload = partial(self._record_upload, BoltPerfHistogram(), BoltPerfHistogram(), {})
+
+            # delete a single object per request.
+            self._run_ops(upload_op, discard_upload)
+            op_times = BoltPerfHistogram()
+            not_found = [0]
+            op_wall_time = self._run_ops(partial(self._delete_blob, storage_client, bucket_name),
+                                         partial(self._record_delete, op_times, not_found))
+
+            # delete BATCH_SIZE objects per batch request.
+            self._run_ops(upload_op, discard_upload)
+            batch_times = BoltPerfHistogram()
+            batch_counts = [0, 0]
+            batch_wall_time = self._run_ops(partial(self._delete_blobs_batch, storage_client, bucket_name),
+                                            partial(self._record_batch, batch_times, batch_counts),
+                                            keys=BoltBatch.batches(self._iter_keys(), self.BATCH_SIZE))
+
+            op_tp = op_times.count / op_wall_time if op_wall_time else 0
+            batch_tp = batch_counts[0] / batch_wall_time if batch_wall_time else 0
+            batch_perf_stats = self._compute_perf_stats(batch_times)
+            batch_perf_stats['throughput'] = {
+                'objects': "{:.2f} objects/sec".format(batch_tp),
+                'batches': "{:.2f} batches/sec".format(batch_times.count / batch_wall_time if batch_wall_time else 0)
+            }
+            batch_perf_stats['objects_deleted'] = batch_counts[0]
+            batch_perf_stats['objects_failed'] = batch_counts[1]
+            op_perf_stats = self._compute_perf_stats(op_times, wall_time=op_wall_time)
+            op_perf_stats['objects_not_found'] = not_found[0]
+            del_obj_batch_perf_stats.update({
+                client_name + '_del_obj_perf_stats': op_perf_stats,
+                client_name + '_del_obj_batch_perf_stats': batch_perf_stats,
+                client_name + '_del_obj_batch_speedup': "{:.2f}x".format(batch_tp / op_tp if op_tp else 0)
+            })
+        del_obj_batch_perf_stats.update(self._connection_perf_stats())
+        return json.dumps(del_obj_batch_perf_stats, indent=4, sort_keys=True)
+
+    @staticmethod
+    def _delete_blobs_batch(storage_client, bucket_name, keys):
+        """
+        Deletes objects from Bolt / GS in a single batch request.
+
+        :param storage_client: Bolt / GS storage client
+        :param bucket_name: bucket name
+        :param keys: key names (up to BoltBatch.MAX_BATCH_SIZE)
+        :return: (latency (nanoseconds), no of objects deleted, no of objects not deleted)
+        """
+        bucket = storage_client.bucket(bucket_name)
+        batch = BoltBatch(storage_client)
+        batch_start_time = time.perf_counter_ns()
+        with batch:
+            for key in keys:
+                bucket.delete_blob(key)
+        batch_end_time = time.perf_counter_ns()
+        failed = sum(1 for error in batch.errors if error is not None)
+        return batch_end_time - batch_start_time, len(keys) - failed, failed
+
+    @staticmethod
+    def _record_batch(batch_times, batch_counts, result):
+        """
+        Records a result returned by _delete_blobs_batch.
+
+        :param batch_times: histogram of batch latencies to record into
+        :param batch_counts: [no of objects deleted, no of objects not deleted] to update
+        :param result: batch delete result
+        """
+        batch_time, deleted, failed = result
+        batch_times.record(batch_time)
+        batch_counts[0] += deleted
+        batch_counts[1] += failed
+
+    def _upload_blob(self, storage_client, bucket_name, key):
+        """
+        Uploads a single object to Bolt / GS, of the size the object size distribution gives its key (OBJ_LENGTH
+        bytes, by default). The object data is taken from pre-generated payloads, outside the timed path.
+
+        :param storage_client: Bolt / GS storage client
+        :param bucket_name: bucket name
+        :param key: key name
+        :return: (latency (nanoseconds), object size)
+        """
+        obj_size = self._obj_size_dist.size(key)
+        # the storage client takes bytes, copy the payload before the upload is timed.
+        value = self._payload_generator.next(obj_size).tobytes()
+        bucket = storage_client.bucket(bucket_name)
+        blob = bucket.blob(key)
+        obj_upload_start_time = time.perf_counter_ns()
+        blob.upload_from_string(value, content_type=self._payload_generator.content_type)
+        obj_upload_end_time = time.perf_counter_ns()
+        # calc latency
+        return obj_upload_end_time - obj_upload_start_time, obj_size
+
+    async def _upload_blob_async(self, storage_client, bucket_name, key):
+        """
+        Uploads a single object to Bolt / GS, as _upload_blob does, using the ASYNCIO engine. The payload is sent
+        without being copied.
+
+        :param storage_client: Bolt / GS storage client
+        :param bucket_name: bucket name
+        :param key: key name
+        :return: (latency (nanoseconds), object size)
+        """
+        obj_size = self._obj_size_dist.size(key)
+        value = self._payload_generator.next(obj_size)
+        obj_upload_start_time = time.perf_counter_ns()
+        await self._async_engine.upload_object(storage_client, bucket_name, key, value,
+                                               self._payload_generator.content_type)
+        obj_upload_end_time = time.perf_counter_ns()
+        return obj_upload_end_time - obj_upload_start_time, obj_size
+
+    def _delete_blob(self, storage_client, bucket_name, key):
+        """
+        Deletes a single object from Bolt / GS.
+
+        :param storage_client: Bolt / GS storage client
+        :param bucket_name: bucket name
+        :param key: key name
+        :return: latency (nanoseconds) or None if the object doesn't exist
+        """
+        bucket = storage_client.bucket(bucket_name)
+        blob = bucket.blob(key)
+        obj_del_start_time = time.perf_counter_ns()
+        try:
+            blob.delete()
+        except NotFound:
+            # not uploaded (e.g. upload phase stopped by durationSecs).
+            return None
+        obj_del_end_time = time.perf_counter_ns()
+        # calc latency.
+        return obj_del_end_time - obj_del_start_time
+
+    async def _delete_blob_async(self, storage_client, bucket_name, key):
+        """
+        Deletes a single object from Bolt / GS, as _delete_blob does, using the ASYNCIO engine.
+
+        :param storage_client: Bolt / GS storage client
+        :param bucket_name: bucket name
+        :param key: key name
+        :return: latency (nanoseconds) or None if the object doesn't exist
+        """
+        obj_del_start_time = time.perf_counter_ns()
+        try:
+            await self._async_engine.delete_object(storage_client, bucket_name, key)
+        except NotFound:
+            return None
+        obj_del_end_time = time.perf_counter_ns()
+        return obj_del_end_time - obj_del_start_time
+
+    def _saturation_sweep_perf(self, bucket_name):
+        """
+        Runs the Upload, Download and Delete Object workloads against Bolt / GS at increasing concurrency
+        levels (1, 2, 4, ... MAX_CONCURRENCY) and returns the throughput vs latency curve of each workload,
+        along with its knee point i.e. the lowest concurrency at which p99 latency exceeds KNEE_FACTOR times
+        the p99 latency at concurrency 1.
+
+        :param bucket_name: bucket name
+        :return: Saturation sweep performance statistics
+        """
+        levels = []
+        concurrency = 1
+        while concurrency < self.MAX_CONCURRENCY:
+            levels.append(concurrency)
+            concurrency *= 2
+        levels.append(self.MAX_CONCURRENCY)
+
+        workloads = [
+            ('upload_obj', self._upload_blob),
+            ('download_obj', self._download_blob),
+            ('del_obj', self._delete_blob)
+        ]
+        storage_clients = [
+            ('gs', self._gs_storage_client),
+            ('bolt', self._bolt_storage_client)
+        ]
+
+        curves = {}
+        for concurrency in levels:
+            for workload_name, workload_op in workloads:
+                for client_name, storage_client in storage_clients:
+                    op_times = BoltPerfHistogram()
+                    not_found = None
+                    range_stats = None
+                    if workload_op == self._download_blob:
+                        obj_sizes = BoltPerfHistogram()
+                        range_stats = (BoltPerfHistogram(), BoltPerfHistogram())
+                        record = partial(self._record_download, op_times, obj_sizes, [0, 0, 0], {}, range_stats)
+                    elif workload_op == self._upload_blob:
+                        obj_sizes = BoltPerfHistogram()
+                        record = partial(self._record_upload, op_times, obj_sizes, {})
+                    else:
+                        obj_sizes = None
+                        not_found = [0]
+                        record = partial(self._record_delete, op_times, not_found)
+                    wall_time = self._run_ops(self._engine_op(workload_op, storage_client, bucket_name), record,
+                                              concurrency=concurrency)
+                    curve_name = '{}_{}_sweep'.format(client_name, workload_name)
+                    sweep_point = self._sweep_point(concurrency, op_times, obj_sizes, wall_time)
+                    if not_found is not None:
+                        sweep_point['objects_not_found'] = not_found[0]
+                    if range_stats is not None and range_stats[0].count:
+                        sweep_point['range_perf_stats'] = self._compute_perf_stats(range_stats[0],
+                                                                                   obj_sizes=range_stats[1])
+                    curves.setdefault(curve_name, []).append(sweep_point)
+
+        sweep_perf_stats = {
+            'knee_factor': self.KNEE_FACTOR,
+            'engine': self.ENGINE.lower()
+        }
+        if self.RANGE_MODE:
+            sweep_perf_stats['range_mode'] = self.RANGE_MODE.lower()
+            sweep_perf_stats['num_ranges'] = self.NUM_RANGES
+        for curve_name, curve in curves.items():
+            sweep_perf_stats[curve_name] = {
+                'curve': curve,
+                'knee_concurrency': self._find_knee(curve)
+            }
+        sweep_perf_stats.update(self._connection_perf_stats())
+        return json.dumps(sweep_perf_stats, indent=4, sort_keys=True)
+
+    def _sweep_point(self, concurrency, op_times, obj_sizes, wall_time):
+        """
+        Computes a single point of a saturation sweep curve.
+
+        :param concurrency: concurrency level
+        :param op_times: histogram of latencies
+        :param obj_sizes: histogram of object sizes
+        :param wall_time: elapsed wall time (secs) of all the ops
+        :return: sweep point (concurrency, throughput, p50 / p99 latency, performance statistics)
+        """
+        return {
+            'concurrency': concurrency,
+            'throughput_objects_per_sec': op_times.count / wall_time,
+            'latency_p50_ms': op_times.percentile(0.5) / 1e6,
+            'latency_p99_ms': op_times.percentile(0.99) / 1e6,
+            'perf_stats': self._compute_perf_stats(op_times, obj_sizes=obj_sizes, wall_time=wall_time)
+        }
+
+    def _find_knee(self, curve):
+        """
+        Finds the knee point of a saturation sweep curve.
+
+        :param curve: list of sweep points ordered by concurrency
+        :return: concurrency at which p99 latency exceeds KNEE_FACTOR times the baseline p99, or None
+        """
+        baseline_p99 = curve[0]['latency_p99_ms']
+        for point in curve[1:]:
+            if point['latency_p99_ms'] > baseline_p99 * self.KNEE_FACTOR:
+                return point['concurrency']
+        return None
+
+    def _distributed_perf(self, bucket_name):
+        """
+        Splits the keys into WORKERS (interleaved) shards, runs the requested benchmark on each shard concurrently, using
+        in-process workers or the bolt_gs_perf_handler functions at WORKER_URLS, and merges the statistics
+        returned by the workers into a single report.
+
+        :param bucket_name: bucket name
+        :return: merged performance statistics
+        """
+        if self._request_type not in self.DISTRIBUTED_REQUEST_TYPES:
+            raise ValueError("requestType {} can't be run by workers".format(self._request_type.lower()))
+
+        key_pages = self._request_json.get('keyPages')
+        if key_pages is None and self._key_source.func == self._list_objects:
+            # the keys are listed once and each worker lists (with their metadata) its own pages of them, rather
+            # than every worker listing all the keys.
+            key_pages = self._list_key_pages(bucket_name)
+
+        worker_requests = []
+        for worker in range(self.WORKERS):
+            worker_json = {name: value for name, value in self._request_json.items()
+                           if name not in ('workers', 'workerUrls', 'workerTimeout', 'keyShard', 'keyShards')}
+            worker_json['rawStats'] = True
+            if key_pages is not None:
+                # each worker uses every WORKERS'th page of the listed keys.
+                worker_json['keyPages'] = key_pages[worker::self.WORKERS]
+            else:
+                # each worker produces the same keys and uses every WORKERS'th one (of its shard).
+                worker_json['keyShard'] = self.KEY_SHARD + worker * self.KEY_SHARDS
+                worker_json['keyShards'] = self.KEY_SHARDS * self.WORKERS
+            if self.TARGET_RPS:
+                # the target rate is shared by the workers.
+                worker_json['targetRps'] = self.TARGET_RPS / self.WORKERS
+            worker_requests.append(worker_json)
+
+        with ThreadPoolExecutor(max_workers=self.WORKERS) as executor:
+            worker_stats = list(executor.map(self._invoke_worker, range(self.WORKERS), worker_requests))
+
+        for raw_stats in worker_stats:
+            self._merge_raw_stats(raw_stats)
+
+        if self._request_type == "UPLOAD_OBJECT":
+            return self._upload_object_perf_stats()
+        elif self._request_type == "DELETE_OBJECT":
+            return self._delete_object_perf_stats()
+        elif self._request_type == "DOWNLOAD_OBJECT" or self._request_type == "DOWNLOAD_OBJECT_TTFB":
+            return self._download_object_perf_stats()
+        else:
+            return self._download_object_passthrough_perf_stats()
+
+    def _invoke_worker(self, worker, worker_json):
+        """
+        Runs a benchmark on a worker: in-process, or by invoking the bolt_gs_perf_handler function at one of
+        WORKER_URLS (assigned round-robin). Functions are invoked with an ID token for the function URL (from the
+        metadata server or GOOGLE_APPLICATION_CREDENTIALS), as they don't allow unauthenticated invocations, and
+        the request fails if the worker doesn't respond within WORKER_TIMEOUT secs.
+
+        :param worker: worker index
+        :param worker_json: JSON request of the worker
+        :return: serialized statistics returned by the worker
+        """
+        if self.WORKER_URLS:
+            worker_url = self.WORKER_URLS[worker % len(self.WORKER_URLS)]
+            token = id_token.fetch_id_token(Request(), worker_url)
+            response = requests.post(worker_url, json=worker_json, headers={'Authorization': 'Bearer ' + token},
+                                     timeout=(BoltClientCache.CONNECT_TIMEOUT, self.WORKER_TIMEOUT))
+            response.raise_for_status()
+            raw_stats = response.json()
+        else:
+            raw_stats = BoltGSPerf()._process_request_json(worker_json)
+        if 'errorMessage' in raw_stats:
+            raise RuntimeError("worker {} failed: {}".format(worker, raw_stats['errorMessage']))
+        return raw_stats
+
+    def _size_class_perf_stats(self, op_name):
+        """
+        Computes the performance statistics of each object size class, if the objects span more than one.
+
+        :param op_name: name of the operation, used to name the statistics
+        :return: {gs|bolt}_<op_name>_perf_stats_by_size_class statistics
+        """
+        size_class_perf_stats = {}
+        for client_name, size_classes in [('gs', self._gs_size_classes), ('bolt', self._bolt_size_classes)]:
+            if len(size_classes) > 1:
+                size_class_perf_stats['{}_{}_perf_stats_by_size_class'.format(client_name, op_name)] = {
+                    class_name: self._compute_perf_stats(class_op_times, obj_sizes=class_obj_sizes)
+                    for class_name, (class_op_times, class_obj_sizes) in size_classes.items()
+                }
+        return size_class_perf_stats
+
+    def _range_perf_stats(self, op_name):
+        """
+        Computes the range latency / throughput statistics of ranged downloads.
+
+        :param op_name: name of the operation, used to name the statistics
+        :return: range mode and {gs|bolt}_<op_name>_range_perf_stats statistics, if downloads were ranged
+        """
+        if not self.RANGE_MODE:
+            return {}
+        range_perf_stats = {
+            'range_mode': self.RANGE_MODE.lower(),
+            'num_ranges': self.NUM_RANGES
+        }
+        if self.RANGE_MODE == 'RANDOM':
+            range_perf_stats['range_size'] = "{:d} bytes".format(self.RANGE_SIZE)
+        for client_name, (range_times, range_sizes), wall_time in [
+                ('gs', self._gs_range_stats, self._gs_wall_time),
+                ('bolt', self._bolt_range_stats, self._bolt_wall_time)]:
+            if range_times.count:
+                perf_stats = self._compute_perf_stats(range_times, obj_sizes=range_sizes)
+                perf_stats['aggregate_throughput'] = "{:.2f} MB/sec".format(
+                    range_sizes.total / wall_time / (1024 * 1024) if wall_time else 0)
+                range_perf_stats['{}_{}_range_perf_stats'.format(client_name, op_name)] = perf_stats
+        return range_perf_stats
+
+    def _rate_perf_stats(self, op_name):
+        """
+        Computes the target vs achieved rate of open loop runs, and the delays of op starts past their due times
+        (ops waiting for a free worker, high if CONCURRENCY is too low for TARGET_RPS at the observed latencies).
+
+        :param op_name: name of the operation, used to name the statistics
+        :return: target rate and {gs|bolt}_<op_name>_rate statistics, if run open loop
+        """
+        if not self.TARGET_RPS:
+            return {}
+        rate_perf_stats = {
+            'target_rps': self.TARGET_RPS
+        }
+        for client_name, schedule_lags, wall_time in [('gs', self._gs_schedule_lags, self._gs_wall_time),
+                                                      ('bolt', self._bolt_schedule_lags, self._bolt_wall_time)]:
+            if schedule_lags.count:
+                rate_perf_stats['{}_{}_rate'.format(client_name, op_name)] = {
+                    'target': "{:.2f} ops/sec".format(self.TARGET_RPS),
+                    'achieved': "{:.2f} ops/sec".format(schedule_lags.count / wall_time if wall_time else 0),
+                    'schedule_lag': self._compute_perf_stats(schedule_lags)['latency']
+                }
+        return rate_perf_stats
+
+    def _export_raw_stats(self):
+        """
+        Returns the recorded statistics in a serializable format that can be merged (see _merge_raw_stats)
+        with the statistics of other runs.
+
+        :return: serialized statistics
+        """
+        connection_stats = self._connection_stats_delta()
+        return {
+            'gs': {
+                'connections': connection_stats.get('gs'),
+                'op_times': self._gs_op_times.to_dict(),
+                'obj_sizes': self._gs_obj_sizes.to_dict(),
+                'range_times': self._gs_range_stats[0].to_dict(),
+                'range_sizes': self._gs_range_stats[1].to_dict(),
+                'size_classes': {class_name: [class_op_times.to_dict(), class_obj_sizes.to_dict()]
+                                 for class_name, (class_op_times, class_obj_sizes) in self._gs_size_classes.items()},
+                'cmp_obj_count': self._gs_cmp_obj_count,
+                'uncmp_obj_count': self._gs_uncmp_obj_count,
+                'metadata_requests': self._gs_metadata_requests,
+                'not_found_count': self._gs_not_found_count,
+                'schedule_lags': self._gs_schedule_lags.to_dict(),
+                'wall_time': self._gs_wall_time
+            },
+            'bolt': {
+                'connections': connection_stats.get('bolt'),
+                'op_times': self._bolt_op_times.to_dict(),
+                'obj_sizes': self._bolt_obj_sizes.to_dict(),
+                'range_times': self._bolt_range_stats[0].to_dict(),
+                'range_sizes': self._bolt_range_stats[1].to_dict(),
+                'size_classes': {class_name: [class_op_times.to_dict(), class_obj_sizes.to_dict()]
+                                 for class_name, (class_op_times, class_obj_sizes) in self._bolt_size_classes.items()},
+                'cmp_obj_count': self._bolt_cmp_obj_count,
+                'uncmp_obj_count': self._bolt_uncmp_obj_count,
+                'metadata_requests': self._bolt_metadata_requests,
+                'not_found_count': self._bolt_not_found_count,
+                'schedule_lags': self._bolt_schedule_lags.to_dict(),
+                'wall_time': self._bolt_wall_time
+            }
+        }
+
+    def _merge_raw_stats(self, raw_stats):
+        """
+        Merges serialized statistics (see _export_raw_stats) into the recorded statistics.
+        Runs are assumed to have run concurrently i.e. the merged wall time is the longest of them.
+
+        :param raw_stats: serialized statistics
+        """
+        for client_name in ['gs', 'bolt']:
+            worker_connection_stats = raw_stats[client_name].get('connections')
+            if worker_connection_stats:
+                connection_stats = self._worker_connection_stats.setdefault(client_name, {})
+                for stat_name, stat_value in worker_connection_stats.items():
+                    connection_stats[stat_name] = connection_stats.get(stat_name, 0) + stat_value
+
+        gs_stats = raw_stats['gs']
+        self._gs_op_times.merge(BoltPerfHistogram.from_dict(gs_stats['op_times']))
+        self._gs_obj_sizes.merge(BoltPerfHistogram.from_dict(gs_stats['obj_sizes']))
+        self._merge_size_classes(self._gs_size_classes, gs_stats['size_classes'])
+        self._gs_range_stats[0].merge(BoltPerfHistogram.from_dict(gs_stats['range_times']))
+        self._gs_range_stats[1].merge(BoltPerfHistogram.from_dict(gs_stats['range_sizes']))
+        self._gs_cmp_obj_count += gs_stats['cmp_obj_count']
+        self._gs_uncmp_obj_count += gs_stats['uncmp_obj_count']
+        self._gs_metadata_requests += gs_stats['metadata_requests']
+        self._gs_not_found_count += gs_stats['not_found_count']
+        self._gs_schedule_lags.merge(BoltPerfHistogram.from_dict(gs_stats['schedule_lags']))
+        self._gs_wall_time = max(self._gs_wall_time, gs_stats['wall_time'])
+
+        bolt_stats = raw_stats['bolt']
+        self._bolt_op_times.merge(BoltPerfHistogram.from_dict(bolt_stats['op_times']))
+        self._bolt_obj_sizes.merge(BoltPerfHistogram.from_dict(bolt_stats['obj_sizes']))
+        self._merge_size_classes(self._bolt_size_classes, bolt_stats['size_classes'])
+        self._bolt_range_stats[0].merge(BoltPerfHistogram.from_dict(bolt_stats['range_times']))
+        self._bolt_range_stats[1].merge(BoltPerfHistogram.from_dict(bolt_stats['range_sizes']))
+        self._bolt_cmp_obj_count += bolt_stats['cmp_obj_count']
+        self._bolt_uncmp_obj_count += bolt_stats['uncmp_obj_count']
+        self._bolt_metadata_requests += bolt_stats['metadata_requests']
+        self._bolt_not_found_count += bolt_stats['not_found_count']
+        self._bolt_schedule_lags.merge(BoltPerfHistogram.from_dict(bolt_stats['schedule_lags']))
+        self._bolt_wall_time = max(self._bolt_wall_time, bolt_stats['wall_time'])
+
+    @staticmethod
+    def _merge_size_classes(size_classes, raw_size_classes):
+        """
+        Merges serialized size class statistics into the recorded ones.
+
+        :param size_classes: dict of size class name to (latency histogram, object size histogram)
+        :param raw_size_classes: serialized size class statistics
+        """
+        for class_name, (raw_op_times, raw_obj_sizes) in raw_size_classes.items():
+            if class_name not in size_classes:
+                size_classes[class_name] = (BoltPerfHistogram(), BoltPerfHistogram())
+            class_op_times, class_obj_sizes = size_classes[class_name]
+            class_op_times.merge(BoltPerfHistogram.from_dict(raw_op_times))
+            class_obj_sizes.merge(BoltPerfHistogram.from_dict(raw_obj_sizes))
+
     def _all_perf(self, bucket_name):
         """
         Measures Upload, Download, Delete, List Objects
@@ -394,6 +1968,10 @@ class BoltGSPerf:
         """
         # Upload / Delete Objects using generated key names.
         upload_obj_perf_stats = self._upload_object_perf(bucket_name)
+        if self.NUM_KEYS is None:
+            # delete the keys uploaded before durationSecs expired.
+            self._key_source = partial(self._generate_key_names,
+                                       max(self._gs_op_times.count, self._bolt_op_times.count) * self.KEY_SHARDS)
         self._clear_stats()
         del_obj_perf_stats = self._delete_object_perf(bucket_name)
         self._clear_stats()
@@ -402,8 +1980,8 @@ class BoltGSPerf:
         list_objs_perf_stats = self._list_objects_perf(bucket_name)
         self._clear_stats()
 
-        # Get the list of objects before download_obj_perf_test.
-        self._keys = self._list_objects(bucket_name)
+        # List objects during download_obj_perf_test.
+        self._key_source = partial(self._list_objects, bucket_name)
         download_obj_perf_stats = self._download_object_perf(bucket_name)
 
         all_perf_stats = self._merge_perf_stats(upload_obj_perf_stats,
@@ -425,110 +2003,212 @@ class BoltGSPerf:
             merged_perf_stats.update(perf_stat)
         return merged_perf_stats
 
-    def _compute_perf_stats(self, op_times, op_tp=None, obj_sizes=None):
+    def _compute_perf_stats(self, op_times, op_tp=None, obj_sizes=None, wall_time=None):
         """
         Compute performance statistics
+        Latencies are reported both as human readable strings and as raw values in milliseconds (<name>_ms).
 
-        :param op_times: list of latencies
+        :param op_times: histogram of latencies (nanoseconds)
         :param op_tp: list of throughputs
-        :param obj_sizes: list of object sizes
+        :param obj_sizes: histogram of object sizes
+        :param wall_time: elapsed wall time (secs) of all the ops (aggregate throughput is computed over it, if passed)
         :return: performance statistics (latency, throughput, object size)
         """
         # calc op latency perf.
-        op_avg_time = mean(op_times)
-        op_time_p50 = median_low(op_times)
-        op_times.sort()
-        p90_index = int(len(op_times) * 0.9)
-        op_time_p90 = op_times[p90_index]
+        latency_perf_stats = {
+            'count': op_times.count
+        }
+        for stat_name, op_time in [('average', op_times.mean()),
+                                   ('min', op_times.min or 0),
+                                   ('p50', op_times.percentile(0.5)),
+                                   ('p90', op_times.percentile(0.9)),
+                                   ('p95', op_times.percentile(0.95)),
+                                   ('p99', op_times.percentile(0.99)),
+                                   ('p99.9', op_times.percentile(0.999)),
+                                   ('max', op_times.max or 0)]:
+            latency_perf_stats[stat_name] = self._format_latency(op_time)
+            latency_perf_stats[stat_name + '_ms'] = round(op_time / 1e6, 3)
 
         # calc op throughout perf.
         if op_tp:
             op_avg_tp = mean(op_tp)
             op_tp_p50 = median_low(op_tp)
             op_tp.sort()
-            p90_index = int(len(op_tp) * 0.9)
-            op_tp_p90 = op_tp[p90_index]
+            op_tp_p90 = self._percentile(op_tp, 0.9)
             tp_perf_stats = {
                 'average': "{:.2f} objects/sec".format(op_avg_tp),
                 'p50': "{:.2f} objects/sec".format(op_tp_p50),
                 'p90': "{:.2f} objects/sec".format(op_tp_p90)
             }
+        elif wall_time:
+            tp_perf_stats = {
+                'objects': "{:.2f} objects/sec".format(op_times.count / wall_time)
+            }
+            if obj_sizes:
+                tp_perf_stats['bytes'] = "{:.2f} bytes/sec".format(obj_sizes.total / wall_time)
+        elif obj_sizes:
+            # throughput of a single stream of ops.
+            op_secs = op_times.total / 1e9
+            tp_perf_stats = {
+                'objects': "{:.2f} objects/sec".format(op_times.count / op_secs if op_secs else 0),
+                'bytes': "{:.2f} bytes/sec".format(obj_sizes.total / op_secs if op_secs else 0)
+            }
         else:
-            tp = len(op_times) / math.fsum(op_times)
+            tp = op_times.count / (op_times.total / 1e9) if op_times.total else 0
             tp_perf_stats = "{:.2f} objects/sec".format(tp)
 
-        # calc obj size metrics.
-        if obj_sizes:
-            obj_avg_size = mean(obj_sizes)
-            obj_sizes_p50 = median_low(obj_sizes)
-            obj_sizes.sort()
-            p90_index = int(len(obj_sizes) * 0.9)
-            obj_sizes_p90 = obj_sizes[p90_index]
-            obj_sizes_perf_stats = {
-                'average': "{:.2f} bytes".format(obj_avg_size),
-                'p50': "{:.2f} bytes".format(obj_sizes_p50),
-                'p90': "{:.2f} bytes".format(obj_sizes_p90)
-            }
-
         perf_stats = {
-            'latency': {
-                'average': "{:.2f} secs".format(op_avg_time),
-                'p50': "{:.2f} secs".format(op_time_p50),
-                'p90': "{:.2f} secs".format(op_time_p90)
-            },
+            'latency': latency_perf_stats,
             'throughput': tp_perf_stats
         }
+
+        # calc obj size metrics.
         if obj_sizes:
-            perf_stats['object_size'] = obj_sizes_perf_stats
+            perf_stats['object_size'] = {
+                'average': "{:.2f} bytes".format(obj_sizes.mean()),
+                'p50': "{:.2f} bytes".format(obj_sizes.percentile(0.5)),
+                'p90': "{:.2f} bytes".format(obj_sizes.percentile(0.9))
+            }
 
         return perf_stats
 
+    @staticmethod
+    def _format_latency(latency):
+        """
+        Formats a latency in the most readable unit.
+
+        :param latency: latency (nanoseconds)
+        :return: formatted latency
+        """
+        if latency < 1e6:
+            return "{:.2f} \u00b5s".format(latency / 1e3)
+        elif latency < 1e9:
+            return "{:.2f} ms".format(latency / 1e6)
+        return "{:.2f} secs".format(latency / 1e9)
+
+    def _percentile(self, sorted_values, percentile):
+        """
+        Returns the value at the given percentile of a sorted list.
+
+        :param sorted_values: sorted list of values
+        :param percentile: percentile (0.0 - 1.0)
+        :return: value at percentile
+        """
+        index = min(int(len(sorted_values) * percentile), len(sorted_values) - 1)
+        return sorted_values[index]
+
     def _clear_stats(self):
         """
         clears the structures maintaining performance statistics.
         """
 
-        self._bolt_op_times.clear()
-        self._gs_op_times.clear()
+        self._bolt_op_times = BoltPerfHistogram()
+        self._gs_op_times = BoltPerfHistogram()
         self._bolt_op_tp.clear()
         self._gs_op_tp.clear()
-        self._bolt_obj_sizes.clear()
-        self._gs_obj_sizes.clear()
+        self._bolt_obj_sizes = BoltPerfHistogram()
+        self._gs_obj_sizes = BoltPerfHistogram()
+        self._bolt_size_classes = {}
+        self._gs_size_classes = {}
+        self._bolt_range_stats = (BoltPerfHistogram(), BoltPerfHistogram())
+        self._gs_range_stats = (BoltPerfHistogram(), BoltPerfHistogram())
+        self._bolt_schedule_lags = BoltPerfHistogram()
+        self._gs_schedule_lags = BoltPerfHistogram()
         self._gs_cmp_obj_count = 0
         self._gs_uncmp_obj_count = 0
         self._bolt_cmp_obj_count = 0
         self._bolt_uncmp_obj_count = 0
+        self._gs_metadata_requests = 0
+        self._bolt_metadata_requests = 0
+        self._gs_not_found_count = 0
+        self._bolt_not_found_count = 0
+        self._gs_wall_time = 0
+        self._bolt_wall_time = 0
 
-    def _generate_key_names(self, num_objects):
+    def _generate_key_names(self, num_objects, key_prefix=KEY_PREFIX):
         """
         Generate Object names to be used in Upload/Delete Object operations.
-        :param num_objects: number of objects
-        :return: list of object names
+        :param num_objects: number of objects (None - unbounded)
+        :param key_prefix: prefix of the object names
+        :return: generator of object names
+        """
+        indexes = itertools.count() if num_objects is None else range(num_objects)
+        for x in indexes:
+            yield key_prefix + str(x)
+
+    def _list_objects(self, bucket_name, page_token=None, num_keys=None):
+        """
+        Lists (up to NUM_KEYS) objects from the given bucket in Bolt/GS, fetching a page at a time as the names are
+        consumed. The size and content encoding of the listed objects (of KEY_SHARD) are kept until they are
+        downloaded, so that downloads don't need to retrieve them.
+        :param bucket_name: bucket name
+        :param page_token: token of the page to start listing at (None - first page)
+        :param num_keys: max. no of objects to list, if not NUM_KEYS
+        :return: generator of object names
         """
-        objects = []
-        for x in range(num_objects):
-            obj_name = 'bolt-gs-perf' + str(x)
-            objects.append(obj_name)
-        return objects
+        fields = BoltPartialResponse.list_fields(self._object_fields('name', 'size', 'contentEncoding'),
+                                                 'nextPageToken')
+        blobs = self._gs_storage_client.list_blobs(bucket_name, max_results=num_keys or self.NUM_KEYS,
+                                                   page_token=page_token, fields=fields)
+        for index, blob in enumerate(blobs):
+            # keys of other shards are skipped by _iter_keys, their metadata isn't kept.
+            if index % self.KEY_SHARDS == self.KEY_SHARD:
+                self._key_md[blob.name] = (blob.size, blob.content_encoding)
+            yield blob.name
 
-    def _generate(self, characters=string.ascii_lowercase, length=10):
+    def _list_key_pages(self, bucket_name):
         """
-        Generate a random string of certain length
-        :param characters: character set to be used
-        :param length: length of the string.
-        :return: generated string
+        Lists (up to NUM_KEYS) objects from the given bucket in GS, requesting only their names, and returns the
+        pages they were listed in, to be listed again (with the metadata of the objects) by the workers of a
+        distributed run, a page per worker at a time.
+        :param bucket_name: bucket name
+        :return: list of {'pageToken': token of the page (None - first page), 'numKeys': no of objects in the page}
         """
-        return ''.join(random.choice(characters) for _ in range(length))
+        blobs = self._gs_storage_client.list_blobs(bucket_name, max_results=self.NUM_KEYS,
+                                                   fields=BoltPartialResponse.list_fields(['name'], 'nextPageToken'))
+        key_pages = []
+        page_token = None
+        for page in blobs.pages:
+            if page.num_items:
+                key_pages.append({'pageToken': page_token, 'numKeys': page.num_items})
+            page_token = blobs.next_page_token
+        return key_pages
 
-    def _list_objects(self, bucket_name):
+    def _list_key_pages_objects(self, bucket_name, key_pages):
         """
-        Returns a list of 1000 objects from the given bucket in Bolt/GS
+        Lists the objects of the given pages (see _list_key_pages), a page at a time as the names are consumed.
         :param bucket_name: bucket name
-        :return: list of 1000 objects
+        :param key_pages: list of {'pageToken', 'numKeys'}
+        :return: generator of object names
+        """
+        for key_page in key_pages:
+            yield from self._list_objects(bucket_name, page_token=key_page['pageToken'],
+                                          num_keys=key_page['numKeys'])
+
+    def _read_key_manifest(self, bucket_name):
+        """
+        Reads the key names (one per line) from the KEY_MANIFEST object, KEY_MANIFEST_CHUNK_SIZE bytes at a time.
+        :param bucket_name: bucket holding the manifest, unless KEY_MANIFEST is a gs:// URI
+        :return: generator of (up to NUM_KEYS) object names
         """
-        blobs = self._gs_storage_client.list_blobs(bucket_name, max_results=1000)
-        blob_names = []
-        for blob in blobs:
-            blob_names.append(blob.name)
+        manifest_name = self.KEY_MANIFEST
+        if manifest_name.startswith('gs://'):
+            bucket_name, manifest_name = manifest_name[len('gs://'):].split('/', 1)
+        blob = self._gs_storage_client.bucket(bucket_name).get_blob(manifest_name)
+        if blob is None:
+            raise ValueError("key manifest {} not found".format(self.KEY_MANIFEST))
 
-        return blob_names
+        num_keys = 0
+        partial_line = b''
+        for start in range(0, blob.size, self.KEY_MANIFEST_CHUNK_SIZE):
+            end = min(start + self.KEY_MANIFEST_CHUNK_SIZE, blob.size) - 1
+            lines = (partial_line + blob.download_as_bytes(start=start, end=end, raw_download=True)).split(b'\n')
+            partial_line = lines.pop()
+            for line in lines + ([partial_line] if end == blob.size - 1 else []):
+                key = line.decode('utf-8').strip()
+                if not key:
+                    continue
+                if self.NUM_KEYS is not None and num_keys >= self.NUM_KEYS:
+                    return
+                num_keys += 1
+                yield key
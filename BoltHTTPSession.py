@@ -0,0 +1,79 @@
+import threading
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from google.auth.transport.requests import AuthorizedSession
+
+
+class BoltHTTPSession(AuthorizedSession):
+    """
+    BoltHTTPSession is the authorized HTTP session used by the GS / Bolt storage clients, with an explicit
+    connection pool (pool size, keep-alive), transport level retry policy and default connect / read timeouts (for
+    requests that don't pass a timeout of their own), instead of the library defaults (a pool of 10 connections per
+    host, no connect timeout). It also keeps track of the
+    connections opened vs requests served, to show how well connections are reused.
+    """
+
+    # status codes retried by the transport.
+    RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+
+    def __init__(self, credentials, pool_size=10, keep_alive=True, max_retries=0, backoff_factor=0.5,
+                 connect_timeout=10, read_timeout=60):
+        super().__init__(credentials)
+        self.pool_size = pool_size
+        self.keep_alive = keep_alive
+        self.max_retries = max_retries
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self._stats_lock = threading.Lock()
+        self._requests = 0
+        self._new_connections = 0
+
+        retry = Retry(total=max_retries, backoff_factor=backoff_factor, status_forcelist=self.RETRY_STATUS_CODES,
+                      raise_on_status=False)
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+        # count the connections opened by the pools (including re-connects of dropped connections).
+        adapter.poolmanager.pool_classes_by_scheme = {
+            scheme: self._counting_pool_class(pool_class)
+            for scheme, pool_class in adapter.poolmanager.pool_classes_by_scheme.items()
+        }
+        self.mount('https://', adapter)
+        self.mount('http://', adapter)
+        if not keep_alive:
+            self.headers['Connection'] = 'close'
+
+    def request(self, method, url, *args, **kwargs):
+        """
+        Sends a request, using the configured connect / read timeouts unless the caller passes its own.
+        """
+        kwargs.setdefault('timeout', (self.connect_timeout, self.read_timeout))
+        with self._stats_lock:
+            self._requests += 1
+        return super().request(method, url, *args, **kwargs)
+
+    def connection_stats(self):
+        """
+        Returns the connection reuse statistics of the session (since it was created).
+        :return: {'requests': no of requests served, 'new_connections': no of connections opened}
+        """
+        with self._stats_lock:
+            return {
+                'requests': self._requests,
+                'new_connections': self._new_connections
+            }
+
+    def _connection_opened(self):
+        with self._stats_lock:
+            self._new_connections += 1
+
+    def _counting_pool_class(self, pool_class):
+        """
+        Returns a subclass of the given connection pool class, whose connections report each connect to the session.
+        """
+        session = self
+
+        class CountingConnection(pool_class.ConnectionCls):
+            def connect(self):
+                session._connection_opened()
+                return super().connect()
+
+        return type(pool_class.__name__, (pool_class,), {'ConnectionCls': CountingConnection})
@@ -0,0 +1,712 @@
+import argparse
+import base64
+import datetime
+import email.parser
+import gzip
+import hashlib
+import itertools
+import json
+import random
+import re
+import threading
+import time
+import uuid
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, quote, unquote, urlsplit
+import google_crc32c
+
+
+class BoltLocalServer:
+    """
+    BoltLocalServer is a local, in-memory stand-in for the GS / Bolt endpoints and the GCE metadata server, so the
+    handlers can be run end-to-end (and benchmarked reproducibly) without a cloud deployment. It emulates the subset
+    of the GS JSON API used by this project: buckets (get, list), objects (get, list with prefix / delimiter /
+    pagination, media download with Range and decompressive transcoding, media / multipart / resumable upload,
+    delete), batch requests and partial responses (fields), and the metadata server endpoints used by
+    google.auth.default(), google.oauth2.id_token.fetch_id_token and BoltClientCache.get_region.
+    Latency, bandwidth and errors can be injected into the storage requests (the metadata endpoints are never
+    slowed down or failed); injected jitter and errors are drawn from a seeded random generator.
+
+    To point the handlers at it (see README.md):
+        GCE_METADATA_HOST=<host:port> GCE_METADATA_IP=<host:port> STORAGE_EMULATOR_HOST=http://<host:port>
+        BOLT_URL=http://<host:port of a second server, sharing the store>
+    """
+
+    # size of the chunks request / response bodies are read / written in (bandwidth is enforced per chunk).
+    CHUNK_SIZE = 64 * 1024
+    # max. no of objects per list objects page, if maxResults isn't passed.
+    DEFAULT_MAX_RESULTS = 1000
+
+    def __init__(self, host='127.0.0.1', port=0, latency=0.0, jitter=0.0, bandwidth=None, error_rate=0.0,
+                 error_codes=(503,), seed=None, project='local-project', zone='us-central1-a', store=None):
+        """
+        :param host: host to listen on
+        :param port: port to listen on (0 - any free port)
+        :param latency: latency (secs) added to each storage request, before the response is sent
+        :param jitter: max. random latency (secs) added on top of latency
+        :param bandwidth: max. rate (bytes/sec) request / response bodies are transferred at, per request
+                          (None - unlimited)
+        :param error_rate: fraction (0 - 1) of storage requests failed with one of error_codes
+        :param error_codes: HTTP status codes of injected errors
+        :param seed: seed of the random generator of jitter / injected errors (None - random)
+        :param project: project id returned by the metadata server
+        :param zone: zone returned by the metadata server (its region is used by get_region)
+        :param store: store of another BoltLocalServer to share (e.g. a GS and a Bolt endpoint serving the same
+                      objects with different latencies), None - new store
+        """
+        self.latency = latency
+        self.jitter = jitter
+        self.bandwidth = bandwidth
+        self.error_rate = error_rate
+        self.error_codes = list(error_codes)
+        self.project = project
+        self.zone = zone
+        self.store = store if store is not None else {
+            'lock': threading.Lock(),
+            # {bucket name: (bucket resource, {object name: (object resource, data)})}
+            'buckets': {},
+            # {upload id: (bucket name, object metadata, received data)} of resumable uploads
+            'uploads': {},
+            'generations': itertools.count(1)
+        }
+        self._random = random.Random(seed)
+        self._random_lock = threading.Lock()
+        self._httpd = ThreadingHTTPServer((host, port), self.RequestHandler)
+        self._httpd.daemon_threads = True
+        self._httpd.stand_in = self
+        self._thread = None
+
+    @property
+    def url(self):
+        """
+        :return: endpoint URL e.g. http://127.0.0.1:9000
+        """
+        host, port = self._httpd.server_address[:2]
+        return 'http://{}:{}'.format(host, port)
+
+    def start(self):
+        """
+        Starts serving requests in a background thread.
+        :return: endpoint URL
+        """
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self.url
+
+    def serve_forever(self):
+        self._httpd.serve_forever()
+
+    def stop(self):
+        """
+        Stops serving requests and closes the listening socket.
+        """
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def create_bucket(self, bucket_name):
+        """
+        Creates a bucket, if it doesn't exist. Buckets are also created by the first upload to them.
+        :param bucket_name: bucket name
+        """
+        with self.store['lock']:
+            self._bucket(bucket_name, create=True)
+
+    def put_object(self, bucket_name, object_name, data, content_type='application/octet-stream',
+                   content_encoding=None):
+        """
+        Creates / replaces an object.
+        :param bucket_name: bucket name
+        :param object_name: object name
+        :param data: object data (bytes)
+        :param content_type: content type
+        :param content_encoding: content encoding e.g. gzip
+        :return: object resource
+        """
+        metadata = {'name': object_name, 'contentType': content_type}
+        if content_encoding:
+            metadata['contentEncoding'] = content_encoding
+        return self._put_object(bucket_name, metadata, data)
+
+    def delete_object(self, bucket_name, object_name):
+        """
+        Deletes an object (e.g. to simulate a lost object in auto-heal tests), if it exists.
+        :param bucket_name: bucket name
+        :param object_name: object name
+        """
+        with self.store['lock']:
+            bucket = self.store['buckets'].get(bucket_name)
+            if bucket is not None:
+                bucket[1].pop(object_name, None)
+
+    def _injected_delay(self):
+        """
+        :return: latency (secs) to add to a storage request
+        """
+        if not self.jitter:
+            return self.latency
+        with self._random_lock:
+            return self.latency + self._random.uniform(0, self.jitter)
+
+    def _injected_error(self):
+        """
+        :return: HTTP status code to fail a storage request with, None if it isn't failed
+        """
+        if not self.error_rate:
+            return None
+        with self._random_lock:
+            if self._random.random() < self.error_rate:
+                return self._random.choice(self.error_codes)
+        return None
+
+    class RequestHandler(BaseHTTPRequestHandler):
+        """
+        Serves the HTTP requests of a BoltLocalServer.
+        """
+
+        protocol_version = 'HTTP/1.1'
+        # send small responses right away (no Nagle / delayed ACK stalls skewing the latencies).
+        disable_nagle_algorithm = True
+
+        def do_GET(self):
+            self._handle()
+
+        def do_POST(self):
+            self._handle()
+
+        def do_PUT(self):
+            self._handle()
+
+        def do_DELETE(self):
+            self._handle()
+
+        def log_message(self, format, *args):
+            pass
+
+        def _handle(self):
+            stand_in = self.server.stand_in
+            body = self._read_body(stand_in.bandwidth)
+            url = urlsplit(self.path)
+            base_url = 'http://' + self.headers.get('Host', '{}:{}'.format(*self.server.server_address[:2]))
+            if url.path == '/' or url.path.startswith('/computeMetadata/'):
+                status, headers, response_body = stand_in._metadata(url.path, dict(parse_qsl(url.query)))
+                return self._send(status, headers, response_body)
+
+            delay = stand_in._injected_delay()
+            error_code = stand_in._injected_error()
+            if error_code is not None:
+                status, headers, response_body = stand_in._error(error_code, 'Injected error')
+            else:
+                status, headers, response_body = stand_in._dispatch(self.command, self.path, self.headers, body,
+                                                                    base_url)
+            if delay:
+                time.sleep(delay)
+            self._send(status, headers, response_body, stand_in.bandwidth)
+
+        def _read_body(self, bandwidth=None):
+            """
+            Reads the request body (Content-Length or chunked), at up to bandwidth bytes/sec.
+            :return: request body
+            """
+            chunks = []
+            start_time = time.perf_counter()
+            if self.headers.get('Transfer-Encoding', '').lower() == 'chunked':
+                while True:
+                    chunk_size = int(self.rfile.readline().split(b';')[0], 16)
+                    if chunk_size == 0:
+                        # trailers.
+                        while self.rfile.readline() not in (b'\r\n', b'\n', b''):
+                            pass
+                        break
+                    chunks.append(self.rfile.read(chunk_size))
+                    self.rfile.readline()
+                    self._throttle(bandwidth, start_time, sum(len(chunk) for chunk in chunks))
+            else:
+                remaining = int(self.headers.get('Content-Length', 0))
+                while remaining:
+                    chunk = self.rfile.read(min(remaining, BoltLocalServer.CHUNK_SIZE))
+                    if not chunk:
+                        break
+                    chunks.append(chunk)
+                    remaining -= len(chunk)
+                    self._throttle(bandwidth, start_time, sum(len(chunk) for chunk in chunks))
+            return b''.join(chunks)
+
+        def _send(self, status, headers, body, bandwidth=None):
+            """
+            Sends a response, writing its body at up to bandwidth bytes/sec.
+            """
+            self.send_response(status)
+            for name, value in headers.items():
+                self.send_header(name, value)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            start_time = time.perf_counter()
+            for offset in range(0, len(body), BoltLocalServer.CHUNK_SIZE):
+                chunk = body[offset:offset + BoltLocalServer.CHUNK_SIZE]
+                self.wfile.write(chunk)
+                self._throttle(bandwidth, start_time, offset + len(chunk))
+
+        @staticmethod
+        def _throttle(bandwidth, start_time, bytes_transferred):
+            """
+            Sleeps until bytes_transferred bytes are due, at bandwidth bytes/sec since start_time.
+            """
+            if bandwidth:
+                delay = start_time + bytes_transferred / bandwidth - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+
+    def _metadata(self, path, params):
+        """
+        Serves a metadata server request.
+        :param path: request path
+        :param params: query parameters
+        :return: (status, headers, body)
+        """
+        headers = {'Metadata-Flavor': 'Google', 'Content-Type': 'application/text'}
+        service_account = 'default@{}.iam.gserviceaccount.com'.format(self.project)
+        if path == '/':
+            return 200, headers, b''
+        resource = path[len('/computeMetadata/v1/'):]
+        if resource == 'project/project-id':
+            value = self.project
+        elif resource == 'project/numeric-project-id':
+            value = '0'
+        elif resource == 'instance/zone':
+            value = 'projects/0/zones/{}'.format(self.zone)
+        elif re.match(r'^instance/service-accounts/[^/]+/?$', resource):
+            value = {'aliases': ['default'], 'email': service_account,
+                     'scopes': ['https://www.googleapis.com/auth/cloud-platform']}
+        elif re.match(r'^instance/service-accounts/[^/]+/token$', resource):
+            value = {'access_token': 'local-token', 'expires_in': 3600, 'token_type': 'Bearer'}
+        elif re.match(r'^instance/service-accounts/[^/]+/email$', resource):
+            value = service_account
+        elif re.match(r'^instance/service-accounts/[^/]+/identity$', resource):
+            # an (unsigned) ID token for the audience, as used to invoke other functions.
+            now = int(time.time())
+            value = '.'.join(base64.urlsafe_b64encode(json.dumps(part).encode()).decode().rstrip('=') for part in [
+                {'alg': 'none', 'typ': 'JWT'},
+                {'aud': params.get('audience'), 'email': service_account, 'iat': now, 'exp': now + 3600,
+                 'iss': 'https://accounts.google.com'}]) + '.'
+        else:
+            return 404, headers, b'Not Found'
+        if isinstance(value, dict):
+            headers['Content-Type'] = 'application/json'
+            value = json.dumps(value)
+        return 200, headers, value.encode()
+
+    def _dispatch(self, method, path, headers, body, base_url):
+        """
+        Serves a storage request.
+        :param method: HTTP method
+        :param path: request path, with the query string
+        :param headers: request headers
+        :param body: request body
+        :param base_url: URL of the endpoint the request was sent to (used in links)
+        :return: (status, headers, body)
+        """
+        url = urlsplit(path)
+        params = dict(parse_qsl(url.query))
+        routes = [
+            ('GET', r'^/storage/v1/b$', self._list_buckets),
+            ('GET', r'^/storage/v1/b/([^/]+)$', self._get_bucket),
+            ('GET', r'^/storage/v1/b/([^/]+)/o$', self._list_objects),
+            ('GET', r'^(?:/download)?/storage/v1/b/([^/]+)/o/(.+)$', self._get_object),
+            ('DELETE', r'^/storage/v1/b/([^/]+)/o/(.+)$', self._delete_object),
+            ('POST', r'^/upload/storage/v1/b/([^/]+)/o$', self._upload_object),
+            ('PUT', r'^/upload/storage/v1/b/([^/]+)/o$', self._upload_object_chunk),
+            ('POST', r'^/batch/storage/v1$', self._batch)
+        ]
+        for route_method, route_path, route_handler in routes:
+            match = re.match(route_path, url.path)
+            if match and route_method == method:
+                return route_handler(*[unquote(group) for group in match.groups()], params=params, headers=headers,
+                                     body=body, base_url=base_url)
+        return self._error(404, 'Not Found: {} {}'.format(method, url.path))
+
+    def _list_buckets(self, params, base_url, **kwargs):
+        prefix = params.get('prefix', '')
+        with self.store['lock']:
+            resources = [bucket_resource for bucket_name, (bucket_resource, _) in sorted(self.store['buckets'].items())
+                         if bucket_name.startswith(prefix)]
+        page, next_page_token = self._page([(resource['name'], resource) for resource in resources], params)
+        response = {'kind': 'storage#buckets', 'items': [resource for _, resource in page]}
+        if next_page_token:
+            response['nextPageToken'] = next_page_token
+        return self._json(response, params)
+
+    def _get_bucket(self, bucket_name, params, **kwargs):
+        with self.store['lock']:
+            bucket = self.store['buckets'].get(bucket_name)
+        if bucket is None:
+            return self._error(404, 'The specified bucket does not exist.')
+        return self._json(bucket[0], params)
+
+    def _list_objects(self, bucket_name, params, base_url, **kwargs):
+        prefix = params.get('prefix', '')
+        delimiter = params.get('delimiter')
+        with self.store['lock']:
+            bucket = self.store['buckets'].get(bucket_name)
+            if bucket is None:
+                return self._error(404, 'The specified bucket does not exist.')
+            objects = sorted((name, resource) for name, (resource, _) in bucket[1].items() if name.startswith(prefix))
+
+        # entries (objects and, with a delimiter, prefixes) in name order, each prefix listed once.
+        entries = []
+        for name, resource in objects:
+            delimiter_index = name.find(delimiter, len(prefix)) if delimiter else -1
+            if delimiter_index >= 0:
+                object_prefix = name[:delimiter_index + len(delimiter)]
+                if not entries or entries[-1][0] != object_prefix:
+                    entries.append((object_prefix, None))
+            else:
+                entries.append((name, self._object_resource(resource, base_url)))
+        page, next_page_token = self._page(entries, params)
+
+        response = {'kind': 'storage#objects'}
+        items = [resource for _, resource in page if resource is not None]
+        prefixes = [name for name, resource in page if resource is None]
+        if items:
+            response['items'] = items
+        if prefixes:
+            response['prefixes'] = prefixes
+        if next_page_token:
+            response['nextPageToken'] = next_page_token
+        return self._json(response, params)
+
+    def _page(self, entries, params):
+        """
+        Returns the requested page (pageToken, maxResults) of (name, value) entries, in name order.
+        :return: (entries of the page, token of the next page (None - last page))
+        """
+        start_index = self._page_start(entries, params)
+        max_results = int(params.get('maxResults', self.DEFAULT_MAX_RESULTS))
+        page = entries[start_index:start_index + max_results]
+        next_page_token = None
+        if start_index + max_results < len(entries):
+            next_page_token = base64.urlsafe_b64encode(page[-1][0].encode()).decode()
+        return page, next_page_token
+
+    @staticmethod
+    def _page_start(entries, params):
+        """
+        :return: index of the first entry after the one the page token (name of the last entry listed) refers to
+        """
+        page_token = params.get('pageToken')
+        if not page_token:
+            return 0
+        last_name = base64.urlsafe_b64decode(page_token.encode()).decode()
+        return next((index for index, (name, _) in enumerate(entries) if name > last_name), len(entries))
+
+    def _get_object(self, bucket_name, object_name, params, headers, base_url, **kwargs):
+        with self.store['lock']:
+            bucket = self.store['buckets'].get(bucket_name)
+            stored_object = bucket[1].get(object_name) if bucket is not None else None
+        if stored_object is None:
+            return self._error(404, 'No such object: {}/{}'.format(bucket_name, object_name))
+        resource, data = stored_object
+        if params.get('alt') != 'media':
+            return self._json(self._object_resource(resource, base_url), params)
+
+        response_headers = {
+            'Content-Type': resource['contentType'],
+            'X-Goog-Generation': resource['generation'],
+            'X-Goog-Metageneration': resource['metageneration'],
+            'X-Goog-Stored-Content-Length': resource['size'],
+            'X-Goog-Stored-Content-Encoding': resource.get('contentEncoding', 'identity'),
+            'X-Goog-Hash': 'crc32c={},md5={}'.format(resource['crc32c'], resource['md5Hash']),
+            'ETag': resource['etag']
+        }
+        if resource.get('contentEncoding') == 'gzip':
+            if 'gzip' in headers.get('Accept-Encoding', ''):
+                response_headers['Content-Encoding'] = 'gzip'
+            else:
+                # decompressive transcoding: ranges are ignored and hashes (of the stored data) omitted.
+                del response_headers['X-Goog-Hash']
+                return 200, response_headers, gzip.decompress(data)
+
+        byte_range = self._byte_range(headers.get('Range'), len(data))
+        if byte_range is None:
+            return 200, response_headers, data
+        if byte_range == 'unsatisfiable':
+            return self._error(416, 'The requested range cannot be satisfied.')
+        start, end = byte_range
+        # hashes are of the whole object, clients only verify them against whole objects.
+        del response_headers['X-Goog-Hash']
+        response_headers['Content-Range'] = 'bytes {}-{}/{}'.format(start, end, len(data))
+        return 206, response_headers, data[start:end + 1]
+
+    @staticmethod
+    def _byte_range(range_header, size):
+        """
+        Parses a Range header (bytes=start-end, bytes=start-, bytes=-suffix_length).
+        :return: (start, end) offsets (inclusive), None - entire object, 'unsatisfiable'
+        """
+        match = re.match(r'^bytes=(\d*)-(\d*)$', (range_header or '').strip())
+        if not match or not any(match.groups()):
+            return None
+        if not match.group(1):
+            start, end = max(0, size - int(match.group(2))), size - 1
+        else:
+            start = int(match.group(1))
+            end = min(int(match.group(2)), size - 1) if match.group(2) else size - 1
+        if start >= size or start > end:
+            return 'unsatisfiable'
+        return start, end
+
+    def _delete_object(self, bucket_name, object_name, **kwargs):
+        with self.store['lock']:
+            bucket = self.store['buckets'].get(bucket_name)
+            deleted = bucket is not None and bucket[1].pop(object_name, None) is not None
+        if not deleted:
+            return self._error(404, 'No such object: {}/{}'.format(bucket_name, object_name))
+        return 204, {}, b''
+
+    def _upload_object(self, bucket_name, params, headers, body, base_url, **kwargs):
+        upload_type = params.get('uploadType')
+        if upload_type == 'media':
+            metadata = {'name': params.get('name'), 'contentType': headers.get('Content-Type')}
+            if params.get('contentEncoding'):
+                metadata['contentEncoding'] = params['contentEncoding']
+            data = body
+        elif upload_type == 'multipart':
+            metadata, data = self._parse_multipart(headers.get('Content-Type', ''), body)
+        elif upload_type == 'resumable':
+            metadata = json.loads(body) if body else {}
+            metadata.setdefault('name', params.get('name'))
+            metadata.setdefault('contentType', headers.get('X-Upload-Content-Type'))
+            upload_id = uuid.uuid4().hex
+            with self.store['lock']:
+                self.store['uploads'][upload_id] = (bucket_name, metadata, bytearray())
+            location = '{}/upload/storage/v1/b/{}/o?uploadType=resumable&upload_id={}'.format(
+                base_url, quote(bucket_name, safe=''), upload_id)
+            return 200, {'Location': location, 'X-GUploader-UploadID': upload_id}, b''
+        else:
+            return self._error(400, 'Invalid uploadType: {}'.format(upload_type))
+        if not metadata.get('name'):
+            return self._error(400, 'Required object name is missing.')
+        return self._json(self._object_resource(self._put_object(bucket_name, metadata, data), base_url), params)
+
+    def _upload_object_chunk(self, bucket_name, params, headers, body, base_url, **kwargs):
+        """
+        Receives a chunk of a resumable upload (Content-Range: bytes start-end/total, bytes start-end/* or
+        bytes */total), completing the upload once total bytes have been received.
+        """
+        upload_id = params.get('upload_id')
+        with self.store['lock']:
+            upload = self.store['uploads'].get(upload_id)
+        if upload is None:
+            return self._error(404, 'No such upload: {}'.format(upload_id))
+        _, metadata, data = upload
+        match = re.match(r'^bytes (?:(\d+)-(\d+)|\*)/(\d+|\*)$', headers.get('Content-Range', 'bytes */*').strip())
+        if not match:
+            return self._error(400, 'Invalid Content-Range: {}'.format(headers.get('Content-Range')))
+        if match.group(1) is not None:
+            if int(match.group(1)) != len(data):
+                return self._error(400, 'Chunk starts at {}, {} bytes were received.'.format(match.group(1),
+                                                                                            len(data)))
+            data.extend(body)
+        total = match.group(3)
+        if total != '*' and int(total) == len(data):
+            with self.store['lock']:
+                self.store['uploads'].pop(upload_id, None)
+            return self._json(self._object_resource(self._put_object(bucket_name, metadata, bytes(data)), base_url),
+                              params)
+        response_headers = {'Range': 'bytes=0-{}'.format(len(data) - 1)} if data else {}
+        return 308, response_headers, b''
+
+    @staticmethod
+    def _parse_multipart(content_type, body):
+        """
+        Parses a multipart/related upload body: object metadata (JSON) followed by the object data.
+        :return: (object metadata, object data)
+        """
+        boundary = re.search(r'boundary="?([^";]+)"?', content_type).group(1).encode()
+        parts = body.split(b'--' + boundary)
+        metadata_part, data_part = [part.split(b'\r\n\r\n', 1)[1] for part in parts[1:3]]
+        # the CRLF preceding a boundary belongs to the boundary.
+        return json.loads(metadata_part.strip()), data_part[:-2]
+
+    def _batch(self, params, headers, body, base_url, **kwargs):
+        """
+        Serves a batch request: a multipart/mixed body of HTTP requests (application/http parts), answered by a
+        multipart/mixed body of their responses, in order.
+        """
+        message = email.parser.Parser().parsestr(
+            'Content-Type: {}\r\nMIME-Version: 1.0\r\n\r\n{}'.format(headers.get('Content-Type'), body.decode()))
+        if not message.is_multipart():
+            return self._error(400, 'Batch requests must be multipart/mixed.')
+
+        boundary = 'batch_' + uuid.uuid4().hex
+        response_parts = []
+        for part in message.get_payload():
+            request_line, request = part.get_payload().split('\n', 1)
+            method, uri = request_line.split(' ')[:2]
+            sub_request = email.parser.Parser().parsestr(request)
+            sub_url = urlsplit(uri)
+            status, sub_headers, sub_body = self._dispatch(
+                method, sub_url.path + ('?' + sub_url.query if sub_url.query else ''), sub_request,
+                (sub_request.get_payload() or '').encode(), base_url)
+            sub_headers = dict(sub_headers, **{'Content-Length': str(len(sub_body))})
+            content_id = (part.get('Content-ID') or '').strip('<>')
+            response_parts.append('\r\n'.join(
+                ['--' + boundary, 'Content-Type: application/http', 'Content-ID: <response-{}>'.format(content_id),
+                 '', 'HTTP/1.1 {} {}'.format(status, HTTPStatus(status).phrase)] +
+                ['{}: {}'.format(name, value) for name, value in sub_headers.items()] +
+                ['', sub_body.decode('utf-8', 'replace')]))
+        response_body = '\r\n'.join(response_parts + ['--' + boundary + '--', ''])
+        return 200, {'Content-Type': 'multipart/mixed; boundary={}'.format(boundary)}, response_body.encode()
+
+    def _bucket(self, bucket_name, create=False):
+        """
+        Returns a bucket of the store (the store lock must be held), creating it if needed.
+        :return: (bucket resource, {object name: (object resource, data)}), None if not found
+        """
+        bucket = self.store['buckets'].get(bucket_name)
+        if bucket is None and create:
+            bucket = ({
+                'kind': 'storage#bucket',
+                'id': bucket_name,
+                'name': bucket_name,
+                'projectNumber': '0',
+                'metageneration': '1',
+                'location': self.zone.rsplit('-', 1)[0].upper(),
+                'locationType': 'region',
+                'storageClass': 'STANDARD',
+                'timeCreated': self._timestamp(),
+                'updated': self._timestamp(),
+                'etag': 'CAE='
+            }, {})
+            self.store['buckets'][bucket_name] = bucket
+        return bucket
+
+    def _put_object(self, bucket_name, metadata, data):
+        """
+        Stores an object, computing the server-set properties of its resource.
+        :param bucket_name: bucket name
+        :param metadata: object metadata (name, contentType, contentEncoding, metadata, ...)
+        :param data: object data
+        :return: object resource
+        """
+        with self.store['lock']:
+            generation = str(next(self.store['generations']))
+            resource = {name: value for name, value in metadata.items() if value is not None}
+            resource.update({
+                'kind': 'storage#object',
+                'id': '{}/{}/{}'.format(bucket_name, metadata['name'], generation),
+                'bucket': bucket_name,
+                'generation': generation,
+                'metageneration': '1',
+                'contentType': metadata.get('contentType') or 'application/octet-stream',
+                'storageClass': 'STANDARD',
+                'size': str(len(data)),
+                'md5Hash': base64.b64encode(hashlib.md5(data).digest()).decode(),
+                'crc32c': base64.b64encode(google_crc32c.value(data).to_bytes(4, 'big')).decode(),
+                'etag': base64.b64encode(generation.encode()).decode(),
+                'timeCreated': self._timestamp(),
+                'updated': self._timestamp()
+            })
+            self._bucket(bucket_name, create=True)[1][metadata['name']] = (resource, data)
+        return resource
+
+    @staticmethod
+    def _object_resource(resource, base_url):
+        """
+        :return: object resource with the links (which depend on the endpoint requested)
+        """
+        path = '/b/{}/o/{}'.format(quote(resource['bucket'], safe=''), quote(resource['name'], safe=''))
+        return dict(resource,
+                    selfLink='{}/storage/v1{}'.format(base_url, path),
+                    mediaLink='{}/download/storage/v1{}?generation={}&alt=media'.format(
+                        base_url, path, resource['generation']))
+
+    def _json(self, resource, params):
+        """
+        :return: (status, headers, body) of a JSON response, with the requested fields only (partial response)
+        """
+        if params.get('fields'):
+            resource = self._select_fields(resource, params['fields'])
+        return 200, {'Content-Type': 'application/json; charset=UTF-8'}, json.dumps(resource).encode()
+
+    @classmethod
+    def _select_fields(cls, resource, fields):
+        """
+        Selects fields of a resource e.g. 'items(name,size),nextPageToken'.
+        """
+        selected = {}
+        depth = 0
+        field_start = 0
+        # split at top level commas.
+        for index, char in enumerate(fields + ','):
+            if char == '(':
+                depth += 1
+            elif char == ')':
+                depth -= 1
+            elif char == ',' and depth == 0:
+                field = fields[field_start:index].strip()
+                field_start = index + 1
+                name, _, sub_fields = field.partition('(')
+                if name not in resource:
+                    continue
+                value = resource[name]
+                if sub_fields:
+                    sub_fields = sub_fields[:-1]
+                    if isinstance(value, list):
+                        value = [cls._select_fields(item, sub_fields) for item in value]
+                    elif isinstance(value, dict):
+                        value = cls._select_fields(value, sub_fields)
+                selected[name] = value
+        return selected
+
+    @staticmethod
+    def _error(status, message):
+        """
+        :return: (status, headers, body) of a JSON API error response
+        """
+        error = {'error': {'code': status, 'message': message,
+                           'errors': [{'message': message, 'domain': 'global', 'reason': HTTPStatus(status).phrase}]}}
+        return status, {'Content-Type': 'application/json; charset=UTF-8'}, json.dumps(error).encode()
+
+    @staticmethod
+    def _timestamp():
+        return datetime.datetime.utcnow().strftime('%Y-%m-%dT%H:%M:%S.%f')[:-3] + 'Z'
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Runs a local stand-in for the GS / Bolt endpoints and the GCE "
+                                                 "metadata server.")
+    parser.add_argument('--host', default='127.0.0.1', help="host to listen on (default 127.0.0.1)")
+    parser.add_argument('--port', type=int, default=9000, help="port of the GS endpoint (default 9000)")
+    parser.add_argument('--bolt-port', type=int, default=9001,
+                        help="port of the Bolt endpoint, serving the same objects (default 9001)")
+    parser.add_argument('--latency', type=float, default=0.0, help="latency (secs) added to each request")
+    parser.add_argument('--bolt-latency', type=float, help="latency (secs) added to each Bolt request "
+                                                           "(default --latency)")
+    parser.add_argument('--jitter', type=float, default=0.0, help="max. random latency (secs) added on top")
+    parser.add_argument('--bandwidth', type=float, help="max. transfer rate (bytes/sec) per request")
+    parser.add_argument('--error-rate', type=float, default=0.0,
+                        help="fraction (0 - 1) of requests failed with one of --error-codes")
+    parser.add_argument('--error-codes', type=int, nargs='+', default=[503], help="status codes of injected errors")
+    parser.add_argument('--seed', type=int, help="seed of the random generator of jitter / injected errors")
+    parser.add_argument('--bucket', action='append', default=[], help="bucket to create (repeatable)")
+    args = parser.parse_args()
+
+    gs_server = BoltLocalServer(host=args.host, port=args.port, latency=args.latency, jitter=args.jitter,
+                                bandwidth=args.bandwidth, error_rate=args.error_rate, error_codes=args.error_codes,
+                                seed=args.seed)
+    bolt_server = BoltLocalServer(host=args.host, port=args.bolt_port,
+                                  latency=args.latency if args.bolt_latency is None else args.bolt_latency,
+                                  jitter=args.jitter, bandwidth=args.bandwidth, error_rate=args.error_rate,
+                                  error_codes=args.error_codes,
+                                  seed=None if args.seed is None else args.seed + 1, store=gs_server.store)
+    for bucket_name in args.bucket:
+        gs_server.create_bucket(bucket_name)
+    bolt_server.start()
+    gs_address = gs_server.url[len('http://'):]
+    print("export GCE_METADATA_HOST={0} GCE_METADATA_IP={0} STORAGE_EMULATOR_HOST={1} BOLT_URL={2}".format(
+        gs_address, gs_server.url, bolt_server.url), flush=True)
+    try:
+        gs_server.serve_forever()
+    except KeyboardInterrupt:
+        pass
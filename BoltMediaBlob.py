@@ -0,0 +1,42 @@
+from google.cloud import storage
+
+
+class BoltMediaBlob(storage.Blob):
+    """
+    BoltMediaBlob is a Blob that takes the stored size and content encoding of the object from the response headers
+    of its (non-chunked) downloads, so they're known without a metadata request, even if only a range of the object
+    was downloaded or the object was decompressed in transit (decompressive transcoding).
+    The size is None if the response doesn't carry it.
+    """
+
+    def _extract_headers_from_download(self, response):
+        super()._extract_headers_from_download(response)
+        self._properties['size'] = self.stored_size(response.headers)
+        if 'X-Goog-Stored-Content-Encoding' in response.headers:
+            self.content_encoding = self.stored_content_encoding(response.headers)
+
+    @staticmethod
+    def stored_size(headers):
+        """
+        Returns the stored size of an object from the headers of a media download response
+        (X-Goog-Stored-Content-Length, or the total of Content-Range).
+        :param headers: response headers
+        :return: object size or None if not known
+        """
+        stored_content_length = headers.get('X-Goog-Stored-Content-Length')
+        if stored_content_length is not None:
+            return int(stored_content_length)
+        content_range = headers.get('Content-Range', '')
+        total = content_range.rsplit('/', 1)[-1]
+        return int(total) if '/' in content_range and total.isdigit() else None
+
+    @staticmethod
+    def stored_content_encoding(headers):
+        """
+        Returns the stored content encoding of an object from the headers of a media download response
+        (X-Goog-Stored-Content-Encoding).
+        :param headers: response headers
+        :return: content encoding e.g. gzip, None if the object is stored as is or the encoding isn't known
+        """
+        stored_content_encoding = headers.get('X-Goog-Stored-Content-Encoding')
+        return None if stored_content_encoding == 'identity' else stored_content_encoding
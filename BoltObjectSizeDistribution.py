@@ -0,0 +1,107 @@
+import math
+import random
+
+
+class BoltObjectSizeDistribution:
+    """
+    BoltObjectSizeDistribution produces the sizes of the objects uploaded by the benchmarks. The following
+    distributions are supported:
+    FIXED - the given sizes, picked at random with equal weights
+    WEIGHTED - the given sizes, picked at random with the given weights
+    LOGNORMAL - log-normally distributed sizes with the given median and sigma, clamped to [min, max]
+    The size of an object is a function of its key (drawn from a random generator seeded with the key and the
+    distribution's seed), so the GS and Bolt objects of a key get the same size, in every run.
+    Sizes are also grouped into size classes (see SIZE_CLASSES), so that statistics can be broken down by them.
+    """
+
+    DISTRIBUTION_TYPES = ('FIXED', 'WEIGHTED', 'LOGNORMAL')
+    # default max. size of LOGNORMAL sizes. Payloads are sliced from a buffer as large as the largest object
+    # uploaded, so this also bounds the memory used by upload benchmarks.
+    MAX_SIZE = 64 * 1024 * 1024
+    # (upper bound (exclusive), name) of each size class, in increasing order.
+    SIZE_CLASSES = [
+        (4 * 1024, '0-4KB'),
+        (64 * 1024, '4KB-64KB'),
+        (1024 * 1024, '64KB-1MB'),
+        (16 * 1024 * 1024, '1MB-16MB'),
+        (128 * 1024 * 1024, '16MB-128MB'),
+        (math.inf, '128MB+')
+    ]
+
+    def __init__(self, dist_type='FIXED', sizes=None, weights=None, median=None, sigma=1.0, min_size=1,
+                 max_size=None, seed=0):
+        self.dist_type = str(dist_type).upper()
+        if self.dist_type not in self.DISTRIBUTION_TYPES:
+            raise ValueError("Invalid object size distribution: {}".format(dist_type))
+        if self.dist_type == 'LOGNORMAL':
+            if not median or median <= 0:
+                raise ValueError("lognormal object size distribution needs a median > 0")
+            self._mu = math.log(median)
+        elif not sizes or any(size < 0 for size in sizes):
+            raise ValueError("{} object size distribution needs a list of sizes >= 0".format(self.dist_type.lower()))
+        elif self.dist_type == 'WEIGHTED' and (not weights or len(weights) != len(sizes)):
+            raise ValueError("weighted object size distribution needs a weight per size")
+        self.sizes = sizes
+        self.weights = weights
+        self.median = median
+        self.sigma = sigma
+        self.min_size = min_size
+        self.max_size = max_size or self.MAX_SIZE
+        self.seed = seed
+
+    @classmethod
+    def from_dict(cls, dist_dict):
+        """
+        Creates a distribution from its JSON request representation e.g.
+        {"type": "fixed", "sizes": [1024, 1048576]}
+        {"type": "weighted", "sizes": [1024, 1048576], "weights": [0.9, 0.1]}
+        {"type": "lognormal", "median": 65536, "sigma": 1.5, "min": 1024, "max": 16777216, "seed": 1}
+        :param dist_dict: distribution dict
+        :return: BoltObjectSizeDistribution
+        """
+        return cls(dist_type=dist_dict.get('type', 'FIXED'),
+                   sizes=[int(size) for size in dist_dict.get('sizes', [])],
+                   weights=[float(weight) for weight in dist_dict.get('weights', [])],
+                   median=float(dist_dict['median']) if 'median' in dist_dict else None,
+                   sigma=float(dist_dict.get('sigma', 1.0)),
+                   min_size=int(dist_dict.get('min', 1)),
+                   max_size=int(dist_dict['max']) if 'max' in dist_dict else None,
+                   seed=dist_dict.get('seed', 0))
+
+    def size(self, key):
+        """
+        :param key: key name of the object
+        :return: size (bytes) of the object
+        """
+        if self.dist_type == 'FIXED' and len(self.sizes) == 1:
+            return self.sizes[0]
+        key_random = random.Random('{}:{}'.format(self.seed, key))
+        if self.dist_type == 'FIXED':
+            return key_random.choice(self.sizes)
+        elif self.dist_type == 'WEIGHTED':
+            return key_random.choices(self.sizes, weights=self.weights)[0]
+        size = int(key_random.lognormvariate(self._mu, self.sigma))
+        return min(max(size, self.min_size), self.max_size)
+
+    def describe(self):
+        """
+        :return: human readable description of the distribution
+        """
+        if self.dist_type == 'FIXED' and len(self.sizes) == 1:
+            return "{:d} bytes".format(self.sizes[0])
+        elif self.dist_type == 'FIXED':
+            return "fixed {} bytes".format(self.sizes)
+        elif self.dist_type == 'WEIGHTED':
+            return "weighted {} bytes, weights {}".format(self.sizes, self.weights)
+        return "lognormal median {:.0f} bytes, sigma {}, [{:d}, {:d}] bytes".format(
+            self.median, self.sigma, self.min_size, self.max_size)
+
+    @classmethod
+    def size_class(cls, size):
+        """
+        :param size: object size (bytes)
+        :return: name of the size class the size falls in
+        """
+        for upper_bound, class_name in cls.SIZE_CLASSES:
+            if size < upper_bound:
+                return class_name
@@ -0,0 +1,149 @@
+import json
+import time
+from google.api_core import exceptions
+from google.cloud.storage.retry import DEFAULT_RETRY
+
+
+class BoltPartialResponse:
+    """
+    BoltPartialResponse lists objects and gets object metadata from GS / Bolt through the JSON API, requesting only
+    the given fields of the object resources (partial response). This cuts the size of the responses and the time
+    spent decoding them, which the client library (full object resources) doesn't allow for object metadata.
+    The time spent on each request (including reading the response) is reported separately from the time spent
+    parsing the response into blobs. Requests are retried as the client library retries them (DEFAULT_RETRY), the
+    request time including the retries.
+    """
+
+    def __init__(self, storage_client, fields=None):
+        """
+        :param storage_client: Bolt / GS storage client (its endpoint and HTTP session are used)
+        :param fields: object resource fields to request e.g. ['name', 'size'] (None - full object resources)
+        """
+        self._storage_client = storage_client
+        self.fields = fields
+
+    @staticmethod
+    def list_fields(fields, *other_fields):
+        """
+        Returns the fields projection of a listing.
+        :param fields: fields of the listed items (None - full resources)
+        :param other_fields: fields of the listing response besides the items e.g. 'nextPageToken'
+        :return: fields projection (None - no projection)
+        """
+        if fields is None:
+            return None
+        return ','.join(('items({})'.format(','.join(fields)),) + other_fields)
+
+    def list_page(self, bucket_name, max_results=None, page_token=None, prefix=None, delimiter=None):
+        """
+        Lists a page of objects.
+        :param bucket_name: bucket name
+        :param max_results: max. no of objects in the page
+        :param page_token: token of the page (None - first page)
+        :param prefix: prefix
+        :param delimiter: delimiter
+        :return: (list of blobs, list of prefixes, token of the next page (None - last page),
+                  request time (nanoseconds), parse time (nanoseconds), response size (bytes))
+        """
+        bucket = self._storage_client.bucket(bucket_name)
+        query_params = self.list_query_params(self.fields, max_results=max_results, page_token=page_token,
+                                              prefix=prefix, delimiter=delimiter)
+        response, request_time = self._get(bucket.path + '/o', query_params)
+        blobs, prefixes, next_page_token, parse_time = self.parse_list_page(bucket, response.content)
+
+        return blobs, prefixes, next_page_token, request_time, parse_time, len(response.content)
+
+    @classmethod
+    def list_query_params(cls, fields, max_results=None, page_token=None, prefix=None, delimiter=None):
+        """
+        Returns the query parameters of a list objects request.
+        :param fields: object resource fields to request (None - full object resources)
+        :param max_results: max. no of objects in the page
+        :param page_token: token of the page (None - first page)
+        :param prefix: prefix
+        :param delimiter: delimiter
+        :return: query parameters
+        """
+        query_params = {'projection': 'noAcl'}
+        for param_name, value in [('maxResults', max_results), ('pageToken', page_token), ('prefix', prefix),
+                                  ('delimiter', delimiter),
+                                  ('fields', cls.list_fields(fields, 'prefixes', 'nextPageToken'))]:
+            if value is not None:
+                query_params[param_name] = value
+        return query_params
+
+    @staticmethod
+    def parse_list_page(bucket, content):
+        """
+        Parses a list objects response.
+        :param bucket: bucket listed
+        :param content: response body
+        :return: (list of blobs, list of prefixes, token of the next page (None - last page),
+                  parse time (nanoseconds))
+        """
+        parse_start_time = time.perf_counter_ns()
+        resource = json.loads(content)
+        blobs = []
+        for item in resource.get('items', []):
+            blob = bucket.blob(item.get('name'))
+            blob._set_properties(item)
+            blobs.append(blob)
+        parse_end_time = time.perf_counter_ns()
+
+        return blobs, resource.get('prefixes', []), resource.get('nextPageToken'), \
+            parse_end_time - parse_start_time
+
+    def get_blob(self, bucket_name, blob_name, not_found_ok=True):
+        """
+        Gets the metadata of an object.
+        :param bucket_name: bucket name
+        :param blob_name: object name
+        :param not_found_ok: return None instead of raising NotFound, if the object isn't found
+        :return: (blob (None, if not found), request time (nanoseconds), parse time (nanoseconds),
+                  response size (bytes))
+        """
+        query_params = {'projection': 'noAcl'}
+        if self.fields is not None:
+            query_params['fields'] = ','.join(self.fields)
+        bucket = self._storage_client.bucket(bucket_name)
+        blob = bucket.blob(blob_name)
+
+        response, request_time = self._get(blob.path, query_params, not_found_ok=not_found_ok)
+        if response is None:
+            return None, request_time, 0, 0
+        parse_start_time = time.perf_counter_ns()
+        blob._set_properties(json.loads(response.content))
+        parse_end_time = time.perf_counter_ns()
+
+        return blob, request_time, parse_end_time - parse_start_time, len(response.content)
+
+    def _get(self, path, query_params, not_found_ok=False):
+        """
+        Sends a GET request to the JSON API of the storage client's endpoint.
+        :param path: resource path e.g. '/b/<bucket>/o'
+        :param query_params: query parameters
+        :param not_found_ok: return None instead of raising NotFound, if the resource isn't found
+        :return: (response (None, if not found), request time (nanoseconds))
+        """
+        url = self._storage_client._connection.build_api_url(path=path, query_params=query_params)
+        request_start_time = time.perf_counter_ns()
+        try:
+            response = DEFAULT_RETRY(self._request)(url)
+        except exceptions.NotFound:
+            if not not_found_ok:
+                raise
+            response = None
+        request_end_time = time.perf_counter_ns()
+
+        return response, request_end_time - request_start_time
+
+    def _request(self, url):
+        """
+        Sends a GET request.
+        :param url: URL
+        :return: response
+        """
+        response = self._storage_client._http.request('GET', url)
+        if not 200 <= response.status_code < 300:
+            raise exceptions.from_http_response(response)
+        return response
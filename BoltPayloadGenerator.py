@@ -0,0 +1,67 @@
+import os
+import string
+import threading
+import itertools
+
+
+class BoltPayloadGenerator:
+    """
+    BoltPayloadGenerator hands out object payloads for upload benchmarks. The payload data is generated once, into a
+    buffer that is grown as larger payloads are requested, and each payload is a zero-copy memoryview slice of it
+    starting at a rotating offset, so consecutive payloads of the same length differ.
+    The following payload types are supported:
+    TEXT - random lowercase ascii letters (default)
+    RANDOM - random bytes (incompressible)
+    COMPRESSIBLE - a short block of random lowercase ascii letters, repeated
+    """
+
+    PAYLOAD_TYPES = ('TEXT', 'RANDOM', 'COMPRESSIBLE')
+    # payloads start at an offset within the first ROTATION_SPAN bytes of the buffer.
+    ROTATION_SPAN = 4096
+    # size of the repeated block of COMPRESSIBLE payloads.
+    COMPRESSIBLE_BLOCK_SIZE = 64
+    # maps random bytes to lowercase ascii letters.
+    _TEXT_TABLE = bytes(ord(string.ascii_lowercase[i % len(string.ascii_lowercase)]) for i in range(256))
+
+    def __init__(self, payload_type='TEXT'):
+        payload_type = str(payload_type).upper()
+        if payload_type not in self.PAYLOAD_TYPES:
+            raise ValueError("Invalid payloadType: {}".format(payload_type))
+        self.payload_type = payload_type
+        self._lock = threading.Lock()
+        self._buffer = memoryview(b'')
+        self._offsets = itertools.count()
+
+    @property
+    def content_type(self):
+        """
+        :return: content type of the payloads
+        """
+        return 'application/octet-stream' if self.payload_type == 'RANDOM' else 'text/plain'
+
+    def next(self, length):
+        """
+        Returns the next payload.
+        :param length: payload length (bytes)
+        :return: payload (memoryview, read-only)
+        """
+        buffer = self._buffer
+        if len(buffer) < length + self.ROTATION_SPAN:
+            buffer = self._grow(length + self.ROTATION_SPAN)
+        offset = next(self._offsets) * 7 % self.ROTATION_SPAN
+        return buffer[offset:offset + length]
+
+    def _grow(self, size):
+        with self._lock:
+            if len(self._buffer) < size:
+                self._buffer = memoryview(self._generate(size)).toreadonly()
+            return self._buffer
+
+    def _generate(self, size):
+        if self.payload_type == 'RANDOM':
+            return os.urandom(size)
+        elif self.payload_type == 'COMPRESSIBLE':
+            block = os.urandom(self.COMPRESSIBLE_BLOCK_SIZE).translate(self._TEXT_TABLE)
+            return (block * (size // len(block) + 1))[:size]
+        else:
+            return os.urandom(size).translate(self._TEXT_TABLE)
@@ -0,0 +1,49 @@
+import io
+
+
+class BoltPayloadStream(io.RawIOBase):
+    """
+    BoltPayloadStream is a read-only, seekable file-like object over a payload (memoryview, see
+    BoltPayloadGenerator). Data is only copied as it is read, a chunk at a time, so streaming uploads of large
+    payloads don't need a copy of the whole payload.
+    """
+
+    def __init__(self, payload):
+        self._payload = payload
+        self._position = 0
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def read(self, size=-1):
+        """
+        Reads up to size bytes from the current position.
+        :param size: max. no of bytes to read (-1 - up to the end of the payload)
+        :return: bytes read
+        """
+        end = len(self._payload) if size is None or size < 0 else min(self._position + size, len(self._payload))
+        data = self._payload[self._position:end].tobytes()
+        self._position = max(self._position, end)
+        return data
+
+    def readinto(self, buffer):
+        data = self.read(len(buffer))
+        buffer[:len(data)] = data
+        return len(data)
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        if whence == io.SEEK_CUR:
+            offset += self._position
+        elif whence == io.SEEK_END:
+            offset += len(self._payload)
+        self._position = max(0, offset)
+        return self._position
+
+    def tell(self):
+        return self._position
+
+    def __len__(self):
+        return len(self._payload)
@@ -0,0 +1,138 @@
+class BoltPerfHistogram:
+    """
+    BoltPerfHistogram records non-negative integer values (latencies in nanoseconds, object sizes in bytes) into
+    log-bucketed counters (HDR histogram style): values below 2^SUB_BUCKET_BITS are counted exactly, larger values
+    are counted in buckets whose width grows with the value, keeping the relative error of the reported
+    percentiles within 1/2^SUB_BUCKET_BITS. Memory usage is fixed regardless of the no of values recorded and
+    histograms can be serialized (to_dict / from_dict) and merged across runs and function instances.
+    """
+
+    # no of bits of precision kept for each value.
+    SUB_BUCKET_BITS = 7
+    # values above this are counted in the last bucket (min / max / total remain exact).
+    MAX_VALUE = (1 << 48) - 1
+
+    _SUB_BUCKET_COUNT = 1 << SUB_BUCKET_BITS
+    _SUB_BUCKET_HALF_COUNT = _SUB_BUCKET_COUNT >> 1
+
+    def __init__(self):
+        self._counts = [0] * (self._bucket_index(self.MAX_VALUE) + 1)
+        self.count = 0
+        self.total = 0
+        self.min = None
+        self.max = None
+
+    def record(self, value):
+        """
+        Records a value.
+        :param value: value (int >= 0)
+        """
+        value = int(value)
+        self._counts[self._bucket_index(min(value, self.MAX_VALUE))] += 1
+        self.count += 1
+        self.total += value
+        if self.min is None or value < self.min:
+            self.min = value
+        if self.max is None or value > self.max:
+            self.max = value
+
+    def extend(self, values):
+        """
+        Records each of the given values.
+        :param values: iterable of values
+        """
+        for value in values:
+            self.record(value)
+
+    def mean(self):
+        """
+        :return: mean of the recorded values
+        """
+        return self.total / self.count if self.count else 0
+
+    def percentile(self, percentile):
+        """
+        Returns the (approximate) value at the given percentile.
+        :param percentile: percentile (0.0 - 1.0)
+        :return: value at percentile
+        """
+        if not self.count:
+            return 0
+        rank = max(1, min(self.count, int(self.count * percentile + 0.5)))
+        if rank == self.count:
+            return self.max
+        seen = 0
+        for index, bucket_count in enumerate(self._counts):
+            seen += bucket_count
+            if seen >= rank:
+                low, high = self._bucket_range(index)
+                return min(max((low + high) // 2, self.min), self.max)
+        return self.max
+
+    def merge(self, other):
+        """
+        Adds the values recorded in another histogram to this one.
+        :param other: BoltPerfHistogram
+        :return: self
+        """
+        for index, bucket_count in enumerate(other._counts):
+            self._counts[index] += bucket_count
+        self.count += other.count
+        self.total += other.total
+        if other.min is not None and (self.min is None or other.min < self.min):
+            self.min = other.min
+        if other.max is not None and (self.max is None or other.max > self.max):
+            self.max = other.max
+        return self
+
+    def to_dict(self):
+        """
+        :return: JSON serializable representation of the histogram (only non-empty buckets are included)
+        """
+        return {
+            'sub_bucket_bits': self.SUB_BUCKET_BITS,
+            'count': self.count,
+            'total': self.total,
+            'min': self.min,
+            'max': self.max,
+            'buckets': {str(index): bucket_count for index, bucket_count in enumerate(self._counts) if bucket_count}
+        }
+
+    @classmethod
+    def from_dict(cls, histogram_dict):
+        """
+        Creates a histogram from its to_dict representation.
+        :param histogram_dict: histogram dict
+        :return: BoltPerfHistogram
+        """
+        if histogram_dict['sub_bucket_bits'] != cls.SUB_BUCKET_BITS:
+            raise ValueError("Incompatible histogram precision: {}".format(histogram_dict['sub_bucket_bits']))
+        histogram = cls()
+        for index, bucket_count in histogram_dict['buckets'].items():
+            histogram._counts[int(index)] = bucket_count
+        histogram.count = histogram_dict['count']
+        histogram.total = histogram_dict['total']
+        histogram.min = histogram_dict['min']
+        histogram.max = histogram_dict['max']
+        return histogram
+
+    def __len__(self):
+        return self.count
+
+    @classmethod
+    def _bucket_index(cls, value):
+        if value < cls._SUB_BUCKET_COUNT:
+            return value
+        shift = value.bit_length() - cls.SUB_BUCKET_BITS
+        sub_bucket = value >> shift
+        return cls._SUB_BUCKET_COUNT + (shift - 1) * cls._SUB_BUCKET_HALF_COUNT + \
+            (sub_bucket - cls._SUB_BUCKET_HALF_COUNT)
+
+    @classmethod
+    def _bucket_range(cls, index):
+        if index < cls._SUB_BUCKET_COUNT:
+            return index, index
+        offset = index - cls._SUB_BUCKET_COUNT
+        shift = offset // cls._SUB_BUCKET_HALF_COUNT + 1
+        sub_bucket = offset % cls._SUB_BUCKET_HALF_COUNT + cls._SUB_BUCKET_HALF_COUNT
+        return sub_bucket << shift, ((sub_bucket + 1) << shift) - 1
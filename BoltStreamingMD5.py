@@ -0,0 +1,58 @@
+import hashlib
+import zlib
+
+
+class BoltStreamingMD5:
+    """
+    BoltStreamingMD5 is a write-only file-like object that computes the MD5 hash of the data written to it,
+    as it arrives. If the data is gzip encoded, it is decompressed incrementally before being hashed.
+    Memory usage is bounded by the size of the chunks written to it and by chunk_size
+    (max. no of decompressed bytes held at a time).
+    """
+
+    # max. no of decompressed bytes held at a time.
+    CHUNK_SIZE = 1024 * 1024
+
+    def __init__(self, gzip_encoded=False, chunk_size=None):
+        self._md5 = hashlib.md5()
+        self._gzip_encoded = gzip_encoded
+        self._decompressor = self._new_decompressor() if gzip_encoded else None
+        self._chunk_size = chunk_size or self.CHUNK_SIZE
+        # no of (compressed) bytes written.
+        self.bytes_processed = 0
+
+    def write(self, data):
+        """
+        Hashes the given data (decompressing it first, if gzip encoded).
+        :param data: chunk of object data
+        :return: no of bytes written
+        """
+        self.bytes_processed += len(data)
+        if self._decompressor is None:
+            self._md5.update(data)
+            return len(data)
+
+        buf = data
+        while buf:
+            self._md5.update(self._decompressor.decompress(buf, self._chunk_size))
+            if self._decompressor.eof:
+                # start of next gzip member, if any.
+                buf = self._decompressor.unused_data
+                self._decompressor = self._new_decompressor()
+            else:
+                buf = self._decompressor.unconsumed_tail
+        return len(data)
+
+    def hexdigest(self):
+        """
+        Returns the MD5 hash of the (decompressed) data written so far.
+        :return: MD5 hash (upper case hex)
+        """
+        if self._decompressor is not None:
+            self._md5.update(self._decompressor.flush())
+        return self._md5.hexdigest().upper()
+
+    @staticmethod
+    def _new_decompressor():
+        # wbits = 16 + MAX_WBITS expects a gzip header and trailer.
+        return zlib.decompressobj(16 + zlib.MAX_WBITS)
@@ -20,11 +20,26 @@ def bolt_gs_ops_handler(request):
        e) download_object - download object (md5 hash)
        f) upload_object - upload object
        g) delete_object - delete object
+       h) delete_objects - delete objects, in batch requests of up to 100 objects
+       i) get_objects_md - get objects metadata, in batch requests of up to 100 objects
 
     3) bucket - bucket name
 
     4) key - key name
 
+    5) chunkSize - download_object streams the object and computes its MD5 as the data arrives. If chunkSize is
+       passed, the object is downloaded in ranged requests of chunkSize bytes (rounded up to a multiple of 256 KB).
+
+    6) keys / prefix - keys of the objects delete_objects / get_objects_md operate on, or the prefix of the objects
+       (get_objects_md: all objects if neither is passed; delete_objects needs keys or a non-empty prefix)
+
+    7) prefix, delimiter, maxResults, pageToken - list_objects / list_buckets parameters (delimiter is only supported
+       by list_objects). If the listing stops at maxResults, its nextPageToken is returned, to be passed as
+       pageToken to resume it.
+
+    8) stream - NDJSON or JSON. list_objects / list_buckets stream the names as each page arrives, as NDJSON lines
+       (followed by a summary line) or as a chunked JSON document, instead of returning the whole listing at the end.
+
     Following are examples of various HTTP requests, that can be used to invoke bolt_gs_ops_handler.
     a) Listing objects from Bolt bucket:
         {"requestType": "list_objects_v2", "sdkType": "BOLT", "bucket": "<bucket>"}
@@ -47,6 +62,16 @@ def bolt_gs_ops_handler(request):
     g) Delete object from Bolt:
         {"requestType": "delete_object", "sdkType": "BOLT", "bucket": "<bucket>", "key": "<key>"}
 
+    h) Delete all objects under a prefix from Bolt, in batches:
+        {"requestType": "delete_objects", "sdkType": "BOLT", "bucket": "<bucket>", "prefix": "<prefix>"}
+
+    i) Get GS objects metadata, in batches:
+        {"requestType": "get_objects_md", "sdkType": "GS", "bucket": "<bucket>", "keys": ["<key1>", "<key2>"]}
+
+    j) Streaming the first million objects under a prefix from Bolt bucket, as NDJSON:
+        {"requestType": "list_objects", "sdkType": "BOLT", "bucket": "<bucket>", "prefix": "<prefix>",
+         "maxResults": 1000000, "stream": "ndjson"}
+
     :param request: request object
     :return:response from BoltGSOpsClient
     """
@@ -62,12 +87,32 @@ def bolt_gs_validate_obj_handler(request):
     bolt_gs_validate_obj_handler accepts the following input parameters as part of the HTTP Request:
     1) bucket - bucket name
     2) key - key name
+    3) bucketClean - ON / OFF (default). If bucket cleaning is ON, the object is only retrieved from Bolt.
+    4) chunkSize - objects are streamed and their MD5 computed as the data arrives. If chunkSize is passed, objects
+       are downloaded in ranged requests of chunkSize bytes (rounded up to a multiple of 256 KB).
+    5) keys / prefix - validate a list of keys, or all the objects under a prefix, instead of a single key.
+       The response is streamed as NDJSON: a line per mismatched / missing / failed object followed by a summary
+       line (matched, mismatched, missing, bytes verified, throughput). If the prefix can't be listed, an
+       errorMessage line precedes the summary of the objects validated so far.
+    6) concurrency - no of objects validated in parallel when validating keys / prefix (default 8).
+    7) mode - full (default) or fast. In fast mode, the MD5 / CRC32C hashes stored in Bolt and GS object metadata are
+       compared first; objects are only downloaded and hashed if the stored hashes are missing or differ, or the
+       object is gzip encoded.
 
     Following is an example of a HTTP request that can be used to invoke bolt_gs_validate_obj_handler.
     a) Retrieve object (its MD5 Hash) from Bolt and GS (if the object is gzip encoded then it's decompressed
        before computing MD5):
        {"bucket": "<bucket>", "key": "<key>"}
 
+    b) Validate all objects under a prefix, 32 objects at a time:
+       {"bucket": "<bucket>", "prefix": "<prefix>", "concurrency": 32}
+
+    c) Validate all objects under a prefix, comparing stored hashes first:
+       {"bucket": "<bucket>", "prefix": "<prefix>", "mode": "fast"}
+
+    Bolt and GS objects are retrieved and hashed concurrently, and the time taken by each is returned alongside
+    its MD5.
+
     :param request: request object
     :return: md5s of object retrieved from Bolt and GS.
     """
@@ -88,11 +133,83 @@ def bolt_gs_perf_handler(request):
        d) download_object_passthrough - download object (via passthrough) of unmonitored bucket
        e) download_object_passthrough_ttfb - download object (first byte via passthrough) of unmonitored bucket
        f) upload_object - upload object
-       g) delete_object - delete object
+       g) delete_object - delete object (keys that don't exist are counted as objects_not_found, rather than
+          measured)
        h) all - upload, download, delete, list objects (default request if none specified)
+       i) saturation_sweep - upload, download, delete objects at increasing concurrency levels
+       j) upload_object_large - upload objects (default 10 objects of 64MB, keys bolt-gs-perf-large*) in chunks,
+          using resumable uploads. The bolt-gs-perf-large* objects are deleted after each chunk size is measured
+          (objects of keys passed with keys / keyManifest are kept).
+       k) delete_object_batch - delete objects, a request per object vs batch requests (throughput comparison)
 
     2) bucket - bucket name
 
+    3) concurrency - no of parallel workers used by the upload / download / delete object benchmarks (default 1).
+       GS and Bolt are benchmarked in separate phases.
+
+    4) maxConcurrency - max. concurrency level of saturation_sweep (default 16)
+
+    5) kneeFactor - p99 latency growth, relative to concurrency 1, that marks the knee of a saturation_sweep
+       curve (default 2.0)
+
+    6) maxResults, maxPages, prefix, delimiter, numIter - list_objects parameters: page size (default 1000),
+       max. no of pages per listing (default 1, 0 lists all pages), prefix / delimiter to list with and
+       no of times the listing is repeated (default 10)
+
+    7) metadataSource - where download benchmarks get object size / content encoding from: listing (default, the
+       listed objects; keys that weren't listed fall back to get_blob), get_blob (a metadata request per object) or
+       none (no metadata request; object size / content encoding are taken from the download response headers,
+       object size is left out of the statistics if they don't carry it)
+
+    8) workers, workerUrls - no of workers the keys of upload_object / download_object* / delete_object are
+       sharded across, and optionally the URLs of bolt_gs_perf_handler functions to run them on (in-process workers
+       if none). The workers' latency histograms and counters are merged into a single report. Functions are invoked
+       with an ID token of the function's service account, which needs the Cloud Functions Invoker role on them,
+       and workerTimeout (default 540 secs) bounds the time waited for each.
+
+    9) numKeys, durationSecs, keyManifest - no of keys used (default 1000, no upper limit), max. time (secs) each
+       benchmark phase runs for (keys are unbounded if numKeys isn't passed) and an object ('gs://<bucket>/<object>'
+       or object in the bucket) listing the keys to be used, one per line. Keys are produced lazily.
+
+    10) objLength, payloadType - size (default 100 bytes) and type of uploaded objects: text (default, random
+        lowercase letters), random (incompressible) or compressible
+
+    11) objSizeDist - distribution of uploaded object sizes: {"type": "fixed", "sizes": [...]},
+        {"type": "weighted", "sizes": [...], "weights": [...]} or
+        {"type": "lognormal", "median": <bytes>, "sigma": <sigma>, "min": <bytes>, "max": <bytes>}, with an optional
+        "seed". Each key gets the same size in GS and Bolt (and in every run with the same seed). The largest size
+        (lognormal max, default 64MB) is held in memory as the payload buffer.
+        Statistics are broken down by size class, if objects span more than one.
+
+    12) rangeMode, numRanges, rangeSize - ranged downloads: parallel (each object split into numRanges ranges,
+        default 8) or random (numRanges ranges of rangeSize bytes, default 64KB, at random offsets). Ranges of an
+        object are fetched concurrently. saturation_sweep reports range statistics at each download sweep point.
+
+    13) poolSize, keepAlive, maxRetries, connectTimeout, readTimeout - HTTP session parameters of the GS / Bolt
+        clients (defaults 32, true, 0, 10, 60), used by the request only. Timeouts apply to requests that don't
+        pass their own. Connection reuse statistics are reported for each endpoint.
+
+    14) chunkSize - chunk size (bytes, multiple of 256KB) or list of chunk sizes upload_object_large streams
+        objects with (default 8MB)
+
+    15) batchSize - no of deletes per batch request of delete_object_batch (default and max. 100)
+
+    16) fields - object resource fields requested by listings / metadata requests, besides the ones the benchmark uses
+        (name for list_objects; size, contentEncoding for downloads), as a list or a comma separated string, or all
+        (full object resources). list_objects
+        reports the time spent parsing each page and the page response sizes.
+
+    17) engine - threads (default, storage clients called from concurrency threads) or asyncio (coroutines sending
+        JSON API requests over a single aiohttp connection pool, up to concurrency in flight). asyncio supports
+        list_objects, download_object*, upload_object, delete_object, all and saturation_sweep.
+
+    18) targetRps - run open loop: ops are started at targetRps ops/sec (shared by workers) whatever their latency,
+        and latencies are measured from the time each op was due, so queueing behind slow ops counts towards them.
+        Reports the target vs achieved rate and the delays of op starts past their due times (schedule_lag).
+        Supported by upload_object, download_object*, delete_object (default: closed loop).
+
+    19) rawStats - return serialized, mergeable statistics (histograms and counters) instead of formatted ones
+
     Following are examples of various HTTP requests that can be used to invoke bolt_gs_perf_handler.
     a) Measure List objects performance of Bolt/GS.
        {"requestType": "list_objects", "bucket": "<bucket>"}
@@ -118,6 +235,51 @@ def bolt_gs_perf_handler(request):
     h) Measure Upload, Delete, Download, List objects performance of Bolt/GS.
        {"requestType": "all", "bucket": "<bucket>"}
 
+    i) Measure Download object performance of Bolt/GS using 16 parallel workers.
+       {"requestType": "download_object", "bucket": "<bucket>", "concurrency": 16}
+
+    j) Measure Upload, Download, Delete objects throughput vs latency of Bolt/GS at concurrency 1, 2, 4, ... 64.
+       {"requestType": "saturation_sweep", "bucket": "<bucket>", "maxConcurrency": 64}
+
+    k) Measure List objects performance of Bolt/GS, enumerating all objects under a prefix in pages of 500 objects.
+       {"requestType": "list_objects", "bucket": "<bucket>", "prefix": "<prefix>", "maxResults": 500,
+        "maxPages": 0, "numIter": 1}
+
+    l) Measure Upload object performance of Bolt/GS, sharding 1000 keys across 4 bolt_gs_perf_handler functions.
+       {"requestType": "upload_object", "bucket": "<bucket>", "workers": 4, "workerUrls": ["<function-url>"]}
+
+    m) Measure Upload object performance of Bolt/GS with a mix of 1KB, 1MB and 100MB objects.
+       {"requestType": "upload_object", "bucket": "<bucket>", "objSizeDist": {"type": "weighted",
+        "sizes": [1024, 1048576, 104857600], "weights": [0.8, 0.15, 0.05]}}
+
+    n) Measure Download object performance of Bolt/GS, fetching each object as 16 concurrent byte ranges.
+       {"requestType": "download_object", "bucket": "<bucket>", "rangeMode": "parallel", "numRanges": 16}
+
+    o) Measure Download object performance of Bolt/GS without connection reuse.
+       {"requestType": "download_object", "bucket": "<bucket>", "keepAlive": false}
+
+    p) Measure chunked Upload object performance of Bolt/GS for 256MB objects with 8MB and 32MB chunks.
+       {"requestType": "upload_object_large", "bucket": "<bucket>", "objLength": 268435456,
+        "chunkSize": [8388608, 33554432]}
+
+    q) Measure Download object performance of Bolt/GS for 30 minutes, using the keys listed in a manifest.
+       {"requestType": "download_object", "bucket": "<bucket>", "durationSecs": 1800,
+        "keyManifest": "gs://<bucket>/<manifest>"}
+
+    r) Compare per object vs batched Delete object throughput of Bolt/GS, with 50 deletes per batch.
+       {"requestType": "delete_object_batch", "bucket": "<bucket>", "batchSize": 50, "concurrency": 4}
+
+    s) Measure List objects performance of Bolt/GS with full object resources (instead of object names only).
+       {"requestType": "list_objects", "bucket": "<bucket>", "fields": "all"}
+
+    t) Measure Download object performance of Bolt/GS with 1000 concurrent requests, using the asyncio engine.
+       {"requestType": "download_object", "bucket": "<bucket>", "engine": "asyncio", "concurrency": 1000,
+        "numKeys": 100000}
+
+    u) Measure Download object latency of Bolt/GS at a steady 500 requests/sec for 10 minutes.
+       {"requestType": "download_object", "bucket": "<bucket>", "targetRps": 500, "durationSecs": 600,
+        "concurrency": 200}
+
     :param request: request Object
     :return: response from BoltGSPerf
     """
@@ -132,14 +294,36 @@ def bolt_auto_heal_handler(request):
 
     bolt_auto_heal_handler accepts the following input parameters as part of the HTTP Request:
     1) bucket - bucket name
-    2) key - key name
-
-    Following is an example of a HTTP request that can be used to invoke bolt_auto_heal_handler.
+    2) key, keys, prefix - key name, or the key names / prefix of multiple objects, which are polled concurrently.
+       For multiple objects, the distribution of the time taken to auto-heal (p50 / p90 / max, measured from the
+       start of the test), the time waited for polling to start if there are more objects than concurrency
+       (queue_wait, included in the time taken to auto-heal), the time taken to auto-heal all objects and the
+       recovery throughput (objects/sec, bytes/sec) are reported, along with the timeline of objects that weren't
+       healed. Each object is polled for up to maxWaitSecs from when polling it started.
+    3) concurrency - max. no of objects polled concurrently (default 32).
+    4) pollStrategy - wait between attempts to retrieve the object: fixed (pollInterval), exponential (default,
+       pollInterval growing by backoffFactor up to maxPollInterval) or jittered (random wait of up to the
+       exponential one).
+    5) pollInterval, maxPollInterval, backoffFactor - initial / max. wait (secs) between attempts
+       (default 0.1, 5) and its growth factor (default 2).
+    6) maxWaitSecs - max. time (secs) to wait for the object(s) to be healed (default 300).
+    7) attemptTimeout - timeout (secs) of each attempt (default 10).
+    8) probe - cheap check that has to succeed before the object is read in full: range (default, read the first
+       byte), metadata (get the object metadata) or none.
+
+    Following are examples of HTTP requests that can be used to invoke bolt_auto_heal_handler.
     a) Measure Auto-Heal time of an object in Bolt.
         {"bucket": "<bucket>", "key": "<key>"}
 
+    b) Measure Auto-Heal time of an object in Bolt, probing its metadata every second for up to 9 minutes.
+        {"bucket": "<bucket>", "key": "<key>", "pollStrategy": "fixed", "pollInterval": 1, "probe": "metadata",
+         "maxWaitSecs": 540}
+
+    c) Measure Auto-Heal time of all objects under a prefix in Bolt, polling up to 64 objects concurrently.
+        {"bucket": "<bucket>", "prefix": "<prefix>", "concurrency": 64}
+
     :param request: request object
-    :return: time taken to auto-heal
+    :return: time taken to auto-heal and the timeline of attempts
     """
     bolt_auto_heal = BoltAutoHeal()
     return bolt_auto_heal.process_event(request)
@@ -0,0 +1,79 @@
+import itertools
+import os
+import sys
+import pytest
+
+# the modules of the functions live at the top level of the repository.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from BoltLocalServer import BoltLocalServer  # noqa: E402
+
+# GS / Bolt endpoints (sharing one store) and metadata server the handlers are tested against. They're started before
+# any test module is imported, as google.auth reads the metadata server address when it's imported.
+GS_SERVER = BoltLocalServer(seed=1)
+BOLT_SERVER = BoltLocalServer(seed=2, store=GS_SERVER.store)
+GS_SERVER.start()
+BOLT_SERVER.start()
+os.environ.pop('GOOGLE_APPLICATION_CREDENTIALS', None)
+os.environ.update({
+    'GCE_METADATA_HOST': GS_SERVER.url[len('http://'):],
+    'GCE_METADATA_IP': GS_SERVER.url[len('http://'):],
+    'STORAGE_EMULATOR_HOST': GS_SERVER.url,
+    'BOLT_URL': BOLT_SERVER.url
+})
+
+_bucket_ids = itertools.count()
+
+
+class JsonRequest:
+    """
+    JsonRequest is a stand-in for the (Flask) HTTP Request the handlers are invoked with.
+    """
+
+    def __init__(self, request_json):
+        self._request_json = request_json
+
+    def get_json(self):
+        return self._request_json
+
+
+def response_body(response):
+    """
+    Returns the body of a (streamed) Flask Response returned by a handler.
+    :param response: Response
+    :return: body (str)
+    """
+    return ''.join(chunk.decode() if isinstance(chunk, bytes) else chunk for chunk in response.response)
+
+
+@pytest.fixture
+def servers():
+    """
+    :return: (GS server, Bolt server), with the injected latency / errors reset after the test
+    """
+    yield GS_SERVER, BOLT_SERVER
+    for server in (GS_SERVER, BOLT_SERVER):
+        server.latency = 0.0
+        server.jitter = 0.0
+        server.bandwidth = None
+        server.error_rate = 0.0
+
+
+@pytest.fixture
+def bucket(servers):
+    """
+    :return: name of a new, empty bucket
+    """
+    bucket_name = 'test-bucket-{}'.format(next(_bucket_ids))
+    servers[0].create_bucket(bucket_name)
+    return bucket_name
+
+
+def stored_objects(bucket_name):
+    """
+    :param bucket_name: bucket name
+    :return: {object name: object data} of the objects stored in a bucket
+    """
+    with GS_SERVER.store['lock']:
+        objects = GS_SERVER.store['buckets'][bucket_name][1]
+        return {object_name: data for object_name, (resource, data) in objects.items()}
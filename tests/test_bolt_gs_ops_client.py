@@ -0,0 +1,133 @@
+import gzip
+import hashlib
+import json
+import pytest
+from conftest import JsonRequest, response_body, stored_objects
+from BoltGSOpsClient import BoltGSOpsClient
+
+
+@pytest.fixture
+def objects(servers, bucket):
+    """
+    :return: {object name: data} of the objects put in the bucket (p/k0..k4, p/d/x, p/gz (gzip encoded), q)
+    """
+    gs_server = servers[0]
+    objects = {'p/k{}'.format(i): 'data{}'.format(i).encode() * (i + 1) for i in range(5)}
+    objects.update({'p/d/x': b'x', 'q': b'q'})
+    for object_name, data in objects.items():
+        gs_server.put_object(bucket, object_name, data)
+    objects['p/gz'] = b'hello' * 100
+    gs_server.put_object(bucket, 'p/gz', gzip.compress(objects['p/gz']), content_type='text/plain',
+                         content_encoding='gzip')
+    return objects
+
+
+def ops(request_json):
+    return BoltGSOpsClient().process_event(JsonRequest(request_json))
+
+
+def validate(request_json):
+    return BoltGSOpsClient().validate_obj_md5(JsonRequest(request_json))
+
+
+def ndjson(response):
+    return [json.loads(line) for line in response_body(response).splitlines() if line]
+
+
+@pytest.mark.parametrize('sdk_type', ['GS', 'BOLT'])
+def test_list_objects(objects, bucket, sdk_type):
+    listing = json.loads(ops({'requestType': 'list_objects', 'sdkType': sdk_type, 'bucket': bucket, 'prefix': 'p/',
+                              'delimiter': '/'}))
+
+    assert listing == {
+        'objects': ['p/gz', 'p/k0', 'p/k1', 'p/k2', 'p/k3', 'p/k4'],
+        'prefixes': ['p/d/']
+    }
+
+
+def test_list_objects_resumed_from_next_page_token(objects, bucket):
+    first = json.loads(ops({'requestType': 'list_objects', 'bucket': bucket, 'prefix': 'p/', 'maxResults': 4}))
+    rest = json.loads(ops({'requestType': 'list_objects', 'bucket': bucket, 'prefix': 'p/',
+                           'pageToken': first['nextPageToken']}))
+
+    assert first['objects'] == ['p/d/x', 'p/gz', 'p/k0', 'p/k1']
+    assert rest == {'objects': ['p/k2', 'p/k3', 'p/k4']}
+
+
+def test_list_objects_stream_ndjson(objects, bucket):
+    lines = ndjson(ops({'requestType': 'list_objects', 'sdkType': 'BOLT', 'bucket': bucket, 'prefix': 'p/',
+                        'stream': 'ndjson'}))
+
+    assert [line['name'] for line in lines[:-1]] == sorted(name for name in objects if name.startswith('p/'))
+    assert lines[-1] == {'summary': {'objects': 7, 'pages': 1, 'nextPageToken': None}}
+
+
+def test_list_objects_stream_json(objects, bucket):
+    listing = json.loads(response_body(ops({'requestType': 'list_objects', 'bucket': bucket, 'stream': 'json'})))
+
+    assert listing == {'objects': sorted(objects)}
+
+
+def test_validate_object_gzip_encoded(objects, bucket):
+    validation = validate({'bucket': bucket, 'key': 'p/gz'})
+
+    # the object is decompressed (decompressive transcoding) before its MD5 is computed.
+    expected_md5 = hashlib.md5(objects['p/gz']).hexdigest().upper()
+    assert validation['gs-md5'] == validation['bolt-md5'] == expected_md5
+
+
+@pytest.mark.parametrize('mode', ['full', 'fast'])
+def test_validate_prefix(objects, bucket, mode):
+    lines = ndjson(validate({'bucket': bucket, 'prefix': 'p/', 'mode': mode, 'concurrency': 3}))
+
+    # only the summary: all objects match.
+    assert len(lines) == 1
+    summary = lines[0]['summary']
+    assert (summary['objects'], summary['matched'], summary['mismatched'], summary['missing'], summary['errors']) == \
+        (7, 7, 0, 0, 0)
+    gz_size = len(gzip.compress(objects['p/gz']))
+    if mode == 'full':
+        # every object is downloaded from Bolt and GS (gzip encoded objects as stored).
+        plain_size = sum(len(data) for name, data in objects.items() if name.startswith('p/') and name != 'p/gz')
+        assert summary['bytes-verified'] == 2 * (plain_size + gz_size)
+        assert summary['metadata-verified'] == 0
+    else:
+        # stored hashes are compared, only the gzip encoded object is downloaded.
+        assert summary['bytes-verified'] == 2 * gz_size
+        assert summary['metadata-verified'] == 6
+
+
+def test_validate_keys_reports_missing(objects, bucket):
+    lines = ndjson(validate({'bucket': bucket, 'keys': ['p/k1', 'nope']}))
+
+    assert [(line['key'], line['status']) for line in lines[:-1]] == [('nope', 'missing')]
+    summary = lines[-1]['summary']
+    assert (summary['objects'], summary['matched'], summary['missing']) == (2, 1, 1)
+    assert summary['bytes-verified'] == 2 * len(objects['p/k1'])
+
+
+@pytest.mark.parametrize('request_json', [{}, {'prefix': ''}, {'prefix': None}])
+def test_delete_objects_needs_keys_or_prefix(objects, bucket, request_json):
+    result = ops(dict(request_json, requestType='delete_objects', bucket=bucket))
+
+    assert result == {'errorMessage': 'delete_objects needs keys or a non-empty prefix', 'errorCode': '1'}
+    assert set(stored_objects(bucket)) == set(objects)
+
+
+def test_delete_objects_keys(objects, bucket):
+    result = ops({'requestType': 'delete_objects', 'bucket': bucket, 'keys': ['p/k0', 'nope']})
+
+    assert (result['Deleted'], result['Batches'], list(result['Errors'])) == (1, 1, ['nope'])
+    assert 'p/k0' not in stored_objects(bucket)
+
+
+def test_delete_objects_prefix_in_batches(servers, bucket):
+    for i in range(250):
+        servers[0].put_object(bucket, 'del/{:03d}'.format(i), b'x')
+    servers[0].put_object(bucket, 'kept', b'x')
+
+    result = ops({'requestType': 'delete_objects', 'sdkType': 'BOLT', 'bucket': bucket, 'prefix': 'del/'})
+
+    # batch requests of up to 100 deletes.
+    assert result == {'Deleted': 250, 'Batches': 3, 'Errors': {}}
+    assert list(stored_objects(bucket)) == ['kept']
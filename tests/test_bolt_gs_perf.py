@@ -0,0 +1,154 @@
+import gzip
+import json
+import pytest
+from conftest import JsonRequest, stored_objects
+from BoltGSPerf import BoltGSPerf
+
+
+def perf(request_json):
+    result = BoltGSPerf().process_event(JsonRequest(request_json))
+    assert 'errorMessage' not in result, result
+    return json.loads(result)
+
+
+@pytest.mark.parametrize('engine', ['threads', 'asyncio'])
+def test_list_objects(servers, bucket, engine):
+    for i in range(25):
+        servers[0].put_object(bucket, 'k{:02d}'.format(i), b'x')
+
+    perf_stats = perf({'requestType': 'list_objects', 'bucket': bucket, 'maxResults': 10, 'maxPages': 0,
+                       'numIter': 2, 'engine': engine})
+
+    for client_name in ['gs', 'bolt']:
+        enumeration = perf_stats[client_name + '_list_objs_enumeration']
+        assert (enumeration['objects'], enumeration['pages'], enumeration['prefixes']) == (25, 3, 0)
+        # a request per page, for each iteration.
+        assert perf_stats[client_name + '_list_objs_perf_stats']['latency']['count'] == 2 * 3
+
+
+@pytest.fixture
+def download_objects(servers, bucket):
+    """
+    :return: (no of objects, stored sizes) of the objects put in the bucket: 3 plain objects and a gzip encoded one
+    """
+    sizes = []
+    for i in range(3):
+        servers[0].put_object(bucket, 'k{}'.format(i), b'a' * 1000)
+        sizes.append(1000)
+    compressed = gzip.compress(b'hello' * 1000)
+    servers[0].put_object(bucket, 'gz', compressed, content_type='text/plain', content_encoding='gzip')
+    sizes.append(len(compressed))
+    return len(sizes), sizes
+
+
+@pytest.mark.parametrize('engine', ['threads', 'asyncio'])
+@pytest.mark.parametrize('metadata_source', ['listing', 'get_blob', 'none'])
+@pytest.mark.parametrize('request_type', ['download_object', 'download_object_ttfb'])
+def test_download_object_gzip(download_objects, bucket, engine, metadata_source, request_type):
+    num_objects, sizes = download_objects
+
+    perf_stats = perf({'requestType': request_type, 'bucket': bucket, 'engine': engine,
+                       'metadataSource': metadata_source})
+
+    stat_name = 'download_obj_ttfb_perf_stats' if request_type.endswith('_ttfb') else 'download_obj_perf_stats'
+    for client_name in ['gs', 'bolt']:
+        download_perf_stats = perf_stats['{}_{}'.format(client_name, stat_name)]
+        assert download_perf_stats['latency']['count'] == num_objects
+        # sizes are the stored ones (the gzip encoded object as compressed), whichever the metadata source.
+        assert download_perf_stats['object_size']['average'] == "{:.2f} bytes".format(sum(sizes) / num_objects)
+        assert perf_stats[client_name + '_object_count (compressed)'] == 1
+        assert perf_stats[client_name + '_object_count (uncompressed)'] == num_objects - 1
+        assert perf_stats[client_name + '_metadata_requests'] == (num_objects if metadata_source == 'get_blob'
+                                                                  else 0)
+        # a download and, with get_blob, a metadata request per object. The keys are listed (a page) with the GS
+        # client, once for each of GS and Bolt, whose requests aren't counted by the asyncio engine.
+        expected_requests = num_objects + (num_objects if metadata_source == 'get_blob' else 0)
+        if client_name == 'gs' and engine == 'threads':
+            expected_requests += 2
+        assert perf_stats[client_name + '_connection_stats']['requests'] == expected_requests
+
+
+def test_delete_object_counts_not_found(servers, bucket):
+    perf({'requestType': 'upload_object', 'bucket': bucket, 'numKeys': 5, 'objLength': 10})
+    assert len(stored_objects(bucket)) == 5
+
+    perf_stats = perf({'requestType': 'delete_object', 'bucket': bucket, 'numKeys': 6})
+
+    # GS and Bolt share the store: Bolt finds the objects already deleted from GS.
+    assert perf_stats['gs_del_obj_perf_stats']['latency']['count'] == 5
+    assert perf_stats['gs_del_obj_perf_stats']['objects_not_found'] == 1
+    assert perf_stats['bolt_del_obj_perf_stats']['objects_not_found'] == 6
+    assert perf_stats['bolt_del_obj_perf_stats']['latency']['count'] == 0
+    assert stored_objects(bucket) == {}
+
+
+def test_upload_object_large(bucket):
+    obj_length = 600000
+    chunk_sizes = [256 * 1024, 512 * 1024]
+
+    perf_stats = perf({'requestType': 'upload_object_large', 'bucket': bucket, 'numKeys': 3, 'objLength': obj_length,
+                       'chunkSize': chunk_sizes, 'concurrency': 2})
+
+    for client_name in ['gs', 'bolt']:
+        large_perf_stats = perf_stats[client_name + '_upload_obj_large_perf_stats']
+        assert sorted(large_perf_stats) == ['0.25 MB', '0.50 MB']
+        for chunk_size in chunk_sizes:
+            chunk_perf_stats = large_perf_stats["{:.2f} MB".format(chunk_size / (1024 * 1024))]
+            chunks_per_object = -(-obj_length // chunk_size)
+            assert chunk_perf_stats['object']['latency']['count'] == 3
+            assert chunk_perf_stats['object']['object_size']['average'] == "{:.2f} bytes".format(obj_length)
+            assert chunk_perf_stats['session_initiation']['latency']['count'] == 3
+            assert chunk_perf_stats['chunk']['latency']['count'] == 3 * chunks_per_object
+            assert chunk_perf_stats['chunk']['object_size']['average'] == "{:.2f} bytes".format(
+                obj_length / chunks_per_object)
+    # the objects are deleted after each pass.
+    assert stored_objects(bucket) == {}
+
+
+def test_upload_object_large_keeps_passed_keys(servers, bucket):
+    servers[0].put_object(bucket, 'mine', b'keep')
+
+    perf({'requestType': 'upload_object_large', 'bucket': bucket, 'keys': ['mine'], 'objLength': 300000,
+          'chunkSize': 256 * 1024})
+
+    # the object is uploaded (in 2 chunks), but not deleted.
+    objects = stored_objects(bucket)
+    assert list(objects) == ['mine']
+    assert len(objects['mine']) == 300000
+
+
+def test_saturation_sweep(bucket):
+    perf_stats = perf({'requestType': 'saturation_sweep', 'bucket': bucket, 'numKeys': 4, 'maxConcurrency': 3,
+                       'objLength': 100, 'concurrency': 5})
+
+    for curve_name in ['{}_{}_sweep'.format(client_name, workload_name) for client_name in ['gs', 'bolt']
+                       for workload_name in ['upload_obj', 'download_obj', 'del_obj']]:
+        curve = perf_stats[curve_name]['curve']
+        assert [point['concurrency'] for point in curve] == [1, 2, 3]
+        for point in curve:
+            if curve_name == 'bolt_del_obj_sweep':
+                # GS and Bolt share the store: Bolt finds the objects already deleted from GS.
+                assert point['objects_not_found'] == 4
+                assert point['throughput_objects_per_sec'] == 0
+                continue
+            assert point['perf_stats']['latency']['count'] == 4
+            assert point['throughput_objects_per_sec'] > 0
+            assert 0 < point['latency_p50_ms'] <= point['latency_p99_ms']
+            if curve_name.endswith('_del_obj_sweep'):
+                assert point['objects_not_found'] == 0
+            else:
+                assert point['perf_stats']['object_size']['average'] == "100.00 bytes"
+        knee_concurrency = perf_stats[curve_name]['knee_concurrency']
+        assert knee_concurrency is None or knee_concurrency in [2, 3]
+    assert stored_objects(bucket) == {}
+
+
+def test_saturation_sweep_range_mode(servers, bucket):
+    perf_stats = perf({'requestType': 'saturation_sweep', 'bucket': bucket, 'numKeys': 2, 'maxConcurrency': 2,
+                       'objLength': 1000, 'rangeMode': 'parallel', 'numRanges': 4})
+
+    assert (perf_stats['range_mode'], perf_stats['num_ranges']) == ('parallel', 4)
+    for point in perf_stats['gs_download_obj_sweep']['curve']:
+        range_perf_stats = point['range_perf_stats']
+        assert range_perf_stats['latency']['count'] == 2 * 4
+        assert range_perf_stats['object_size']['average'] == "250.00 bytes"
@@ -0,0 +1,150 @@
+import json
+import random
+import pytest
+from BoltPerfHistogram import BoltPerfHistogram
+
+SUB_BUCKET_COUNT = 1 << BoltPerfHistogram.SUB_BUCKET_BITS
+# max. relative error of a reported percentile: half the width of a bucket, relative to its lowest value.
+MAX_RELATIVE_ERROR = 1 / SUB_BUCKET_COUNT
+
+
+def exact_percentile(sorted_values, percentile):
+    rank = max(1, min(len(sorted_values), int(len(sorted_values) * percentile + 0.5)))
+    return sorted_values[rank - 1]
+
+
+def test_values_below_sub_bucket_count_are_exact():
+    for value in range(SUB_BUCKET_COUNT):
+        assert BoltPerfHistogram._bucket_index(value) == value
+        assert BoltPerfHistogram._bucket_range(value) == (value, value)
+
+
+@pytest.mark.parametrize('shift', [1, 2, 10, 30])
+def test_bucket_boundaries(shift):
+    half_count = SUB_BUCKET_COUNT // 2
+    for sub_bucket in [half_count, half_count + 1, SUB_BUCKET_COUNT - 1]:
+        low = sub_bucket << shift
+        high = ((sub_bucket + 1) << shift) - 1
+        index = BoltPerfHistogram._bucket_index(low)
+        assert BoltPerfHistogram._bucket_index(high) == index
+        assert BoltPerfHistogram._bucket_index(low - 1) == index - 1
+        assert BoltPerfHistogram._bucket_index(high + 1) == index + 1
+        assert BoltPerfHistogram._bucket_range(index) == (low, high)
+
+
+def test_bucket_indexes_are_contiguous():
+    previous_high = -1
+    for index in range(BoltPerfHistogram._bucket_index(BoltPerfHistogram.MAX_VALUE) + 1):
+        low, high = BoltPerfHistogram._bucket_range(index)
+        assert low == previous_high + 1
+        assert BoltPerfHistogram._bucket_index(low) == index
+        assert BoltPerfHistogram._bucket_index(high) == index
+        previous_high = high
+    assert previous_high == BoltPerfHistogram.MAX_VALUE
+
+
+def test_values_above_max_value_are_clamped_to_the_last_bucket():
+    histogram = BoltPerfHistogram()
+    histogram.record(BoltPerfHistogram.MAX_VALUE * 4)
+    histogram.record(1)
+
+    assert histogram._counts[-1] == 1
+    assert histogram.count == 2
+    # min / max / total stay exact.
+    assert histogram.total == BoltPerfHistogram.MAX_VALUE * 4 + 1
+    assert histogram.max == BoltPerfHistogram.MAX_VALUE * 4
+    assert histogram.percentile(1.0) == BoltPerfHistogram.MAX_VALUE * 4
+    assert histogram.percentile(0.5) == 1
+
+
+def test_empty_histogram():
+    histogram = BoltPerfHistogram()
+
+    assert histogram.count == 0
+    assert histogram.mean() == 0
+    assert histogram.percentile(0.5) == 0
+    assert histogram.min is None and histogram.max is None
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_percentile_error_bounds(seed):
+    rng = random.Random(seed)
+    # latencies from 1us to 10s, log-uniformly distributed.
+    values = [int(10 ** rng.uniform(3, 10)) for _ in range(5000)]
+    histogram = BoltPerfHistogram()
+    histogram.extend(values)
+    values.sort()
+
+    for percentile in [0.01, 0.1, 0.5, 0.9, 0.95, 0.99, 0.999]:
+        expected = exact_percentile(values, percentile)
+        assert abs(histogram.percentile(percentile) - expected) <= expected * MAX_RELATIVE_ERROR
+    assert histogram.percentile(1.0) == values[-1]
+    assert histogram.min == values[0]
+    assert histogram.max == values[-1]
+    assert histogram.total == sum(values)
+    assert histogram.mean() == pytest.approx(sum(values) / len(values))
+
+
+def test_percentile_of_exact_values():
+    histogram = BoltPerfHistogram()
+    histogram.extend(range(1, 101))
+
+    assert histogram.percentile(0.5) == 50
+    assert histogram.percentile(0.9) == 90
+    assert histogram.percentile(0.0) == 1
+    assert histogram.percentile(1.0) == 100
+
+
+def test_merge_equals_recording_all_values():
+    rng = random.Random(1)
+    first_values = [rng.randrange(10 ** 9) for _ in range(1000)]
+    second_values = [rng.randrange(10 ** 6) for _ in range(500)]
+    first = BoltPerfHistogram()
+    first.extend(first_values)
+    second = BoltPerfHistogram()
+    second.extend(second_values)
+    combined = BoltPerfHistogram()
+    combined.extend(first_values + second_values)
+
+    merged = first.merge(second)
+
+    assert merged is first
+    assert merged._counts == combined._counts
+    assert (merged.count, merged.total, merged.min, merged.max) == \
+        (combined.count, combined.total, combined.min, combined.max)
+    for percentile in [0.5, 0.9, 0.99]:
+        assert merged.percentile(percentile) == combined.percentile(percentile)
+
+
+def test_merge_with_empty_histogram():
+    histogram = BoltPerfHistogram()
+    histogram.extend([5, 500])
+
+    histogram.merge(BoltPerfHistogram())
+    assert (histogram.count, histogram.min, histogram.max) == (2, 5, 500)
+
+    empty = BoltPerfHistogram().merge(histogram)
+    assert (empty.count, empty.total, empty.min, empty.max) == (2, 505, 5, 500)
+
+
+def test_to_dict_from_dict_round_trip():
+    histogram = BoltPerfHistogram()
+    histogram.extend([0, 1, 127, 128, 10 ** 6, 10 ** 12, BoltPerfHistogram.MAX_VALUE + 1])
+
+    histogram_dict = json.loads(json.dumps(histogram.to_dict()))
+    restored = BoltPerfHistogram.from_dict(histogram_dict)
+
+    assert restored._counts == histogram._counts
+    assert (restored.count, restored.total, restored.min, restored.max) == \
+        (histogram.count, histogram.total, histogram.min, histogram.max)
+    assert restored.to_dict() == histogram.to_dict()
+    # only non-empty buckets are serialized.
+    assert len(histogram_dict['buckets']) == 7
+
+
+def test_from_dict_rejects_other_precision():
+    histogram_dict = BoltPerfHistogram().to_dict()
+    histogram_dict['sub_bucket_bits'] = BoltPerfHistogram.SUB_BUCKET_BITS + 1
+
+    with pytest.raises(ValueError):
+        BoltPerfHistogram.from_dict(histogram_dict)